@@ -11,9 +11,11 @@ Responsibilities:
 from typing import Dict, Any, Callable
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain.prompts import ChatPromptTemplate
-from models.state import AgentState
+from models.state import AgentState, prompt_inputs, record_agent_note
 from models.member import Member
+from rules.medicaid_rules import evaluate_member
 from utils.logger import setup_logger
+from utils.tracing import trace_chain
 
 # Set up logger
 logger = setup_logger()
@@ -52,7 +54,7 @@ Verify compliance and create audit trail for all actions.
     ])
     
     # Create the chain
-    audit_chain = audit_prompt | llm
+    audit_chain = trace_chain("audit_compliance", audit_prompt | llm)
     
     def run_audit_compliance(state: AgentState) -> AgentState:
         """
@@ -68,22 +70,11 @@ Verify compliance and create audit trail for all actions.
         logger.info(f"Running audit and compliance check for member {member.id}")
         
         try:
-            # Analyze compliance status
-            compliance_issues = []
+            # Ask the model for its compliance review
+            record_agent_note(state, "audit_compliance", audit_chain.invoke(prompt_inputs(state)))
             
-            # Check eligibility verification
-            if not state.get("eligibility_verified"):
-                compliance_issues.append("Eligibility not verified")
-            
-            # Check document requirements
-            docs_required = state.get("documents_required", [])
-            docs_submitted = state.get("documents_submitted", [])
-            if docs_required and len(docs_submitted) < len(docs_required):
-                compliance_issues.append("Missing required documents")
-            
-            # Check work requirements
-            if member.work_requirement.required and state.get("work_requirements_needed"):
-                compliance_issues.append("Work requirements not met")
+            # Analyze compliance status against the shared compliance rules
+            compliance_issues = evaluate_member(member, state).issues
             
             # Determine overall compliance status
             is_compliant = len(compliance_issues) == 0
@@ -11,9 +11,11 @@ Responsibilities:
 from typing import Dict, Any, Callable
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain.prompts import ChatPromptTemplate
-from models.state import AgentState
+from models.state import AgentState, prompt_inputs, record_agent_note
 from models.member import Member
+from models.documents import split_documents
 from utils.logger import setup_logger
+from utils.tracing import trace_chain
 
 # Set up logger
 logger = setup_logger()
@@ -53,7 +55,7 @@ Based on this information, verify document status and provide guidance on missin
     ])
     
     # Create the chain
-    document_chain = document_prompt | llm
+    document_chain = trace_chain("document_assistant", document_prompt | llm)
     
     def run_document_assistant(state: AgentState) -> AgentState:
         """
@@ -76,15 +78,14 @@ Based on this information, verify document status and provide guidance on missin
         
         # For this skeleton, we'll simulate document checking
         try:
+            # Ask the model for document guidance
+            record_agent_note(state, "document_assistant", document_chain.invoke(prompt_inputs(state)))
+            
             # Get required documents from state
             required_documents = state.get("documents_required", [])
             
             # Check which documents have been submitted
-            submitted_documents = []
-            if member.documents:
-                for doc in required_documents:
-                    if doc in member.documents:
-                        submitted_documents.append(doc)
+            submitted_documents, missing_documents = split_documents(required_documents, member.documents or {})
             
             # Update state with submitted documents
             state["documents_submitted"] = submitted_documents
@@ -99,7 +100,7 @@ Based on this information, verify document status and provide guidance on missin
                 "action": "document_verification",
                 "member_id": member.id,
                 "result": "complete" if all_documents_submitted else "incomplete",
-                "missing_documents": [doc for doc in required_documents if doc not in submitted_documents]
+                "missing_documents": missing_documents
             })
             
             logger.info(f"Document assistance completed for member {member.id}")
@@ -11,9 +11,10 @@ Responsibilities:
 from typing import Dict, Any, Callable
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain.prompts import ChatPromptTemplate
-from models.state import AgentState
+from models.state import AgentState, prompt_inputs, record_agent_note
 from models.member import Member
 from utils.logger import setup_logger
+from utils.tracing import trace_chain
 
 # Set up logger
 logger = setup_logger()
@@ -53,7 +54,7 @@ Based on this information, verify eligibility and identify any documentation nee
     ])
     
     # Create the chain
-    eligibility_chain = eligibility_prompt | llm
+    eligibility_chain = trace_chain("eligibility_checker", eligibility_prompt | llm)
     
     def run_eligibility_check(state: AgentState) -> AgentState:
         """
@@ -76,6 +77,9 @@ Based on this information, verify eligibility and identify any documentation nee
         
         # For this skeleton, we'll simulate eligibility checking
         try:
+            # Ask the model to review eligibility and documentation needs
+            record_agent_note(state, "eligibility_checker", eligibility_chain.invoke(prompt_inputs(state)))
+            
             # Check renewal date
             renewal_due_soon = member.is_renewal_due_soon(days_threshold=60)
             
@@ -11,9 +11,10 @@ Responsibilities:
 from typing import Dict, Any, Callable
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain.prompts import ChatPromptTemplate
-from models.state import AgentState
+from models.state import AgentState, prompt_inputs, record_agent_note
 from models.member import Member
 from utils.logger import setup_logger
+from utils.tracing import trace_chain
 
 # Set up logger
 logger = setup_logger()
@@ -52,7 +53,7 @@ Provide multilingual support based on member's language preference.
     ])
     
     # Create the chain
-    chat_chain = chat_prompt | llm
+    chat_chain = trace_chain("multilingual_chat", chat_prompt | llm)
     
     def run_multilingual_chat(state: AgentState) -> AgentState:
         """
@@ -68,6 +69,9 @@ Provide multilingual support based on member's language preference.
         logger.info(f"Running multilingual chat for member {member.id}")
         
         try:
+            # Ask the model to prepare the member conversation
+            record_agent_note(state, "multilingual_chat", chat_chain.invoke(prompt_inputs(state)))
+            
             preferred_language = member.contact.preferred_language
             
             # Check if translation is needed
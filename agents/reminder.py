@@ -11,9 +11,10 @@ Responsibilities:
 from typing import Dict, Any, Callable
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain.prompts import ChatPromptTemplate
-from models.state import AgentState
+from models.state import AgentState, record_agent_note
 from models.member import Member
 from utils.logger import setup_logger
+from utils.tracing import trace_chain
 
 # Set up logger
 logger = setup_logger()
@@ -58,7 +59,7 @@ Generate appropriate personalized reminders for this member.
     ])
     
     # Create the chain
-    reminder_chain = reminder_prompt | llm
+    reminder_chain = trace_chain("reminder", reminder_prompt | llm)
     
     def send_reminders(state: AgentState) -> AgentState:
         """
@@ -81,6 +82,14 @@ Generate appropriate personalized reminders for this member.
         
         # For this skeleton, we'll simulate reminder generation and sending
         try:
+            # Ask the model to draft the reminder
+            record_agent_note(state, "reminder", reminder_chain.invoke({
+                "member_json": member.model_dump_json(),
+                "eligibility_status": "verified" if state["eligibility_verified"] else "not verified",
+                "documents_required": ", ".join(state["documents_required"]) or "none",
+                "work_requirements": "required" if state["work_requirements_needed"] else "not required"
+            }))
+            
             # Determine member's preferred contact method and language
             preferred_method = member.contact.preferred_contact_method
             preferred_language = member.contact.preferred_language
@@ -121,7 +130,8 @@ Generate appropriate personalized reminders for this member.
                 "action": "send_notification",
                 "member_id": member.id,
                 "notification_type": reminder_type,
-                "channel": preferred_method
+                "channel": preferred_method,
+                "language": preferred_language
             })
             
             logger.info(f"Reminder sent to member {member.id}")
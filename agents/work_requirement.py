@@ -11,9 +11,11 @@ Responsibilities:
 from typing import Dict, Any, Callable
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain.prompts import ChatPromptTemplate
-from models.state import AgentState
+from models.state import AgentState, prompt_inputs, record_agent_note
 from models.member import Member
+from rules.medicaid_rules import evaluate_member
 from utils.logger import setup_logger
+from utils.tracing import trace_chain
 
 # Set up logger
 logger = setup_logger()
@@ -52,7 +54,7 @@ Based on this information, verify work requirement compliance.
     ])
     
     # Create the chain
-    work_chain = work_prompt | llm
+    work_chain = trace_chain("work_requirement", work_prompt | llm)
     
     def run_work_requirement_check(state: AgentState) -> AgentState:
         """
@@ -68,13 +70,17 @@ Based on this information, verify work requirement compliance.
         logger.info(f"Running work requirement check for member {member.id}")
         
         try:
+            # Ask the model to review the work requirement
+            record_agent_note(state, "work_requirement", work_chain.invoke(prompt_inputs(state)))
+            
             # Check if work requirements apply
-            if member.work_requirement.required:
-                hours_reported = member.work_requirement.current_month_hours
-                hours_needed = 80
+            rules = evaluate_member(member, state)
+            if rules["work_requirement_applies"]:
+                hours_reported = member.work_requirement.hours_reported
+                hours_needed = member.work_requirement.hours_needed
                 
                 # Check compliance
-                is_compliant = hours_reported >= hours_needed
+                is_compliant = rules["work_requirements_met"]
                 
                 # Update state
                 state["work_requirements_needed"] = not is_compliant
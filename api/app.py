@@ -0,0 +1,390 @@
+"""
+FastAPI service exposing the Medicaid Assist workflow.
+
+Case-management systems call the engine programmatically through this API.
+Work runs on a bounded worker pool; when the pool is saturated requests are
+rejected with 429 and a Retry-After header instead of queueing without limit.
+
+Run with:
+    python -m uvicorn api.app:app
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+from main import get_workflow, process_member
+from models.state import AgentState, dump_result_json
+from storage.document_store import DocumentStore, DocumentTooLargeError
+from storage.member_repository import get_member, load_members, set_router, update_member_documents
+from storage.sharded_repository import start_local_shards
+from utils.logger import setup_logger
+from utils.metrics import METRICS
+from utils.tracing import wrap
+
+# Set up logger
+logger = setup_logger()
+
+# Worker pool sizing, overridable from the environment
+MAX_WORKERS = int(os.environ.get("MEDICAID_API_WORKERS", "8"))
+MAX_PENDING = int(os.environ.get("MEDICAID_API_MAX_PENDING", str(MAX_WORKERS * 4)))
+MAX_ACTIVE_BATCHES = int(os.environ.get("MEDICAID_API_MAX_BATCHES", "4"))
+MAX_RETAINED_BATCHES = int(os.environ.get("MEDICAID_API_RETAINED_BATCHES", "100"))
+RETRY_AFTER_SECONDS = int(os.environ.get("MEDICAID_API_RETRY_AFTER", "1"))
+
+# Content-addressed store for uploaded member documents
+DOCUMENT_ROOT = os.environ.get("MEDICAID_DOCUMENT_ROOT", "data/documents")
+
+# Member repository shard processes; 0 keeps members in the API process
+REPOSITORY_SHARDS = int(os.environ.get("MEDICAID_REPOSITORY_SHARDS", "0"))
+
+
+class BoundedWorkerPool:
+    """
+    Thread pool that admits at most `max_pending` queued or running jobs.
+
+    Non-blocking submissions fail fast when the pool is full so the caller
+    can apply backpressure; blocking submissions wait for a free slot.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="medicaid-worker")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs queued or running."""
+        return self._pending
+
+    def submit(self, fn: Callable, *args: Any, block: bool = False) -> Optional[Future]:
+        """
+        Submit a job to the pool.
+
+        Args:
+            fn: The function to run
+            *args: Positional arguments for the function
+            block: Wait for a free slot instead of failing fast
+
+        Returns:
+            Optional[Future]: The job future, or None if the pool is saturated
+        """
+        if not self._slots.acquire(blocking=block):
+            return None
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(wrap(fn), *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for running jobs."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class Batch:
+    """A batch of members submitted together and processed on the pool."""
+
+    def __init__(self, member_ids: List[str]):
+        self.id = uuid.uuid4().hex
+        self.member_ids = list(dict.fromkeys(member_ids))
+        self.created_at = datetime.now().isoformat()
+        self.futures: Dict[str, Future] = {}
+        self.submitted = threading.Event()
+        self.unsubmitted = 0
+        self._lock = threading.Lock()
+
+    def add(self, member_id: str, future: Future) -> None:
+        with self._lock:
+            self.futures[member_id] = future
+
+    def fail_unsubmitted(self, error: BaseException) -> int:
+        """Record every member that never reached the pool as failed with `error`; returns how many."""
+        with self._lock:
+            unsubmitted = [member_id for member_id in self.member_ids if member_id not in self.futures]
+            for member_id in unsubmitted:
+                future = Future()
+                future.set_exception(error)
+                self.futures[member_id] = future
+            self.unsubmitted = len(unsubmitted)
+        return len(unsubmitted)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the progress of the batch."""
+        with self._lock:
+            futures = list(self.futures.values())
+            unsubmitted = self.unsubmitted
+        done = [f for f in futures if f.done()]
+        failed = sum(1 for f in done if f.exception() is not None)
+        return {
+            "batch_id": self.id,
+            "created_at": self.created_at,
+            "total": len(self.member_ids),
+            "submitted": len(futures) - unsubmitted,
+            "completed": len(done) - failed,
+            "failed": failed,
+            "status": "completed" if self.submitted.is_set() and len(done) == len(self.member_ids) else "running"
+        }
+
+
+class BatchRequest(BaseModel):
+    """Request body for batch submission."""
+    member_ids: List[str]
+
+
+_pool: Optional[BoundedWorkerPool] = None
+_pool_lock = threading.Lock()
+_batches: "OrderedDict[str, Batch]" = OrderedDict()
+_batches_lock = threading.Lock()
+_active_batches = threading.BoundedSemaphore(MAX_ACTIVE_BATCHES)
+_document_store: Optional[DocumentStore] = None
+_document_store_lock = threading.Lock()
+
+
+def get_pool() -> BoundedWorkerPool:
+    """Return the process-wide worker pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BoundedWorkerPool(MAX_WORKERS, MAX_PENDING)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Shut down the process-wide worker pool; the next `get_pool` starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def get_document_store() -> DocumentStore:
+    """Return the process-wide document store, opening it on first use."""
+    global _document_store
+    if _document_store is None:
+        with _document_store_lock:
+            if _document_store is None:
+                _document_store = DocumentStore(DOCUMENT_ROOT)
+    return _document_store
+
+
+def _run_member(member_id: str) -> AgentState:
+    """Process a member; results are serialized to JSON only when returned to the client."""
+    return process_member(member_id)
+
+
+def _result_record(member_id: str, future: Future) -> Dict[str, Any]:
+    """Build the NDJSON record for a finished member job."""
+    error = future.exception()
+    if error is not None:
+        return {"member_id": member_id, "status": "error", "error": str(error)}
+    return {"member_id": member_id, "status": "completed", "result": future.result()}
+
+
+def _saturated(detail: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": detail},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+def _feed_batch(batch: Batch) -> None:
+    """Submit every member of a batch, waiting for pool capacity as needed."""
+    pool = get_pool()
+    try:
+        for member_id in batch.member_ids:
+            batch.add(member_id, pool.submit(_run_member, member_id, block=True))
+    except Exception as e:
+        failed = batch.fail_unsubmitted(e)
+        logger.error(f"Error submitting batch {batch.id}, {failed} members not submitted: {str(e)}")
+    finally:
+        batch.submitted.set()
+        _active_batches.release()
+
+
+def _get_batch(batch_id: str) -> Batch:
+    with _batches_lock:
+        batch = _batches.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return batch
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    router = None
+    if REPOSITORY_SHARDS > 0:
+        router = start_local_shards(REPOSITORY_SHARDS)
+        set_router(router)
+    else:
+        load_members()
+    get_workflow().warm_up()
+    get_pool()
+    logger.info(f"API worker pool started with {MAX_WORKERS} workers, {MAX_PENDING} pending slots")
+    yield
+    shutdown_pool()
+    if _document_store is not None:
+        _document_store.close()
+    if router is not None:
+        set_router(None)
+        router.close()
+
+
+app = FastAPI(title="Medicaid Assist API", lifespan=lifespan)
+
+
+@app.get("/")
+async def root() -> Dict[str, Any]:
+    """API health check."""
+    return {"service": "medicaid-assist", "status": "ok"}
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    """Component status check."""
+    pool = get_pool()
+    return {
+        "status": "ok",
+        "workers": pool.max_workers,
+        "pending": pool.pending,
+        "capacity": pool.max_pending
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Agent latency histograms and counters in Prometheus text format."""
+    return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/members/{member_id}/process")
+async def process_member_endpoint(member_id: str):
+    """Process a single member through the workflow."""
+    if get_member(member_id) is None:
+        raise HTTPException(status_code=404, detail=f"Member {member_id} not found")
+
+    future = get_pool().submit(_run_member, member_id)
+    if future is None:
+        return _saturated("Worker pool is saturated")
+
+    try:
+        return Response(dump_result_json(await asyncio.wrap_future(future)), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error processing member {member_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.put("/members/{member_id}/documents/{document_type}")
+async def upload_document(member_id: str, document_type: str, request: Request,
+                          filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Upload a member document as the raw request body. The document is stored,
+    validated, and put on file for the member only if it passes validation.
+    """
+    if get_member(member_id) is None:
+        raise HTTPException(status_code=404, detail=f"Member {member_id} not found")
+
+    store = get_document_store()
+    # Chunks are hashed and written once, straight into the store's temporary object
+    with store.open_object() as upload:
+        async for chunk in request.stream():
+            try:
+                upload.write(chunk)
+            except DocumentTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+        digest, _, deduplicated = await asyncio.to_thread(upload.commit)
+
+    # Rejected uploads stay unreferenced and are removed by collect_garbage
+    validation = await asyncio.wrap_future(store.validate(digest))
+    if not validation.valid:
+        raise HTTPException(status_code=422, detail=validation.errors)
+
+    stored = await asyncio.to_thread(store.add_reference, member_id, document_type, digest, filename)
+    update_member_documents(member_id, {document_type: stored.to_document_record()})
+    return {
+        **stored.to_document_record(),
+        "document_type": document_type,
+        "content_type": validation.content_type,
+        "pages": validation.pages,
+        "deduplicated": deduplicated
+    }
+
+
+@app.post("/batches", status_code=202)
+async def submit_batch(request: BatchRequest):
+    """Submit a batch of members for background processing."""
+    if not request.member_ids:
+        raise HTTPException(status_code=422, detail="member_ids must not be empty")
+
+    missing = [member_id for member_id in request.member_ids if get_member(member_id) is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Members not found: {', '.join(missing)}")
+
+    if not _active_batches.acquire(blocking=False):
+        return _saturated("Too many batches in progress")
+
+    batch = Batch(request.member_ids)
+    with _batches_lock:
+        _batches[batch.id] = batch
+        while len(_batches) > MAX_RETAINED_BATCHES:
+            _batches.popitem(last=False)
+
+    threading.Thread(target=_feed_batch, args=(batch,), daemon=True).start()
+    logger.info(f"Accepted batch {batch.id} with {len(batch.member_ids)} members")
+    return batch.summary()
+
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str) -> Dict[str, Any]:
+    """Get the progress of a batch."""
+    return _get_batch(batch_id).summary()
+
+
+@app.get("/batches/{batch_id}/results")
+async def stream_batch_results(batch_id: str) -> StreamingResponse:
+    """Stream batch results as NDJSON, one line per member as it completes."""
+    batch = _get_batch(batch_id)
+
+    async def results() -> AsyncIterator[bytes]:
+        emitted = set()
+        while True:
+            finished = batch.submitted.is_set()
+            with batch._lock:
+                waiting = {f: m for m, f in batch.futures.items() if m not in emitted}
+            if not waiting:
+                if finished:
+                    break
+                await asyncio.sleep(0.05)
+                continue
+            await asyncio.to_thread(wait, list(waiting), 1.0, FIRST_COMPLETED)
+            for future, member_id in waiting.items():
+                if future.done():
+                    emitted.add(member_id)
+                    yield dump_result_json(_result_record(member_id, future)) + b"\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
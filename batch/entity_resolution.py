@@ -0,0 +1,388 @@
+"""
+Duplicate member detection with blocking.
+
+Instead of comparing every pair of members, each member is assigned a few
+blocking keys: the Soundex code of the last name with the birth year, the
+normalized phone number and the normalized email address. Only members
+sharing a key are compared, and candidate pairs are scored with
+field-level similarity (Jaro-Winkler on names, birth date, phone, email
+and address). Pairs scoring above a threshold are reported and linked into
+clusters of records that likely belong to the same person.
+
+Blocks are partitioned across worker processes by a stable hash of the
+key, so each worker holds only its share of the population's keys. Blocks
+larger than `max_block_size` are split by first-name initial and skipped if
+still too large, which bounds the work per block on very common names.
+
+Usage:
+    python -m batch.entity_resolution --output data/duplicates.jsonl --processes 8
+"""
+
+import argparse
+import json
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+
+from batch.households import normalize_address
+from models.member import Member
+from storage.member_repository import get_all_members, get_member, load_members
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger()
+
+# Field weights of the match score, normalized over the fields compared
+FIELD_WEIGHTS = {
+    "first_name": 0.2,
+    "last_name": 0.2,
+    "date_of_birth": 0.25,
+    "phone": 0.1,
+    "email": 0.1,
+    "address": 0.15
+}
+
+# Weight of the fields every pair is compared on
+_NAME_WEIGHT = FIELD_WEIGHTS["first_name"] + FIELD_WEIGHTS["last_name"]
+_BASE_WEIGHT = _NAME_WEIGHT + FIELD_WEIGHTS["date_of_birth"] + FIELD_WEIGHTS["address"]
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MAX_BLOCK_SIZE = 2000
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+    "L": "4", **dict.fromkeys("MN", "5"), "R": "6"
+}
+_NON_DIGITS = re.compile(r"\D")
+_NON_LETTERS = re.compile(r"[^A-Z]")
+
+# Compact record compared within blocks:
+# (member_id, first_name, last_name, date_of_birth, phone, email, address_key)
+MatchRecord = Tuple[str, str, str, str, str, str, str]
+
+
+class DuplicateCandidate(BaseModel):
+    """A pair of member records that likely belong to the same person."""
+    member_id: str
+    duplicate_id: str
+    score: float
+    fields: Dict[str, float]
+
+
+def soundex(name: str) -> str:
+    """American Soundex code of a name, e.g. "Robert" -> "R163"."""
+    letters = _NON_LETTERS.sub("", name.upper())
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code; vowels do
+        if letter not in "HW":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Last ten digits of a phone number, or "" if it has fewer than seven."""
+    digits = _NON_DIGITS.sub("", phone or "")
+    return digits[-10:] if len(digits) >= 7 else ""
+
+
+def normalize_email(email: Optional[str]) -> str:
+    """Lowercased email with any "+tag" removed from the local part."""
+    email = (email or "").strip().lower()
+    local, _, domain = email.partition("@")
+    if not domain:
+        return ""
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def jaro_winkler(a: str, b: str) -> float:
+    """Jaro-Winkler similarity of two strings, from 0.0 to 1.0."""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    window = max(len(a), len(b)) // 2 - 1
+    matched_b = [False] * len(b)
+    matches_a = []
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_b[j] = True
+                matches_a.append(char)
+                break
+    if not matches_a:
+        return 0.0
+    matches_b = [char for char, matched in zip(b, matched_b) if matched]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    m = len(matches_a)
+    jaro = (m / len(a) + m / len(b) + (m - transpositions) / m) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def _date_similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b or a[:4] != b[:4]:
+        return 0.0
+    if a[5:7] == b[8:10] and a[8:10] == b[5:7]:
+        return 0.8  # Day and month swapped
+    return 0.5 if a[5:7] == b[5:7] else 0.0
+
+
+def match_record(member: Member) -> MatchRecord:
+    """Extract and normalize the fields used for matching."""
+    return (
+        member.id,
+        member.first_name.strip().upper(),
+        member.last_name.strip().upper(),
+        member.date_of_birth[:10],
+        normalize_phone(member.contact.phone),
+        normalize_email(member.contact.email),
+        normalize_address(member.address)
+    )
+
+
+def _blocking_keys(last_name: str, birth_year: str, phone: str, email: str) -> List[str]:
+    keys = []
+    code = soundex(last_name)
+    if code and birth_year:
+        keys.append(f"name:{code}:{birth_year}")
+    if phone:
+        keys.append(f"phone:{phone}")
+    if email:
+        keys.append(f"email:{email}")
+    return keys
+
+
+def blocking_keys(record: MatchRecord) -> List[str]:
+    """Blocking keys of a record; members sharing any key are compared."""
+    return _blocking_keys(record[2], record[3][:4], record[4], record[5])
+
+
+def score_pair(a: MatchRecord, b: MatchRecord, threshold: float = 0.0) -> Tuple[float, Dict[str, float]]:
+    """
+    Score how likely two records are the same person.
+
+    Phone and email count only when both records have one, and the score
+    is normalized over the fields compared. The exact-match fields are
+    scored first; if even identical names could not lift the score to
+    `threshold`, the names are not compared and the upper bound is returned.
+
+    Args:
+        a: First record
+        b: Second record
+        threshold: Score below which name comparison is skipped
+
+    Returns:
+        Tuple[float, Dict[str, float]]: Score from 0.0 to 1.0 and the
+            per-field similarities (empty when names were not compared)
+    """
+    date_of_birth = _date_similarity(a[3], b[3])
+    address = 1.0 if a[6] == b[6] else 0.0
+    weight = _BASE_WEIGHT
+    partial = FIELD_WEIGHTS["date_of_birth"] * date_of_birth + FIELD_WEIGHTS["address"] * address
+    phone = email = None
+    if a[4] and b[4]:
+        phone = 1.0 if a[4] == b[4] else 0.0
+        weight += FIELD_WEIGHTS["phone"]
+        partial += FIELD_WEIGHTS["phone"] * phone
+    if a[5] and b[5]:
+        email = 1.0 if a[5] == b[5] else 0.0
+        weight += FIELD_WEIGHTS["email"]
+        partial += FIELD_WEIGHTS["email"] * email
+    if (partial + _NAME_WEIGHT) / weight < threshold:
+        return (partial + _NAME_WEIGHT) / weight, {}
+
+    first_name = jaro_winkler(a[1], b[1])
+    last_name = jaro_winkler(a[2], b[2])
+    score = (partial + FIELD_WEIGHTS["first_name"] * first_name + FIELD_WEIGHTS["last_name"] * last_name) / weight
+    fields = {"first_name": first_name, "last_name": last_name, "date_of_birth": date_of_birth, "address": address}
+    if phone is not None:
+        fields["phone"] = phone
+    if email is not None:
+        fields["email"] = email
+    return score, fields
+
+
+def partition_of(key: str, partitions: int) -> int:
+    """Stable partition of a blocking key, the same in every process."""
+    return zlib.crc32(key.encode("utf-8")) % partitions
+
+
+def _split_block(records: List[MatchRecord], max_block_size: int) -> List[List[MatchRecord]]:
+    if len(records) <= max_block_size:
+        return [records]
+    by_initial: Dict[str, List[MatchRecord]] = {}
+    for record in records:
+        by_initial.setdefault(record[1][:1], []).append(record)
+    blocks = [block for block in by_initial.values() if len(block) <= max_block_size]
+    skipped = len(records) - sum(len(block) for block in blocks)
+    if skipped:
+        logger.warning(f"Skipped {skipped} records in oversized blocks of {len(records)} records")
+    return blocks
+
+
+def resolve_partition(partition: int, partitions: int, records: Optional[Iterable[MatchRecord]] = None,
+                      threshold: float = DEFAULT_THRESHOLD,
+                      max_block_size: int = DEFAULT_MAX_BLOCK_SIZE) -> List[DuplicateCandidate]:
+    """
+    Find duplicate pairs among the blocks assigned to one partition.
+
+    Args:
+        partition: Partition index, from 0 to `partitions` - 1
+        partitions: Total number of partitions
+        records: Match records to consider (defaults to every loaded member)
+        threshold: Minimum score of a reported pair
+        max_block_size: Largest block compared pairwise
+
+    Returns:
+        List[DuplicateCandidate]: Pairs scoring at least `threshold`, each
+            with the lower member ID first
+    """
+    blocks: Dict[str, List[MatchRecord]] = {}
+    if records is None:
+        # Key members first, and build full records only for those in this partition
+        load_members()
+        for member in get_all_members():
+            keys = [
+                key for key in _blocking_keys(
+                    member.last_name.strip().upper(), member.date_of_birth[:4],
+                    normalize_phone(member.contact.phone), normalize_email(member.contact.email)
+                )
+                if partition_of(key, partitions) == partition
+            ]
+            if keys:
+                record = match_record(member)
+                for key in keys:
+                    blocks.setdefault(key, []).append(record)
+    else:
+        for record in records:
+            for key in blocking_keys(record):
+                if partition_of(key, partitions) == partition:
+                    blocks.setdefault(key, []).append(record)
+
+    seen = set()
+    candidates = []
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        for group in _split_block(block, max_block_size):
+            for i, a in enumerate(group):
+                for b in group[i + 1:]:
+                    pair = (a[0], b[0]) if a[0] < b[0] else (b[0], a[0])
+                    if pair in seen or a[0] == b[0]:
+                        continue
+                    seen.add(pair)
+                    score, fields = score_pair(a, b, threshold)
+                    if score >= threshold:
+                        candidates.append(DuplicateCandidate(
+                            member_id=pair[0], duplicate_id=pair[1], score=round(score, 4), fields=fields
+                        ))
+    return candidates
+
+
+def cluster_duplicates(candidates: Iterable[DuplicateCandidate]) -> List[List[str]]:
+    """Link duplicate pairs into clusters of member IDs with union-find."""
+    parent: Dict[str, str] = {}
+
+    def find(member_id: str) -> str:
+        root = member_id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while member_id != root:
+            parent[member_id], member_id = root, parent[member_id]
+        return root
+
+    for candidate in candidates:
+        a, b = find(candidate.member_id), find(candidate.duplicate_id)
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    clusters: Dict[str, List[str]] = {}
+    for member_id in parent:
+        clusters.setdefault(find(member_id), []).append(member_id)
+    return sorted(sorted(cluster) for cluster in clusters.values())
+
+
+def find_duplicates(member_ids: Optional[List[str]] = None, processes: int = 1,
+                    threshold: float = DEFAULT_THRESHOLD,
+                    max_block_size: int = DEFAULT_MAX_BLOCK_SIZE) -> List[DuplicateCandidate]:
+    """
+    Find likely duplicate members across the population.
+
+    With several processes, each worker reads the loaded population (from
+    the repository snapshot, or inherited when forked) and keeps only the
+    blocks of its partition, so no records are shipped between processes.
+
+    Args:
+        member_ids: Members to compare (defaults to every loaded member)
+        processes: Worker processes, one partition each
+        threshold: Minimum score of a reported pair
+        max_block_size: Largest block compared pairwise
+
+    Returns:
+        List[DuplicateCandidate]: Duplicate pairs, highest score first
+    """
+    load_members()
+    if member_ids is not None or processes <= 1:
+        members = get_all_members() if member_ids is None else filter(None, map(get_member, member_ids))
+        records = [match_record(member) for member in members]
+        if processes <= 1:
+            candidates = resolve_partition(0, 1, records, threshold, max_block_size)
+            return sorted(candidates, key=lambda candidate: -candidate.score)
+    else:
+        records = None
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(resolve_partition, partition, processes, records, threshold, max_block_size)
+            for partition in range(processes)
+        ]
+        # A pair can share keys in different partitions; keep one copy
+        unique: Dict[Tuple[str, str], DuplicateCandidate] = {}
+        for future in futures:
+            for candidate in future.result():
+                unique[(candidate.member_id, candidate.duplicate_id)] = candidate
+    return sorted(unique.values(), key=lambda candidate: -candidate.score)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find likely duplicate members")
+    parser.add_argument("--output", type=str, default=None, help="JSONL file for duplicate pairs")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum match score")
+    parser.add_argument("--max_block_size", type=int, default=DEFAULT_MAX_BLOCK_SIZE,
+                        help="Largest block compared pairwise")
+
+    args = parser.parse_args()
+
+    candidates = find_duplicates(processes=args.processes, threshold=args.threshold,
+                                 max_block_size=args.max_block_size)
+    clusters = cluster_duplicates(candidates)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            for candidate in candidates:
+                f.write(candidate.model_dump_json() + "\n")
+    else:
+        for candidate in candidates:
+            print(json.dumps(candidate.model_dump()))
+    print(f"Found {len(candidates)} duplicate pairs in {len(clusters)} clusters")
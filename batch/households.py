@@ -0,0 +1,278 @@
+"""
+Household-level batch processing and notification consolidation.
+
+Members who share a home and a program case are grouped into households by
+normalized address. Checks on documents that cover the whole household,
+such as proof of address, run once per household: a shared document on
+file for any member counts for every member. Each member then runs through
+the workflow, and their reminders are merged into one notice per household
+per channel and language instead of one message per member.
+
+The member model carries no case number, so the program stands in for the
+case: members at the same address on different programs stay separate.
+
+Usage:
+    python -m batch.households --output data/household_notices.jsonl --processes 4
+"""
+
+import argparse
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+
+from main import CompiledWorkflow, get_workflow, new_state
+from models.member import Address, Member
+from storage.member_repository import get_all_members, get_member, load_members
+from utils.logger import setup_logger
+from utils.tracing import TRACER
+
+# Set up logger
+logger = setup_logger()
+
+# Documents that one submission covers for the whole household
+SHARED_DOCUMENTS = ("address_proof",)
+
+# Street words reduced to their USPS abbreviations so spelling variants match
+_STREET_ABBREVIATIONS = {
+    "STREET": "ST", "AVENUE": "AVE", "ROAD": "RD", "DRIVE": "DR", "BOULEVARD": "BLVD",
+    "LANE": "LN", "COURT": "CT", "PLACE": "PL", "TERRACE": "TER", "PARKWAY": "PKWY",
+    "HIGHWAY": "HWY", "CIRCLE": "CIR", "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "APARTMENT": "APT", "SUITE": "STE", "#": "APT"
+}
+_ADDRESS_TOKEN = re.compile(r"[A-Z0-9]+|#")
+
+
+class Household(BaseModel):
+    """Members sharing a normalized address and program."""
+    household_id: str
+    address_key: str
+    program: str
+    member_ids: List[str]
+
+
+class HouseholdNotice(BaseModel):
+    """One consolidated notice for a household on one channel, in one language."""
+    household_id: str
+    channel: str
+    language: str
+    recipient_id: str
+    member_ids: List[str]
+    reminders: List[str]
+
+
+class HouseholdResult(BaseModel):
+    """Outcome of processing one household."""
+    household_id: str
+    member_ids: List[str]
+    shared_documents: List[str]
+    compliance_status: Dict[str, Optional[str]]
+    member_reminders: int
+    notices: List[HouseholdNotice]
+
+
+def normalize_address(address: Address) -> str:
+    """
+    Normalize an address for household matching.
+
+    Case, punctuation and whitespace are ignored, common street words are
+    abbreviated and ZIP+4 codes are cut to five digits.
+
+    Args:
+        address: The member's address
+
+    Returns:
+        str: A key equal for spelling variants of the same address
+    """
+    street = " ".join(filter(None, (address.street1, address.street2)))
+    tokens = [_STREET_ABBREVIATIONS.get(token, token) for token in _ADDRESS_TOKEN.findall(street.upper())]
+    city = " ".join(_ADDRESS_TOKEN.findall(address.city.upper()))
+    return "|".join((" ".join(tokens), city, address.state.strip().upper(), address.zip_code.strip()[:5]))
+
+
+def household_key(member: Member) -> Tuple[str, str]:
+    """Return the (address key, program) pair that identifies a member's household."""
+    return normalize_address(member.address), member.eligibility.program
+
+
+def group_households(members: Iterable[Member]) -> List[Household]:
+    """
+    Cluster members into households in a single pass.
+
+    Args:
+        members: Members to group
+
+    Returns:
+        List[Household]: Households in order of their first member; members
+            with no housemates form single-member households
+    """
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for member in members:
+        groups.setdefault(household_key(member), []).append(member.id)
+    return [
+        Household(
+            household_id=hashlib.sha1(f"{address_key}|{program}".encode("utf-8")).hexdigest()[:16],
+            address_key=address_key,
+            program=program,
+            member_ids=member_ids
+        )
+        for (address_key, program), member_ids in groups.items()
+    ]
+
+
+def shared_documents_on_file(members: List[Member]) -> Dict[str, Dict]:
+    """
+    Run the shared document check once for a household.
+
+    Returns:
+        Dict[str, Dict]: Shared document type -> the document record of the
+            first member who has it on file, tagged with that member's ID
+    """
+    on_file = {}
+    for member in members:
+        for document_type in SHARED_DOCUMENTS:
+            record = (member.documents or {}).get(document_type)
+            if record is not None and document_type not in on_file:
+                on_file[document_type] = {**record, "household_member_id": member.id}
+    return on_file
+
+
+def consolidate_notices(household: Household, results: List[Dict]) -> List[HouseholdNotice]:
+    """
+    Merge members' reminders into one notice per channel and language.
+
+    Each notice goes to the first member on that channel and language and
+    lists every housemate's reminders under their first name.
+
+    Args:
+        household: The household
+        results: Final workflow states of the household's members
+
+    Returns:
+        List[HouseholdNotice]: Notices to send, at most one per (channel, language)
+    """
+    notices: Dict[Tuple[str, str], HouseholdNotice] = {}
+    for result in results:
+        reminders = result.get("reminders") or []
+        if not reminders:
+            continue
+        member = result["member"]
+        key = (member.contact.preferred_contact_method, member.contact.preferred_language)
+        notice = notices.get(key)
+        if notice is None:
+            notice = notices[key] = HouseholdNotice(
+                household_id=household.household_id,
+                channel=key[0],
+                language=key[1],
+                recipient_id=member.id,
+                member_ids=[],
+                reminders=[]
+            )
+        notice.member_ids.append(member.id)
+        notice.reminders.extend(f"{member.first_name}: {reminder}" for reminder in reminders)
+    return list(notices.values())
+
+
+def process_household(household: Household, workflow: Optional[CompiledWorkflow] = None) -> HouseholdResult:
+    """
+    Process every member of a household and consolidate their notices.
+
+    Shared documents found on file for one member are added to each
+    housemate's copy of the member record before the workflow runs, so the
+    document, reminder and compliance steps treat them as submitted. The
+    repository is not modified.
+
+    Args:
+        household: The household to process
+        workflow: Compiled workflow to run (defaults to the process-wide one)
+
+    Returns:
+        HouseholdResult: Per-member compliance status and the consolidated notices
+    """
+    workflow = workflow or get_workflow()
+    members = [member for member in map(get_member, household.member_ids) if member is not None]
+    shared = shared_documents_on_file(members)
+
+    results = []
+    with TRACER.span("process_household", household_id=household.household_id, members=len(members)):
+        for member in members:
+            missing_shared = {doc: record for doc, record in shared.items() if doc not in (member.documents or {})}
+            if missing_shared:
+                member = member.model_copy(update={"documents": {**(member.documents or {}), **missing_shared}})
+            results.append(workflow.run(new_state(member)))
+
+    return HouseholdResult(
+        household_id=household.household_id,
+        member_ids=[member.id for member in members],
+        shared_documents=sorted(shared),
+        compliance_status={result["member"].id: result.get("compliance_status") for result in results},
+        member_reminders=sum(1 for result in results if result.get("reminders")),
+        notices=consolidate_notices(household, results)
+    )
+
+
+def _init_worker() -> None:
+    load_members()
+    get_workflow().warm_up()
+
+
+def run_households(member_ids: Optional[List[str]] = None, processes: int = 1,
+                   output: Optional[str] = None) -> Dict[str, int]:
+    """
+    Group members into households, process each household and write its notices.
+
+    Args:
+        member_ids: Members to process (defaults to every loaded member)
+        processes: Worker processes; households are processed whole by one worker
+        output: Optional JSONL file receiving one line per notice
+
+    Returns:
+        Dict[str, int]: Members, households, members who had reminders, and
+            notices sent after consolidation
+    """
+    load_members()
+    members = get_all_members() if member_ids is None else [m for m in map(get_member, member_ids) if m is not None]
+    households = group_households(members)
+    logger.info(f"Grouped {len(members)} members into {len(households)} households")
+
+    if processes > 1:
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker)
+        results = pool.map(process_household, households, chunksize=max(1, len(households) // (processes * 8)))
+    else:
+        pool = None
+        results = map(process_household, households)
+
+    stats = {"members": len(members), "households": len(households), "member_reminders": 0, "notices": 0}
+    out = None
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        out = open(output, "w")
+    try:
+        for result in results:
+            stats["member_reminders"] += result.member_reminders
+            stats["notices"] += len(result.notices)
+            if out is not None:
+                for notice in result.notices:
+                    out.write(notice.model_dump_json() + "\n")
+    finally:
+        if out is not None:
+            out.close()
+        if pool is not None:
+            pool.shutdown()
+
+    logger.info(f"Sent {stats['notices']} household notices in place of {stats['member_reminders']} member notices")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process members by household and consolidate notices")
+    parser.add_argument("--output", type=str, default=None, help="JSONL file for the consolidated notices")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes")
+    parser.add_argument("--member_ids", type=str, nargs="*", default=None, help="Members to process (default: all)")
+
+    args = parser.parse_args()
+
+    stats = run_households(args.member_ids, args.processes, args.output)
+    print(f"Household run complete: {stats}")
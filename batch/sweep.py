@@ -0,0 +1,230 @@
+"""
+Resumable batch sweep over the member population.
+
+Every member is enqueued in a durable job queue and worker processes lease,
+process and acknowledge members one at a time. A killed sweep is resumed by
+running it again against the same queue file; completed members are skipped.
+
+Usage:
+    python -m batch.sweep --queue data/sweep.db --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from main import get_workflow, process_member
+from storage.audit_store import AuditStore
+from storage.checkpoint import Checkpointer, SQLiteCheckpointStore
+from storage.job_queue import JobQueue, LEASED, LOST, PENDING
+from storage.member_repository import get_all_member_ids, load_members
+from storage.work_hours_ledger import WorkHoursLedger, set_work_hours_ledger
+from utils.logger import setup_logger
+from utils.memory_profiler import MEMORY_PROFILER, enable_memory_profiling, merge_reports
+from utils.tracing import TRACER, extract, inject
+
+# Set up logger
+logger = setup_logger()
+
+
+def _summarize(result: dict) -> dict:
+    """Keep the fields of a workflow result worth storing with the job."""
+    return {
+        "compliance_status": result.get("compliance_status"),
+        "compliance_issues": result.get("compliance_issues") or [],
+        "reminders_sent": result.get("reminders_sent", False),
+        "audit_log_entries": len(result.get("audit_log", []))
+    }
+
+
+def run_worker(queue_path: str, worker_id: Optional[str] = None, visibility_timeout: float = 300.0,
+               max_attempts: int = 3, poll_interval: float = 1.0,
+               checkpoint_path: Optional[str] = None, work_hours_path: Optional[str] = None,
+               audit_root: Optional[str] = None, trace_context: Optional[Dict[str, Any]] = None,
+               memory_report: Optional[str] = None) -> int:
+    """
+    Lease and process members until the queue has no pending or leased items.
+
+    Args:
+        queue_path: Path to the job queue database
+        worker_id: Identifier for this worker (defaults to host:pid)
+        visibility_timeout: Lease duration in seconds
+        max_attempts: Attempts before an item is dead-lettered
+        poll_interval: Seconds to wait when all remaining items are leased elsewhere
+        checkpoint_path: Optional SQLite file for per-step checkpoints, so a retried
+            member resumes from its last completed agent step
+        work_hours_path: Optional work-hours ledger database; members' reported
+            hours for the current month are taken from it
+        audit_root: Optional audit store directory; each processed member's
+            audit log is appended to it. Only one process may write a store
+        trace_context: Optional parent span context from `utils.tracing.inject`,
+            so member spans join the caller's trace
+        memory_report: Optional path; when set, memory profiling is enabled and a
+            per-member and per-agent memory report is written there on exit
+
+    Returns:
+        int: Number of members this worker completed
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(queue_path, visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+    checkpointer = None
+    if checkpoint_path:
+        # Checkpoints belong to this sweep's queue, so another sweep sharing the store never resumes them
+        checkpointer = Checkpointer(SQLiteCheckpointStore(checkpoint_path), run_id=os.path.abspath(queue_path))
+    ledger = WorkHoursLedger(work_hours_path) if work_hours_path else None
+    set_work_hours_ledger(ledger)
+    audit_store = AuditStore(audit_root) if audit_root else None
+    load_members()
+    get_workflow().warm_up()
+    completed = 0
+    if memory_report:
+        enable_memory_profiling()
+
+    try:
+        with TRACER.attach(extract(trace_context)):
+            while True:
+                jobs = queue.lease(worker_id)
+                if not jobs:
+                    stats = queue.stats()
+                    if stats[PENDING] == 0 and stats[LEASED] == 0:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                job = jobs[0]
+                try:
+                    result = process_member(job.member_id, checkpointer)
+                except Exception as e:
+                    status = queue.fail(job, str(e))
+                    if status == LOST:
+                        logger.warning(f"Worker {worker_id} lost lease on member {job.member_id} "
+                                       f"before recording failure: {str(e)}")
+                    else:
+                        logger.error(f"Worker {worker_id} failed member {job.member_id} "
+                                     f"(attempt {job.attempts}, now {status}): {str(e)}")
+                    continue
+
+                # Only the worker whose ack lands writes the audit log, so a member
+                # re-leased after a lost lease is not audited twice
+                if queue.ack(job, _summarize(result)):
+                    completed += 1
+                    if audit_store is not None:
+                        audit_store.append_state(result)
+                else:
+                    logger.warning(f"Worker {worker_id} lost lease on member {job.member_id}")
+    finally:
+        queue.close()
+        if ledger is not None:
+            set_work_hours_ledger(None)
+            ledger.close()
+        if audit_store is not None:
+            audit_store.close()
+        TRACER.flush()
+        if memory_report:
+            MEMORY_PROFILER.write_report(memory_report)
+            logger.info(f"Worker {worker_id} wrote memory report to {memory_report}")
+
+    logger.info(f"Worker {worker_id} finished after completing {completed} members")
+    return completed
+
+
+def run_sweep(queue_path: str, workers: int = 1, member_ids: Optional[List[str]] = None,
+              visibility_timeout: float = 300.0, max_attempts: int = 3,
+              checkpoint_path: Optional[str] = None, work_hours_path: Optional[str] = None,
+              audit_root: Optional[str] = None, memory_report: Optional[str] = None) -> Dict[str, int]:
+    """
+    Enqueue members and process them with a pool of worker processes.
+
+    Args:
+        queue_path: Path to the job queue database
+        workers: Number of worker processes
+        member_ids: Members to sweep (defaults to every loaded member)
+        visibility_timeout: Lease duration in seconds
+        max_attempts: Attempts before an item is dead-lettered
+        checkpoint_path: Optional SQLite file for per-step checkpoints
+        work_hours_path: Optional work-hours ledger database for the members'
+            reported hours
+        audit_root: Optional audit store directory for the members' audit
+            logs; with several workers each writes its own store in a
+            `worker-<n>` subdirectory
+        memory_report: Optional path for a memory profiling report merged
+            across all workers
+
+    Returns:
+        Dict[str, int]: Final queue counts by status
+    """
+    if member_ids is None:
+        load_members()
+        member_ids = get_all_member_ids()
+
+    queue = JobQueue(queue_path, visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+    added = queue.enqueue(member_ids)
+    logger.info(f"Sweep enqueued {added} new members ({len(member_ids) - added} already queued)")
+
+    worker_reports = [f"{memory_report}.worker{index}" for index in range(max(workers, 1))] if memory_report else []
+    if workers <= 1:
+        run_worker(queue_path, visibility_timeout=visibility_timeout, max_attempts=max_attempts,
+                   checkpoint_path=checkpoint_path, work_hours_path=work_hours_path, audit_root=audit_root,
+                   trace_context=inject(), memory_report=worker_reports[0] if memory_report else None)
+    else:
+        processes = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(queue_path, None, visibility_timeout, max_attempts),
+                kwargs={
+                    "checkpoint_path": checkpoint_path,
+                    "work_hours_path": work_hours_path,
+                    "audit_root": os.path.join(audit_root, f"worker-{index}") if audit_root else None,
+                    "trace_context": inject(),
+                    "memory_report": worker_reports[index] if memory_report else None
+                }
+            )
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    if memory_report:
+        reports = []
+        for path in worker_reports:
+            if os.path.exists(path):
+                with open(path) as f:
+                    reports.append(json.load(f))
+                os.remove(path)
+        with open(memory_report, "w") as f:
+            json.dump(merge_reports(reports), f, indent=2)
+        logger.info(f"Memory report written to {memory_report}")
+
+    stats = queue.stats()
+    queue.close()
+    logger.info(f"Sweep finished: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable Medicaid Assist batch sweep")
+    parser.add_argument("--queue", type=str, default="data/sweep.db", help="Path to the job queue database")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--visibility_timeout", type=float, default=300.0, help="Lease duration in seconds")
+    parser.add_argument("--max_attempts", type=int, default=3, help="Attempts before dead-lettering")
+    parser.add_argument("--checkpoints", type=str, default=None, help="Path to a per-step checkpoint database")
+    parser.add_argument("--work_hours", type=str, default=None,
+                        help="Work-hours ledger database to take members' reported hours from")
+    parser.add_argument("--audit_root", type=str, default=None,
+                        help="Audit store directory for the members' audit logs")
+    parser.add_argument("--memory_report", type=str, default=None,
+                        help="Profile memory and write a JSON report to this path")
+
+    args = parser.parse_args()
+
+    stats = run_sweep(args.queue, args.workers, visibility_timeout=args.visibility_timeout,
+                      max_attempts=args.max_attempts, checkpoint_path=args.checkpoints,
+                      work_hours_path=args.work_hours, audit_root=args.audit_root,
+                      memory_report=args.memory_report)
+    print(f"Sweep complete: {stats}")
@@ -0,0 +1,247 @@
+"""
+Benchmark suite for the workflow, agents, member repository and Member model.
+
+Every benchmark runs against a synthetic population of each requested size.
+Per-member benchmarks (workflow, agents, lookups) process up to `--max_ops`
+members sampled from the population; population-wide benchmarks (status
+scans, construction, serialization) cover every member. Results are written
+as JSON and can be compared against a stored baseline to flag regressions.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 1000000 --output results.json
+    python -m benchmarks.run_benchmarks --baseline baseline.json --threshold 0.1
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from pydantic import BaseModel
+from langchain_community.llms.fake import FakeListLLM
+
+from main import AGENT_FACTORIES, CompiledWorkflow, new_state, process_member, simulate_workflow
+from models.member import Member, dump_members_json, load_members_json
+from storage import member_repository
+
+# Members validated per chunk in construction benchmarks, bounding memory at 1M members
+CHUNK_SIZE = 10000
+
+
+class BenchmarkResult(BaseModel):
+    """Timing of one benchmark at one population size."""
+    name: str
+    size: int
+    ops: int
+    repeats: int
+    best_seconds: float
+    median_seconds: float
+    per_op_us: float
+
+
+def _timed(fn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _bench_per_member(step: Callable[[Member], None], members: List[Member]) -> Callable[[], float]:
+    def run() -> float:
+        return _timed(lambda: [step(member) for member in members])
+    return run
+
+
+def _bench_construction(members: List[Member]) -> Callable[[], float]:
+    def run() -> float:
+        elapsed = 0.0
+        for start in range(0, len(members), CHUNK_SIZE):
+            records = [member.model_dump() for member in members[start:start + CHUNK_SIZE]]
+            elapsed += _timed(lambda: [Member.model_validate(record) for record in records])
+        return elapsed
+    return run
+
+
+def _bench_round_trip(members: List[Member], trusted: bool) -> Callable[[], float]:
+    """JSON round-trip every member, per member with validation or in bulk on the trusted path."""
+    def run() -> float:
+        elapsed = 0.0
+        for start in range(0, len(members), CHUNK_SIZE):
+            chunk = members[start:start + CHUNK_SIZE]
+            if trusted:
+                elapsed += _timed(lambda: load_members_json(dump_members_json(chunk)))
+            else:
+                elapsed += _timed(lambda: [Member.model_validate_json(member.model_dump_json()) for member in chunk])
+        return elapsed
+    return run
+
+
+def build_benchmarks(members: List[Member], sample: List[Member], lookups: List[str]) -> Dict[str, tuple]:
+    """
+    Build the benchmarks for one population.
+
+    Returns:
+        Dict[str, tuple]: Benchmark name -> (ops per run, run function returning seconds)
+    """
+    llm = FakeListLLM(responses=["ok"])
+    compiled = CompiledWorkflow(llm)
+    compiled.warm_up()
+    benchmarks = {
+        "workflow.simulate_workflow": (
+            len(sample), _bench_per_member(lambda member: simulate_workflow(new_state(member)), sample)
+        ),
+        "workflow.compiled_agents": (
+            len(sample), _bench_per_member(lambda member: compiled.run(new_state(member)), sample)
+        ),
+        "workflow.process_member": (
+            len(sample), _bench_per_member(lambda member: process_member(member.id), sample)
+        ),
+        "repository.get_member": (
+            len(lookups), lambda: _timed(lambda: [member_repository.get_member(member_id) for member_id in lookups])
+        ),
+        "repository.get_members_by_status": (
+            1, lambda: _timed(lambda: member_repository.get_members_by_status("renewal_needed"))
+        ),
+        "repository.get_members_renewal_due_soon": (
+            1, lambda: _timed(lambda: member_repository.get_members_renewal_due_soon(60))
+        ),
+        "member.construct": (len(members), _bench_construction(members)),
+        "member.model_dump": (
+            len(members), lambda: _timed(lambda: [member.model_dump() for member in members])
+        ),
+        "member.model_dump_json": (
+            len(members), lambda: _timed(lambda: [member.model_dump_json() for member in members])
+        ),
+        "member.round_trip_validated": (len(members), _bench_round_trip(members, trusted=False)),
+        "member.round_trip_trusted": (len(members), _bench_round_trip(members, trusted=True))
+    }
+    for name, factory in AGENT_FACTORIES:
+        agent = factory(llm)
+        benchmarks[f"agent.{name}"] = (
+            len(sample), _bench_per_member(lambda member, agent=agent: agent(new_state(member)), sample)
+        )
+    return benchmarks
+
+
+def run_benchmarks(sizes: List[int], repeats: int = 3, max_ops: int = 10000, seed: int = 0,
+                   only: Optional[List[str]] = None) -> List[BenchmarkResult]:
+    """
+    Run the benchmark suite at each population size.
+
+    Args:
+        sizes: Population sizes
+        repeats: Timed runs per benchmark; best and median are reported
+        max_ops: Members processed by per-member benchmarks
+        seed: Seed for the synthetic population and sampling
+        only: Optional benchmark name prefixes to run
+
+    Returns:
+        List[BenchmarkResult]: One result per benchmark and size
+    """
+    results = []
+    for size in sizes:
+        print(f"Generating {size} members...", file=sys.stderr)
+        population = member_repository.generate_synthetic_members(size, seed)
+        member_repository.set_members(population)
+        members = list(population.values())
+        rng = random.Random(seed)
+        sample = rng.sample(members, min(max_ops, size))
+        lookups = [rng.choice(members).id for _ in range(max_ops)]
+
+        for name, (ops, run) in build_benchmarks(members, sample, lookups).items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            timings = [run() for _ in range(repeats)]
+            result = BenchmarkResult(
+                name=name,
+                size=size,
+                ops=ops,
+                repeats=repeats,
+                best_seconds=min(timings),
+                median_seconds=statistics.median(timings),
+                per_op_us=statistics.median(timings) / max(ops, 1) * 1e6
+            )
+            results.append(result)
+            print(f"{name:45s} size={size:<9d} ops={ops:<9d} {result.per_op_us:12.2f} us/op", file=sys.stderr)
+
+        del population, members, sample
+        member_repository.set_members({})
+    return results
+
+
+def compare_results(results: List[BenchmarkResult], baseline: List[BenchmarkResult],
+                    threshold: float = 0.10) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    Best-of-repeats times are compared, as they are the least sensitive to
+    background noise.
+
+    Returns:
+        List[str]: A description of each benchmark whose best per-op time
+            grew by more than `threshold` (a fraction) over the baseline
+    """
+    previous = {(result.name, result.size): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result.name, result.size))
+        if base is None or base.best_seconds <= 0:
+            continue
+        base_us = base.best_seconds / max(base.ops, 1) * 1e6
+        current_us = result.best_seconds / max(result.ops, 1) * 1e6
+        change = current_us / base_us - 1
+        if change > threshold:
+            regressions.append(
+                f"{result.name} at {result.size} members: {base_us:.2f} -> {current_us:.2f} us/op (+{change:.0%})"
+            )
+    return regressions
+
+
+def write_results(results: List[BenchmarkResult], path: str) -> None:
+    """Write results with environment details as JSON."""
+    with open(path, "w") as f:
+        json.dump({
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": [result.model_dump() for result in results]
+        }, f, indent=2)
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    """Load results written by `write_results`."""
+    with open(path) as f:
+        return [BenchmarkResult.model_validate(result) for result in json.load(f)["results"]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Medicaid Assist benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000], help="Population sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--max_ops", type=int, default=10000, help="Members processed by per-member benchmarks")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic population seed")
+    parser.add_argument("--only", type=str, nargs="*", default=None, help="Benchmark name prefixes to run")
+    parser.add_argument("--output", type=str, default="benchmark_results.json", help="Path for the JSON results")
+    parser.add_argument("--baseline", type=str, default=None, help="Baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed per-op slowdown before flagging")
+
+    args = parser.parse_args()
+
+    # Per-member INFO logging would dominate the timings
+    logging.getLogger("medicaid_assist").setLevel(logging.WARNING)
+
+    results = run_benchmarks(args.sizes, args.repeats, args.max_ops, args.seed, args.only)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_results(results, load_results(args.baseline), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
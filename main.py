@@ -5,8 +5,10 @@ This integrates six specialized agents in a LangGraph workflow.
 """
 
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Any, TypedDict, Optional
+from typing import Dict, List, Any, TypedDict, Optional, Callable, Tuple
 
 # Import agent modules
 from agents.eligibility_checker import create_eligibility_checker_agent
@@ -19,28 +21,212 @@ from agents.audit_compliance import create_audit_compliance_agent
 # Import utilities
 from utils.logger import setup_logger
 from models.member import Member
+from models.documents import split_documents
 from models.state import AgentState
+from rules.medicaid_rules import evaluate_member
+from storage.checkpoint import Checkpointer
+from storage.work_hours_ledger import get_work_hours_ledger
+from utils.memory_profiler import MEMORY_PROFILER
+from utils.metrics import METRICS
+from utils.resilience import ResiliencePolicy, resilient_steps
+from utils.tracing import TRACER
 
 # Set up logging
 logger = setup_logger()
 
-def create_workflow():
+def create_workflow(checkpointer: Optional[Checkpointer] = None):
     """
     Create a simple workflow function that doesn't require LangGraph.
     This allows the demo to work without external dependencies.
+    
+    The function runs the process-wide compiled workflow, so nothing is
+    rebuilt per call.
+    
+    Args:
+        checkpointer: Optional checkpointer that persists the state after each
+            agent step so a failed member resumes from the last completed step
     """
+    compiled = get_workflow()
+    
     def workflow(state: AgentState) -> AgentState:
         """Simple workflow that processes a member through all agents."""
-        return simulate_workflow(state)
+        return compiled.run(state, checkpointer)
     
     return workflow
 
-def process_member(member_id: str) -> Dict[str, Any]:
+class CompiledWorkflow:
+    """
+    A workflow whose agent steps are built once and shared by all threads.
+    
+    With an LLM, each `create_*_agent` factory runs once, so prompt templates,
+    chains and the LLM client are constructed up front. Each agent gets the
+    LLM behind a deadline, hedging, retries and a circuit breaker, and falls
+    back to its simulated step while its LLM is unavailable. Without an LLM,
+    the simulated steps are used. Steps hold no per-member state, so a
+    single instance can serve concurrent members.
+    """
+    
+    def __init__(self, llm: Optional[Any] = None, policy: Optional[ResiliencePolicy] = None):
+        """
+        Args:
+            llm: Language model for the real agents; None for the simulated workflow
+            policy: Deadline, hedging, retry and circuit breaker settings for LLM calls
+        """
+        self.llm = llm
+        if llm is None:
+            self.steps = list(SIMULATED_STEPS)
+        else:
+            self.steps = resilient_steps(llm, AGENT_FACTORIES, SIMULATED_STEPS, policy)
+        self.warmed_up = False
+        self._warm_up_lock = threading.Lock()
+    
+    def run(self, state: AgentState, checkpointer: Optional[Checkpointer] = None) -> AgentState:
+        """
+        Run a member's state through every step.
+        
+        Args:
+            state: The initial state; it is copied, not modified
+            checkpointer: Optional checkpointer for mid-workflow resume
+            
+        Returns:
+            The final state
+        """
+        # Steps append to the state's lists in place, so copy those too
+        state = {key: list(value) if isinstance(value, list) else value for key, value in state.items()}
+        return run_workflow_steps(state, self.steps, checkpointer)
+    
+    def warm_up(self) -> None:
+        """
+        Run a synthetic member through every step once, outside metrics and
+        tracing, so lazy imports, compiled rules and caches are primed before
+        the first real member. LLM-backed steps run their simulated rule, so
+        warming up never calls the model.
+        """
+        with self._warm_up_lock:
+            if self.warmed_up:
+                return
+            from storage.member_repository import generate_synthetic_members
+            start = time.perf_counter()
+            for member in generate_synthetic_members(len(self.steps), seed=0).values():
+                state = new_state(member)
+                for _, step in self.steps:
+                    state = getattr(step, "fallback", step)(state)
+            self.warmed_up = True
+            logger.info(f"Workflow warmed up in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+# Process-wide simulated workflow, built on first use
+_workflow: Optional[CompiledWorkflow] = None
+_workflow_lock = threading.Lock()
+
+def get_workflow() -> CompiledWorkflow:
+    """Get the process-wide compiled workflow, building it once."""
+    global _workflow
+    if _workflow is None:
+        with _workflow_lock:
+            if _workflow is None:
+                _workflow = CompiledWorkflow()
+    return _workflow
+
+def set_workflow(workflow: CompiledWorkflow) -> None:
+    """Replace the process-wide workflow, e.g. with one built around a real LLM."""
+    global _workflow
+    with _workflow_lock:
+        _workflow = workflow
+
+def new_state(member: Member) -> AgentState:
+    """Build the initial workflow state for a member."""
+    return AgentState(
+        member=member,
+        eligibility_verified=False,
+        work_requirements_needed=False,
+        documents_required=[],
+        documents_submitted=[],
+        work_hours_reported=0,
+        interactions=[],
+        audit_log=[]
+    )
+
+def run_workflow_steps(state: AgentState, steps: List[Tuple[str, Callable[[AgentState], AgentState]]],
+                       checkpointer: Optional[Checkpointer] = None) -> AgentState:
+    """
+    Run a member's state through a sequence of named agent steps.
+    
+    When a checkpointer is given, any checkpoint left by an earlier failed run
+    is restored first and the steps it already completed are skipped, unless
+    the member's data has changed since, in which case it is discarded. The
+    checkpoint is cleared once the final step succeeds.
+    
+    Args:
+        state: The initial state
+        steps: Ordered (agent name, step function) pairs
+        checkpointer: Optional checkpointer for mid-workflow resume
+        
+    Returns:
+        The final state
+    """
+    member_id = state["member"].id
+    step_names = [name for name, _ in steps]
+    start = 0
+    
+    if checkpointer is not None:
+        restored = checkpointer.restore(member_id)
+        if restored and restored[1]["member"] != state["member"]:
+            logger.info(f"Discarding checkpoint for member {member_id}: the member changed since it was saved")
+            checkpointer.clear(member_id)
+            restored = None
+        if restored and restored[0] in step_names:
+            completed_step, state = restored
+            start = step_names.index(completed_step) + 1
+            logger.info(f"Resuming workflow for member {member_id} after {completed_step}")
+    
+    for name, step in steps[start:]:
+        state = run_step(name, step, state)
+        if checkpointer is not None:
+            checkpointer.save(member_id, name, state)
+    
+    if checkpointer is not None:
+        checkpointer.clear(member_id)
+    
+    return state
+
+def run_step(name: str, step: Callable[[AgentState], AgentState], state: AgentState) -> AgentState:
+    """
+    Run one agent step, recording its latency, outcome and branch taken.
+    
+    The branch is the status or result of the audit entries the step
+    appended, or "skipped" when it appended none.
+    """
+    audit_count = len(state.get("audit_log", []))
+    with TRACER.span(f"agent.{name}", agent=name) as span, MEMORY_PROFILER.track(f"agent.{name}"):
+        start = time.perf_counter()
+        try:
+            state = step(state)
+        except Exception:
+            METRICS.observe("medicaid_agent_step_seconds", time.perf_counter() - start, agent=name)
+            METRICS.inc("medicaid_agent_steps_total", agent=name, outcome="error")
+            raise
+        METRICS.observe("medicaid_agent_step_seconds", time.perf_counter() - start, agent=name)
+        METRICS.inc("medicaid_agent_steps_total", agent=name, outcome="success")
+        
+        new_entries = state.get("audit_log", [])[audit_count:]
+        branches = sorted({str(entry.get("status") or entry.get("result") or "completed") for entry in new_entries})
+        for branch in branches or ("skipped",):
+            METRICS.inc("medicaid_agent_branch_total", agent=name, branch=branch)
+        span.set_attribute("branch", ",".join(branches) or "skipped")
+    return state
+
+def process_member(member_id: str, checkpointer: Optional[Checkpointer] = None,
+                   workflow: Optional[CompiledWorkflow] = None) -> Dict[str, Any]:
     """
     Process a member through the Medicaid assist workflow.
     
+    If a work-hours ledger is installed, the member's reported hours for the
+    current month come from it.
+    
     Args:
         member_id: The ID of the member to process
+        checkpointer: Optional checkpointer used to resume a failed run
+        workflow: Compiled workflow to run (defaults to the process-wide one)
         
     Returns:
         The final state after workflow completion
@@ -52,46 +238,42 @@ def process_member(member_id: str) -> Dict[str, Any]:
     if not member:
         raise ValueError(f"Member {member_id} not found")
     
-    # Initialize workflow
-    workflow = create_workflow()
+    ledger = get_work_hours_ledger()
+    if ledger is not None:
+        member = ledger.apply_to_member(member)
     
-    # Set initial state
-    initial_state = AgentState(
-        member=member,
-        eligibility_verified=False,
-        work_requirements_needed=False,
-        documents_required=[],
-        documents_submitted=[],
-        work_hours_reported=0,
-        interactions=[],
-        audit_log=[]
-    )
+    workflow = workflow or get_workflow()
+    initial_state = new_state(member)
     
     # Execute the workflow
     logger.info(f"Starting workflow for member {member_id}")
-    result = workflow(initial_state)
+    with TRACER.span("process_member", member_id=member_id) as span, MEMORY_PROFILER.track("process_member"):
+        start = time.perf_counter()
+        try:
+            result = workflow.run(initial_state, checkpointer)
+        except Exception:
+            METRICS.observe("medicaid_process_member_seconds", time.perf_counter() - start)
+            METRICS.inc("medicaid_members_processed_total", outcome="error")
+            raise
+        METRICS.observe("medicaid_process_member_seconds", time.perf_counter() - start)
+        METRICS.inc("medicaid_members_processed_total", outcome="success")
+        span.set_attribute("compliance_status", result.get("compliance_status"))
     logger.info(f"Workflow completed for member {member_id}")
     
     return result
 
-def simulate_workflow(state: AgentState) -> AgentState:
+def simulate_eligibility_check(state: AgentState) -> AgentState:
     """
-    Simulate the workflow for demonstration purposes without using an actual LLM.
-    This allows the demo to run without requiring API keys.
+    Simulate the eligibility checker agent.
     
     Args:
-        state: The initial state
+        state: The current workflow state
         
     Returns:
-        The simulated final state
+        The updated state
     """
-    logger.info("Simulating workflow for demonstration")
-    
-    # Make a copy of the state to avoid modifying the original
-    state = state.copy()
     member = state["member"]
     
-    # Step 1: Eligibility Checker
     logger.info("Simulating eligibility check")
     state["eligibility_verified"] = True
     
@@ -117,17 +299,26 @@ def simulate_workflow(state: AgentState) -> AgentState:
         "status": "completed"
     })
     
-    # Step 2: Route based on eligibility results
+    return state
+
+def simulate_document_check(state: AgentState) -> AgentState:
+    """
+    Simulate the document assistant agent when documents are required.
+    
+    Args:
+        state: The current workflow state
+        
+    Returns:
+        The updated state
+    """
+    member = state["member"]
+    
     if state["documents_required"]:
         # Document Assistant processing
         logger.info("Simulating document assistant")
         
-        # Simulate document checking
-        documents_submitted = []
-        for doc in state["documents_required"]:
-            # Check if the document is already on file
-            if member.documents and doc in member.documents:
-                documents_submitted.append(doc)
+        # Check which required documents are already on file
+        documents_submitted, _ = split_documents(state["documents_required"], member.documents or {})
         
         state["documents_submitted"] = documents_submitted
         
@@ -149,14 +340,28 @@ def simulate_workflow(state: AgentState) -> AgentState:
             "status": "completed" if len(documents_submitted) == len(state["documents_required"]) else "incomplete"
         })
     
-    # Step 3: Check work requirements if applicable
+    return state
+
+def simulate_work_requirement_check(state: AgentState) -> AgentState:
+    """
+    Simulate the work requirement agent for members with work requirements.
+    
+    Args:
+        state: The current workflow state
+        
+    Returns:
+        The updated state
+    """
+    member = state["member"]
+    
     if member.work_requirement.required:
         logger.info("Simulating work requirement check")
         
         # Check if enough hours are reported
+        rules = evaluate_member(member, state)
         hours_reported = member.work_requirement.hours_reported
-        hours_required = 80
-        state["work_requirements_met"] = hours_reported >= hours_required
+        hours_required = member.work_requirement.hours_needed
+        state["work_requirements_met"] = rules["work_requirements_met"]
         state["work_requirements_needed"] = not state["work_requirements_met"]
         
         # Add work requirement interaction
@@ -178,7 +383,20 @@ def simulate_workflow(state: AgentState) -> AgentState:
             "hours": hours_reported
         })
     
-    # Step 4: Generate reminders
+    return state
+
+def simulate_reminders(state: AgentState) -> AgentState:
+    """
+    Simulate the reminder agent.
+    
+    Args:
+        state: The current workflow state
+        
+    Returns:
+        The updated state
+    """
+    member = state["member"]
+    
     logger.info("Simulating reminder generation")
     
     # Determine what reminders are needed
@@ -188,11 +406,11 @@ def simulate_workflow(state: AgentState) -> AgentState:
         reminders.append(f"Your Medicaid benefits expire on {member.eligibility.renewal_date}. Please renew soon.")
     
     if state.get("documents_required") and len(state.get("documents_submitted", [])) < len(state["documents_required"]):
-        missing_docs = set(state["documents_required"]) - set(state.get("documents_submitted", []))
+        _, missing_docs = split_documents(state["documents_required"], state.get("documents_submitted", []))
         reminders.append(f"Please submit the following documents: {', '.join(missing_docs)}")
     
     if member.work_requirement.required and not state.get("work_requirements_met"):
-        reminders.append(f"You need to report {80 - member.work_requirement.hours_reported} more work hours this month.")
+        reminders.append(f"You need to report {evaluate_member(member, state)['work_hours_remaining']} more work hours this month.")
     
     # Store the reminders
     state["reminders"] = reminders
@@ -215,10 +433,24 @@ def simulate_workflow(state: AgentState) -> AgentState:
             "action": "notification_sent",
             "member_id": member.id,
             "status": "completed",
-            "channel": member.contact.preferred_contact_method
+            "channel": member.contact.preferred_contact_method,
+            "language": member.contact.preferred_language
         })
     
-    # Step 5: Simulate multilingual support if needed
+    return state
+
+def simulate_multilingual_support(state: AgentState) -> AgentState:
+    """
+    Simulate the multilingual chat agent.
+    
+    Args:
+        state: The current workflow state
+        
+    Returns:
+        The updated state
+    """
+    member = state["member"]
+    
     if member.contact.language != "English":
         logger.info(f"Simulating multilingual support for {member.contact.language}")
         
@@ -243,20 +475,24 @@ def simulate_workflow(state: AgentState) -> AgentState:
     else:
         state["multilingual_supported"] = False
     
-    # Step 6: Final audit and compliance check
-    logger.info("Simulating audit and compliance verification")
-    
-    # Check compliance status
-    compliance_issues = []
+    return state
+
+def simulate_audit_compliance(state: AgentState) -> AgentState:
+    """
+    Simulate the audit and compliance agent.
     
-    if member.work_requirement.required and not state.get("work_requirements_met"):
-        compliance_issues.append("Work requirements not met")
+    Args:
+        state: The current workflow state
+        
+    Returns:
+        The updated state
+    """
+    member = state["member"]
     
-    if state.get("documents_required") and len(state.get("documents_submitted", [])) < len(state["documents_required"]):
-        compliance_issues.append("Missing required documents")
+    logger.info("Simulating audit and compliance verification")
     
-    if member.eligibility.status == "inactive":
-        compliance_issues.append("Inactive eligibility status")
+    # Check compliance status against the shared compliance rules
+    compliance_issues = evaluate_member(member, state).issues
     
     # Set compliance status
     state["compliance_status"] = "compliant" if not compliance_issues else "non_compliant"
@@ -284,6 +520,45 @@ def simulate_workflow(state: AgentState) -> AgentState:
     
     return state
 
+# Real agent factories in workflow order
+AGENT_FACTORIES = [
+    ("eligibility_checker", create_eligibility_checker_agent),
+    ("document_assistant", create_document_assistant_agent),
+    ("work_requirement", create_work_requirement_agent),
+    ("reminder", create_reminder_agent),
+    ("multilingual_chat", create_multilingual_chat_agent),
+    ("audit_compliance", create_audit_compliance_agent)
+]
+
+# Simulated agent steps in workflow order
+SIMULATED_STEPS = [
+    ("eligibility_checker", simulate_eligibility_check),
+    ("document_assistant", simulate_document_check),
+    ("work_requirement", simulate_work_requirement_check),
+    ("reminder", simulate_reminders),
+    ("multilingual_chat", simulate_multilingual_support),
+    ("audit_compliance", simulate_audit_compliance)
+]
+
+def simulate_workflow(state: AgentState, checkpointer: Optional[Checkpointer] = None) -> AgentState:
+    """
+    Simulate the workflow for demonstration purposes without using an actual LLM.
+    This allows the demo to run without requiring API keys.
+    
+    Args:
+        state: The initial state
+        checkpointer: Optional checkpointer for mid-workflow resume
+        
+    Returns:
+        The simulated final state
+    """
+    logger.info("Simulating workflow for demonstration")
+    
+    # Make a copy of the state to avoid modifying the original
+    state = state.copy()
+    
+    return run_workflow_steps(state, SIMULATED_STEPS, checkpointer)
+
 def process_member_with_simulation(member_id: str) -> Dict[str, Any]:
     """
     Process a member through the Medicaid assist workflow with simulation.
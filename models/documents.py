@@ -0,0 +1,123 @@
+"""
+Document-type registry with bitmask encoding.
+
+Each document type is assigned a bit, so a member's required and submitted
+documents are each a single integer and "missing" is `required & ~submitted`.
+This is the one place that decides which documents are still outstanding.
+
+Types are registered only when documents are ingested (indexed or loaded).
+Lookups never register: a type with no bit, because it has not been seen or
+because all 64 bits are taken, encodes as 0 and callers fall back to
+comparing the type names themselves.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+# Masks are stored in unsigned 64-bit columns for population-wide queries
+MAX_DOCUMENT_TYPES = 64
+
+
+class DocumentRegistry:
+    """Assigns each document type a stable bit position."""
+
+    def __init__(self, document_types: Iterable[str] = ()):
+        self._bits: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        for document_type in document_types:
+            self.register(document_type)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, document_type: str) -> bool:
+        return document_type in self._bits
+
+    @property
+    def document_types(self) -> List[str]:
+        """Registered document types in bit order."""
+        return list(self._names)
+
+    def bit(self, document_type: str) -> int:
+        """Return the bit for a document type, or 0 if it is not registered."""
+        return self._bits.get(document_type, 0)
+
+    def register(self, document_type: str) -> int:
+        """
+        Return the bit for a document type, registering it if new.
+
+        Returns 0 instead of raising once all bits are taken; such types are
+        compared by name wherever masks are used.
+        """
+        bit = self._bits.get(document_type)
+        if bit is not None:
+            return bit
+        with self._lock:
+            bit = self._bits.get(document_type)
+            if bit is None:
+                if len(self._names) >= MAX_DOCUMENT_TYPES:
+                    return 0
+                bit = 1 << len(self._names)
+                self._bits[document_type] = bit
+                self._names.append(document_type)
+        return bit
+
+    def encodes(self, document_types: Iterable[str]) -> bool:
+        """Whether every document type has a bit, so masks describe the collection exactly."""
+        return all(document_type in self._bits for document_type in document_types)
+
+    def mask(self, document_types: Iterable[str]) -> int:
+        """Encode a collection of document types as a bitmask; unregistered types are left out."""
+        bits = self._bits
+        mask = 0
+        for document_type in document_types:
+            mask |= bits.get(document_type, 0)
+        return mask
+
+    def register_all(self, document_types: Iterable[str]) -> int:
+        """Register a collection of document types and return their bitmask."""
+        mask = 0
+        for document_type in document_types:
+            mask |= self.register(document_type)
+        return mask
+
+    def names(self, mask: int) -> List[str]:
+        """Decode a bitmask into document types, in bit order."""
+        return [name for index, name in enumerate(self._names) if mask >> index & 1]
+
+
+# Shared registry for all document types known to the program
+DOCUMENT_REGISTRY = DocumentRegistry([
+    "income_verification",
+    "address_proof",
+    "identity_proof",
+    "medical_records"
+])
+
+
+def split_documents(required: List[str], on_file: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Split required documents into those already on file and those missing.
+
+    Args:
+        required: Required document types, in the order they should be reported
+        on_file: Document types the member has submitted
+
+    Returns:
+        Tuple[List[str], List[str]]: (submitted, missing), each in `required` order
+    """
+    if not DOCUMENT_REGISTRY.encodes(required):
+        on_file = set(on_file)
+        return ([document_type for document_type in required if document_type in on_file],
+                [document_type for document_type in required if document_type not in on_file])
+
+    missing_mask = DOCUMENT_REGISTRY.mask(required) & ~DOCUMENT_REGISTRY.mask(on_file)
+    submitted = []
+    missing = []
+    for document_type in required:
+        if missing_mask & DOCUMENT_REGISTRY.bit(document_type):
+            missing.append(document_type)
+        else:
+            submitted.append(document_type)
+    return submitted, missing
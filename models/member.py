@@ -2,9 +2,37 @@
 Defines the Member model representing a Medicaid program member.
 """
 
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-from pydantic import BaseModel
+import gc
+import json
+from typing import Dict, Iterable, List, Any, Optional, Type, TypeVar
+from datetime import date, datetime
+from pydantic import BaseModel, TypeAdapter
+from models.documents import DOCUMENT_REGISTRY, split_documents
+
+# Ordinal of 1970-01-01, used to convert dates to epoch days
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_epoch_day(value: str) -> Optional[int]:
+    """
+    Convert an ISO date or datetime string to days since 1970-01-01.
+    
+    Args:
+        value: ISO 8601 date string, optionally with a time and 'Z' suffix
+        
+    Returns:
+        Optional[int]: The epoch day, or None if the string is not a valid date
+    """
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    return parsed.date().toordinal() - _EPOCH_ORDINAL
+
+
+def today_epoch_day() -> int:
+    """Return today's date as days since 1970-01-01."""
+    return date.today().toordinal() - _EPOCH_ORDINAL
 
 
 class Address(BaseModel):
@@ -68,16 +96,99 @@ class Member(BaseModel):
 
     def is_renewal_due_soon(self, days_threshold: int = 60) -> bool:
         """Check if renewal is due within specified days threshold."""
-        try:
-            renewal_date = datetime.fromisoformat(self.eligibility.renewal_date.replace('Z', '+00:00'))
-            today = datetime.now()
-            delta = renewal_date - today
-            return 0 < delta.days <= days_threshold
-        except:
+        renewal_day = to_epoch_day(self.eligibility.renewal_date)
+        if renewal_day is None:
             return False
+        return 0 < renewal_day - today_epoch_day() <= days_threshold
 
     def get_missing_documents(self) -> List[str]:
         """Return list of documents needed for renewal."""
-        required_docs = self.eligibility.required_documents
-        submitted_docs = list(self.documents.keys()) if self.documents else []
-        return [doc for doc in required_docs if doc not in submitted_docs]
\ No newline at end of file
+        _, missing = split_documents(self.eligibility.required_documents, self.documents or {})
+        return missing
+
+    def required_document_mask(self) -> int:
+        """Return the required documents as a document-registry bitmask."""
+        return DOCUMENT_REGISTRY.mask(self.eligibility.required_documents)
+
+    def submitted_document_mask(self) -> int:
+        """Return the documents on file as a document-registry bitmask."""
+        return DOCUMENT_REGISTRY.mask(self.documents or {})
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _construct(cls: Type[ModelT], values: Dict[str, Any]) -> ModelT:
+    """
+    Build a model instance from a field dict without validation.
+    
+    Uses `model_construct`: the given fields are marked as set and omitted
+    ones take their defaults, as with `model_validate`. Nested models are
+    not built by `model_construct` and must already be model instances.
+    """
+    return cls.model_construct(**values)
+
+
+def construct_member(data: Dict[str, Any]) -> Member:
+    """
+    Build a Member from trusted data without running validation.
+    
+    Only use this for data this application produced itself, such as
+    `model_dump` output stored in a snapshot, checkpoint or results file;
+    anything from outside goes through `Member.model_validate` or
+    `validate_members_json`.
+    
+    Args:
+        data: A member dict, as returned by `Member.model_dump`; fields with
+            defaults may be omitted
+        
+    Returns:
+        Member: The member; list and dict field values are shared with `data`
+    """
+    values = dict(data)
+    values["address"] = _construct(Address, dict(values["address"]))
+    values["contact"] = _construct(ContactInfo, dict(values["contact"]))
+    values["eligibility"] = _construct(EligibilityInfo, dict(values["eligibility"]))
+    values["work_requirement"] = _construct(WorkRequirement, dict(values["work_requirement"]))
+    return _construct(Member, values)
+
+
+def construct_members(records: Iterable[Dict[str, Any]]) -> List[Member]:
+    """
+    Build many Members from trusted data without validation.
+    
+    The cyclic garbage collector is paused while building, since a million
+    new objects would otherwise trigger repeated full collections.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [construct_member(record) for record in records]
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Cached adapter for (de)serializing member lists in one pass
+MEMBER_LIST_ADAPTER = TypeAdapter(List[Member])
+
+
+def dump_members_json(members: List[Member]) -> bytes:
+    """Serialize a list of members to a JSON array in one pass."""
+    return MEMBER_LIST_ADAPTER.dump_json(members)
+
+
+def validate_members_json(data: bytes) -> List[Member]:
+    """Parse and fully validate a JSON array of members from an external source."""
+    return MEMBER_LIST_ADAPTER.validate_json(data)
+
+
+def load_members_json(data: bytes) -> List[Member]:
+    """Load a JSON array of members written by `dump_members_json`, skipping validation."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        records = json.loads(data)
+    finally:
+        if enabled:
+            gc.enable()
+    return construct_members(records)
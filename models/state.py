@@ -2,8 +2,11 @@
 Defines the state object passed between agents in the LangGraph workflow.
 """
 
+import gc
+import json
 from typing import Dict, List, Any, TypedDict, Optional
-from models.member import Member
+from pydantic import TypeAdapter
+from models.member import Member, construct_member
 
 class AgentState(TypedDict):
     """
@@ -23,4 +26,83 @@ class AgentState(TypedDict):
     work_requirements_met: Optional[bool]  # Whether work requirements are met
     reminders: Optional[List[str]]  # Generated reminders
     reminders_sent: Optional[bool]  # Whether reminders were sent
-    multilingual_supported: Optional[bool]  # Whether multilingual support was provided
\ No newline at end of file
+    multilingual_supported: Optional[bool]  # Whether multilingual support was provided
+    agent_notes: Optional[Dict[str, str]]  # Each agent's LLM analysis, by agent name
+
+def serialize_state(state: AgentState) -> Dict[str, Any]:
+    """
+    Convert a workflow state into a JSON-compatible dictionary.
+    
+    Args:
+        state: The workflow state to serialize
+        
+    Returns:
+        Dict[str, Any]: The state with the member dumped to plain data
+    """
+    data = dict(state)
+    if isinstance(data.get("member"), Member):
+        data["member"] = data["member"].model_dump()
+    return data
+
+
+def deserialize_state(data: Dict[str, Any], trusted: bool = False) -> AgentState:
+    """
+    Rebuild a workflow state from the output of `serialize_state`.
+    
+    Args:
+        data: The serialized state
+        trusted: Skip member validation, for states this application wrote
+            itself (checkpoints, results files)
+        
+    Returns:
+        AgentState: The restored workflow state
+    """
+    state = dict(data)
+    if isinstance(state.get("member"), dict):
+        member = state["member"]
+        state["member"] = construct_member(member) if trusted else Member.model_validate(member)
+    return AgentState(**state)
+
+
+# Cached adapters for writing workflow results as JSON; Member values are
+# serialized by pydantic directly, without an intermediate model_dump
+RESULT_ADAPTER = TypeAdapter(Dict[str, Any])
+RESULT_LIST_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+
+
+def dump_result_json(result: Dict[str, Any]) -> bytes:
+    """Serialize a workflow state, or a record containing one, to JSON."""
+    return RESULT_ADAPTER.dump_json(result)
+
+
+def dump_results_json(results: List[Dict[str, Any]]) -> bytes:
+    """Serialize a list of workflow states to a JSON array in one pass."""
+    return RESULT_LIST_ADAPTER.dump_json(results)
+
+
+def load_results_json(data: bytes) -> List[AgentState]:
+    """Load workflow states written by `dump_results_json`, skipping member validation."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [deserialize_state(record, trusted=True) for record in json.loads(data)]
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def prompt_inputs(state: AgentState) -> Dict[str, str]:
+    """The member and the rest of the state as JSON, for the agent prompts' `member_json` and `state_json`."""
+    return {
+        "member_json": state["member"].model_dump_json(),
+        "state_json": RESULT_ADAPTER.dump_json({key: value for key, value in state.items() if key != "member"}).decode("utf-8")
+    }
+
+
+def record_agent_note(state: AgentState, agent: str, reply: Any) -> str:
+    """Store an agent's LLM reply (a chat message or plain text) in the state and return its text."""
+    text = str(getattr(reply, "content", reply))
+    notes = dict(state.get("agent_notes") or {})
+    notes[agent] = text
+    state["agent_notes"] = notes
+    return text
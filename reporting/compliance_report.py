@@ -0,0 +1,412 @@
+"""
+Streaming CMS compliance report generator.
+
+Reads persisted audit entries or workflow results from JSONL files in a
+single pass and computes program-level metrics: compliance rates, issue
+breakdowns, reminder volume by channel and language, and turnaround times. Input files are split into byte ranges that
+are processed in parallel; each worker returns a partial aggregate and the
+partials are merged into the final report.
+
+Each input line is either a single audit entry (as appended to
+`state["audit_log"]`) or a serialized workflow result with an `audit_log`.
+Turnaround for raw audit entries is measured from a run's eligibility check
+(its first entry) to its compliance entry. A run cut by a partition edge is
+stitched back together when the partials are merged in file order, so the
+report does not depend on the number of processes; runs should not straddle
+input files. Memory grows only with the runs in progress at once, not with
+the size of the input, and is capped at MAX_TRACKED_RUNS runs per aggregate:
+past it, the longest-open runs are dropped in batches and counted as
+unfinished.
+
+Usage:
+    python -m reporting.compliance_report audit/*.jsonl --processes 8 --json report.json --csv report.csv
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger()
+
+# Upper bounds (seconds) of the turnaround histogram buckets
+TURNAROUND_BUCKETS = [0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600, 4 * 3600, 86400, 7 * 86400]
+
+COMPLIANCE_ACTIONS = ("compliance_verification", "final_compliance_check")
+REMINDER_ACTIONS = ("notification_sent", "send_notification")
+TRANSLATION_ACTIONS = ("translation", "translation_service")
+
+# The first audit entry of every workflow run
+RUN_START_AGENT = "eligibility_checker"
+RUN_START_ACTIONS = ("eligibility_verification",)
+
+# Runs an aggregate tracks at once (open runs, and runs whose start it has
+# not seen); past the limit the oldest are dropped, a tenth at a time.
+# Results are exact while fewer runs than this are in progress at once
+MAX_TRACKED_RUNS = 100_000
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class ReportAggregate:
+    """Mergeable, fixed-size accumulator for compliance metrics."""
+
+    def __init__(self):
+        self.entries = 0
+        self.evaluations = 0
+        self.compliance_status: Counter = Counter()
+        self.issues: Counter = Counter()
+        self.reminders: Counter = Counter()
+        self.translations: Counter = Counter()
+        self.actions: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.turnaround_counts = [0] * (len(TURNAROUND_BUCKETS) + 1)
+        self.turnaround_sum = 0.0
+        self.turnaround_min: Optional[float] = None
+        self.turnaround_max: Optional[float] = None
+        # Runs dropped while open, or left open at the end of an input file
+        self.unfinished_runs = 0
+        # Start timestamps of runs begun in this partition and still in progress
+        self._open_runs: Dict[str, float] = {}
+        # First timestamp of entries of runs begun before this partition and
+        # not yet finished in it; completed ones move to `_heads`
+        self._orphans: Dict[str, float] = {}
+        # (member ID, first seen, end) of runs begun before this partition,
+        # resolved against the preceding partition's open runs on merge
+        self._heads: List[Tuple[str, float, float]] = []
+
+    def add_turnaround(self, seconds: float) -> None:
+        """Record one workflow run's turnaround time."""
+        self.turnaround_counts[bisect_left(TURNAROUND_BUCKETS, seconds)] += 1
+        self.turnaround_sum += seconds
+        self.turnaround_min = seconds if self.turnaround_min is None else min(self.turnaround_min, seconds)
+        self.turnaround_max = seconds if self.turnaround_max is None else max(self.turnaround_max, seconds)
+
+    def add_entry(self, entry: Dict[str, Any], track_runs: bool = True) -> None:
+        """Fold a single audit entry into the aggregate."""
+        self.entries += 1
+        agent = entry.get("agent", "unknown")
+        action = entry.get("action", "unknown")
+        self.actions[f"{agent}.{action}"] += 1
+        member_id = entry.get("member_id")
+        timestamp = _parse_timestamp(entry.get("timestamp")) if track_runs else None
+
+        if track_runs and member_id is not None and timestamp is not None:
+            if agent == RUN_START_AGENT and action in RUN_START_ACTIONS:
+                self._open_run(member_id, timestamp)
+            elif member_id not in self._open_runs and member_id not in self._orphans:
+                if len(self._orphans) + len(self._heads) < MAX_TRACKED_RUNS:
+                    self._orphans[member_id] = timestamp
+                else:
+                    # Too many to all be runs cut by the partition edge; time it from this entry
+                    self._open_run(member_id, timestamp)
+
+        if entry.get("result") == "error":
+            self.errors[agent] += 1
+        elif agent == "audit_compliance" and action in COMPLIANCE_ACTIONS:
+            status = entry.get("status") or entry.get("result") or "unknown"
+            self.evaluations += 1
+            self.compliance_status[status] += 1
+            issues = entry.get("issues")
+            if issues is None:
+                issues = (entry.get("summary") or {}).get("issues_identified", [])
+            self.issues.update(issues)
+            if track_runs and timestamp is not None:
+                if member_id in self._open_runs:
+                    self.add_turnaround(max(timestamp - self._open_runs.pop(member_id), 0.0))
+                elif member_id in self._orphans:
+                    self._heads.append((member_id, self._orphans.pop(member_id), timestamp))
+        elif agent == "reminder" and action in REMINDER_ACTIONS:
+            self.reminders[(entry.get("channel", "unknown"), entry.get("language", "unknown"))] += 1
+        elif agent == "multilingual_chat" and action in TRANSLATION_ACTIONS:
+            self.translations[entry.get("language", "unknown")] += 1
+
+    def _open_run(self, member_id: str, start: float) -> None:
+        """Track a run from its start, dropping the longest-open runs past the limit."""
+        # Re-inserted so the dict stays in start order
+        self._open_runs.pop(member_id, None)
+        self._open_runs[member_id] = start
+        self.unfinished_runs += _trim(self._open_runs)
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        """Fold a serialized workflow result into the aggregate."""
+        audit_log = result.get("audit_log") or []
+        language = ((result.get("member") or {}).get("contact") or {}).get("preferred_language")
+        first = last = None
+        for entry in audit_log:
+            if language and entry.get("agent") == "reminder" and "language" not in entry:
+                entry = dict(entry, language=language)
+            self.add_entry(entry, track_runs=False)
+            timestamp = _parse_timestamp(entry.get("timestamp"))
+            if timestamp is not None:
+                first = timestamp if first is None else min(first, timestamp)
+                last = timestamp if last is None else max(last, timestamp)
+        if first is not None:
+            self.add_turnaround(last - first)
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """Fold an input record, either an audit entry or a workflow result."""
+        if "audit_log" in record:
+            self.add_result(record)
+        else:
+            self.add_entry(record)
+
+    def merge(self, other: "ReportAggregate") -> "ReportAggregate":
+        """
+        Merge the partial aggregate of the following partition into this one.
+
+        Runs left open here are completed by the other partition's heads;
+        runs it leaves open stay open for the next merge.
+        """
+        self._resolve_heads()
+        for member_id, first_seen, end in other._heads:
+            start = self._open_runs.pop(member_id, None)
+            if start is None:
+                start = self._orphans.pop(member_id, first_seen)
+            self.add_turnaround(max(end - start, 0.0))
+        for member_id, first_seen in other._orphans.items():
+            if member_id not in self._open_runs:
+                self._orphans.setdefault(member_id, first_seen)
+        _trim(self._orphans)
+        for member_id, start in other._open_runs.items():
+            self._open_run(member_id, start)
+        self.unfinished_runs += other.unfinished_runs
+        self.entries += other.entries
+        self.evaluations += other.evaluations
+        self.compliance_status.update(other.compliance_status)
+        self.issues.update(other.issues)
+        self.reminders.update(other.reminders)
+        self.translations.update(other.translations)
+        self.actions.update(other.actions)
+        self.errors.update(other.errors)
+        self.turnaround_counts = [a + b for a, b in zip(self.turnaround_counts, other.turnaround_counts)]
+        self.turnaround_sum += other.turnaround_sum
+        for value in (other.turnaround_min, other.turnaround_max):
+            if value is not None:
+                self.turnaround_min = value if self.turnaround_min is None else min(self.turnaround_min, value)
+                self.turnaround_max = value if self.turnaround_max is None else max(self.turnaround_max, value)
+        return self
+
+    def _resolve_heads(self) -> None:
+        """Complete this aggregate's own heads from their first entry, as nothing precedes them."""
+        for member_id, first_seen, end in self._heads:
+            self.add_turnaround(max(end - first_seen, 0.0))
+        self._heads = []
+
+    def end_input(self) -> None:
+        """Drop runs left unfinished at the end of an input file."""
+        self._resolve_heads()
+        self.unfinished_runs += len(self._open_runs)
+        self._open_runs.clear()
+        self._orphans.clear()
+
+    def _turnaround_percentile(self, fraction: float) -> Optional[float]:
+        total = sum(self.turnaround_counts)
+        if not total:
+            return None
+        rank = fraction * total
+        seen = 0
+        for index, count in enumerate(self.turnaround_counts):
+            seen += count
+            if seen >= rank:
+                return TURNAROUND_BUCKETS[index] if index < len(TURNAROUND_BUCKETS) else self.turnaround_max
+        return self.turnaround_max
+
+    def to_report(self) -> Dict[str, Any]:
+        """Build the final report."""
+        self._resolve_heads()
+        runs = sum(self.turnaround_counts)
+        compliant = self.compliance_status.get("compliant", 0)
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "audit_entries": self.entries,
+            "compliance": {
+                "evaluations": self.evaluations,
+                "by_status": dict(self.compliance_status),
+                "compliance_rate": compliant / self.evaluations if self.evaluations else None
+            },
+            "issues": dict(self.issues.most_common()),
+            "reminders": {
+                "total": sum(self.reminders.values()),
+                "by_channel_language": [
+                    {"channel": channel, "language": language, "count": count}
+                    for (channel, language), count in sorted(self.reminders.items())
+                ]
+            },
+            "translations": dict(self.translations),
+            "actions": dict(self.actions),
+            "errors": dict(self.errors),
+            "turnaround_seconds": {
+                "runs": runs,
+                "unfinished": self.unfinished_runs + len(self._open_runs),
+                "mean": self.turnaround_sum / runs if runs else None,
+                "min": self.turnaround_min,
+                "max": self.turnaround_max,
+                "p50": self._turnaround_percentile(0.50),
+                "p95": self._turnaround_percentile(0.95),
+                "p99": self._turnaround_percentile(0.99)
+            }
+        }
+
+
+def _trim(runs: Dict[str, float]) -> int:
+    """Drop the oldest tenth of the runs if there are more than MAX_TRACKED_RUNS; returns how many were dropped."""
+    if len(runs) <= MAX_TRACKED_RUNS:
+        return 0
+    dropped = list(islice(runs, len(runs) - MAX_TRACKED_RUNS + max(1, MAX_TRACKED_RUNS // 10)))
+    for member_id in dropped:
+        del runs[member_id]
+    return len(dropped)
+
+
+def _open(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def iter_records(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield JSON records from the lines of a JSONL file that start within
+    the byte range [start, end). Gzipped files are always read whole.
+    """
+    with _open(path) as f:
+        if start and not path.endswith(".gz"):
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        position = f.tell()
+        for line in f:
+            if end is not None and position >= end:
+                break
+            position += len(line)
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def partition_inputs(paths: Iterable[str], partitions: int) -> List[Tuple[str, int, Optional[int]]]:
+    """Split input files into roughly equal byte ranges."""
+    paths = list(paths)
+    total = sum(os.path.getsize(path) for path in paths) or 1
+    ranges = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if path.endswith(".gz") or size == 0:
+            ranges.append((path, 0, None))
+            continue
+        pieces = max(1, round(partitions * size / total))
+        step = -(-size // pieces)
+        for start in range(0, size, step):
+            ranges.append((path, start, min(start + step, size)))
+    return ranges
+
+
+def aggregate_partition(path: str, start: int = 0, end: Optional[int] = None) -> ReportAggregate:
+    """Aggregate one byte range of an input file. Runs in a worker process."""
+    aggregate = ReportAggregate()
+    for record in iter_records(path, start, end):
+        aggregate.add_record(record)
+    return aggregate
+
+
+def aggregate_records(records: Iterable[Dict[str, Any]]) -> ReportAggregate:
+    """Aggregate an in-memory stream of audit entries or workflow results."""
+    aggregate = ReportAggregate()
+    for record in records:
+        aggregate.add_record(record)
+    return aggregate
+
+
+def generate_report(paths: Iterable[str], processes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build a compliance report from JSONL inputs.
+
+    Args:
+        paths: Input files of audit entries or workflow results
+        processes: Worker processes (defaults to the CPU count)
+
+    Returns:
+        Dict[str, Any]: The merged report
+    """
+    processes = processes or os.cpu_count() or 1
+    ranges = partition_inputs(paths, processes)
+    logger.info(f"Generating compliance report over {len(ranges)} partitions with {processes} processes")
+
+    total = ReportAggregate()
+    if not ranges:
+        return total.to_report()
+
+    # Partials are merged in file order so runs cut by a partition edge are stitched
+    pool = ProcessPoolExecutor(max_workers=processes) if processes > 1 else None
+    partials = pool.map(aggregate_partition, *zip(*ranges)) if pool else (
+        aggregate_partition(*partition) for partition in ranges
+    )
+    try:
+        previous_path = None
+        for (path, _, _), partial in zip(ranges, partials):
+            if previous_path is not None and path != previous_path:
+                total.end_input()
+            total.merge(partial)
+            previous_path = path
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return total.to_report()
+
+
+def write_json_report(report: Dict[str, Any], path: str) -> None:
+    """Write a report as JSON."""
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def write_csv_report(report: Dict[str, Any], path: str) -> None:
+    """Write a report as flat (section, key, value) CSV rows."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["section", "key", "value"])
+        writer.writerow(["summary", "audit_entries", report["audit_entries"]])
+        writer.writerow(["compliance", "evaluations", report["compliance"]["evaluations"]])
+        writer.writerow(["compliance", "compliance_rate", report["compliance"]["compliance_rate"]])
+        for status, count in report["compliance"]["by_status"].items():
+            writer.writerow(["compliance_status", status, count])
+        for issue, count in report["issues"].items():
+            writer.writerow(["issue", issue, count])
+        for row in report["reminders"]["by_channel_language"]:
+            writer.writerow(["reminders", f"{row['channel']}/{row['language']}", row["count"]])
+        for language, count in report["translations"].items():
+            writer.writerow(["translations", language, count])
+        for key, value in report["turnaround_seconds"].items():
+            writer.writerow(["turnaround_seconds", key, value])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a CMS compliance report")
+    parser.add_argument("inputs", nargs="+", help="JSONL files of audit entries or workflow results")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes")
+    parser.add_argument("--json", type=str, default=None, help="Path for the JSON report")
+    parser.add_argument("--csv", type=str, default=None, help="Path for the CSV report")
+
+    args = parser.parse_args()
+
+    report = generate_report(args.inputs, args.processes)
+    if args.json:
+        write_json_report(report, args.json)
+    if args.csv:
+        write_csv_report(report, args.csv)
+    if not args.json and not args.csv:
+        print(json.dumps(report, indent=2))
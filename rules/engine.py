@@ -0,0 +1,273 @@
+"""
+Declarative rule DSL.
+
+Rules are written as expressions over named facts, for example
+
+    Rule("work_requirements_met", ~F("work_requirement_applies") | (F("hours_reported") >= F("hours_needed")))
+
+A RuleSet is compiled once into two forms: nested Python closures over a
+dict of facts for single-member evaluation, and NumPy expressions over a
+dict of fact columns for whole-population evaluation. Rules are evaluated in
+order and each result becomes a fact later rules can reference by name.
+"""
+
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import numpy as np
+
+Facts = Dict[str, Any]
+Columns = Dict[str, np.ndarray]
+
+
+def _as_expr(value: Any) -> "Expr":
+    return value if isinstance(value, Expr) else Const(value)
+
+
+class Expr:
+    """Base class for rule expressions."""
+
+    # Comparison operators build expressions, so keep identity hashing
+    __hash__ = object.__hash__
+
+    def compile(self) -> Callable[[Facts], Any]:
+        """Compile to a closure over a dict of scalar facts."""
+        raise NotImplementedError
+
+    def compile_vectorized(self) -> Callable[[Columns], Any]:
+        """Compile to a function over a dict of NumPy fact columns."""
+        raise NotImplementedError
+
+    def fields(self) -> List[str]:
+        """Names of the facts this expression reads."""
+        raise NotImplementedError
+
+    def __and__(self, other): return BinOp("and", self, _as_expr(other))
+    def __or__(self, other): return BinOp("or", self, _as_expr(other))
+    def __invert__(self): return Not(self)
+    def __eq__(self, other): return BinOp("eq", self, _as_expr(other))
+    def __ne__(self, other): return BinOp("ne", self, _as_expr(other))
+    def __lt__(self, other): return BinOp("lt", self, _as_expr(other))
+    def __le__(self, other): return BinOp("le", self, _as_expr(other))
+    def __gt__(self, other): return BinOp("gt", self, _as_expr(other))
+    def __ge__(self, other): return BinOp("ge", self, _as_expr(other))
+    def __add__(self, other): return BinOp("add", self, _as_expr(other))
+    def __sub__(self, other): return BinOp("sub", self, _as_expr(other))
+
+    def isin(self, values: Iterable[Any]) -> "Expr":
+        """True where the value is one of `values`."""
+        return IsIn(self, tuple(values))
+
+
+class F(Expr):
+    """Reference to a named fact."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def compile(self):
+        return operator.itemgetter(self.name)
+
+    def compile_vectorized(self):
+        return operator.itemgetter(self.name)
+
+    def fields(self):
+        return [self.name]
+
+    def __repr__(self):
+        return f"F({self.name!r})"
+
+
+class Const(Expr):
+    """A literal value."""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def compile(self):
+        value = self.value
+        return lambda facts: value
+
+    def compile_vectorized(self):
+        value = self.value
+        return lambda columns: value
+
+    def fields(self):
+        return []
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+# Scalar and vectorized implementations of each binary operator
+_SCALAR_OPS = {
+    "and": lambda a, b: bool(a) and bool(b),
+    "or": lambda a, b: bool(a) or bool(b),
+    "eq": operator.eq, "ne": operator.ne,
+    "lt": operator.lt, "le": operator.le, "gt": operator.gt, "ge": operator.ge,
+    "add": operator.add, "sub": operator.sub
+}
+_VECTOR_OPS = {
+    "and": np.logical_and,
+    "or": np.logical_or,
+    "eq": operator.eq, "ne": operator.ne,
+    "lt": operator.lt, "le": operator.le, "gt": operator.gt, "ge": operator.ge,
+    "add": operator.add, "sub": operator.sub
+}
+
+
+class BinOp(Expr):
+    """Binary operation over two expressions."""
+
+    def __init__(self, op: str, left: Expr, right: Expr):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def compile(self):
+        op, left, right = _SCALAR_OPS[self.op], self.left.compile(), self.right.compile()
+        if self.op == "and":
+            return lambda facts: bool(left(facts)) and bool(right(facts))
+        if self.op == "or":
+            return lambda facts: bool(left(facts)) or bool(right(facts))
+        return lambda facts: op(left(facts), right(facts))
+
+    def compile_vectorized(self):
+        op, left, right = _VECTOR_OPS[self.op], self.left.compile_vectorized(), self.right.compile_vectorized()
+        return lambda columns: op(left(columns), right(columns))
+
+    def fields(self):
+        return self.left.fields() + self.right.fields()
+
+    def __repr__(self):
+        return f"({self.left!r} {self.op} {self.right!r})"
+
+
+class Not(Expr):
+    """Logical negation."""
+
+    def __init__(self, operand: Expr):
+        self.operand = operand
+
+    def compile(self):
+        operand = self.operand.compile()
+        return lambda facts: not operand(facts)
+
+    def compile_vectorized(self):
+        operand = self.operand.compile_vectorized()
+        return lambda columns: np.logical_not(operand(columns))
+
+    def fields(self):
+        return self.operand.fields()
+
+    def __repr__(self):
+        return f"~{self.operand!r}"
+
+
+class IsIn(Expr):
+    """Set membership test."""
+
+    def __init__(self, operand: Expr, values: tuple):
+        self.operand = operand
+        self.values = values
+
+    def compile(self):
+        operand, values = self.operand.compile(), frozenset(self.values)
+        return lambda facts: operand(facts) in values
+
+    def compile_vectorized(self):
+        operand, values = self.operand.compile_vectorized(), list(self.values)
+        return lambda columns: np.isin(operand(columns), values)
+
+    def fields(self):
+        return self.operand.fields()
+
+    def __repr__(self):
+        return f"{self.operand!r}.isin({list(self.values)!r})"
+
+
+class Rule:
+    """
+    A named rule. Rules with an `issue` are compliance checks: the issue is
+    reported when the condition holds. Rules without one derive a fact.
+    """
+
+    def __init__(self, name: str, condition: Expr, category: str = "derived", issue: Optional[str] = None):
+        self.name = name
+        self.condition = condition
+        self.category = category
+        self.issue = issue
+
+
+class RuleResult:
+    """Outcome of evaluating a rule set for one member."""
+
+    def __init__(self, values: Dict[str, Any], issues: List[str]):
+        self.values = values
+        self.issues = issues
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    @property
+    def compliant(self) -> bool:
+        return not self.issues
+
+
+class RuleSet:
+    """An ordered set of rules compiled once for scalar and batch evaluation."""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = list(rules)
+        names = [rule.name for rule in self.rules]
+        if len(names) != len(set(names)):
+            raise ValueError("Rule names must be unique")
+        self._scalar = [(rule.name, rule.condition.compile(), rule.issue) for rule in self.rules]
+        self._vector = [(rule.name, rule.condition.compile_vectorized()) for rule in self.rules]
+
+    def inputs(self) -> List[str]:
+        """Fact names the rules need that no rule derives."""
+        derived = set()
+        needed = []
+        for rule in self.rules:
+            for name in rule.condition.fields():
+                if name not in derived and name not in needed:
+                    needed.append(name)
+            derived.add(rule.name)
+        return needed
+
+    def evaluate(self, facts: Facts) -> RuleResult:
+        """
+        Evaluate every rule against one member's facts.
+
+        Returns:
+            RuleResult: Each rule's value, plus the issues of failed compliance rules
+        """
+        facts = dict(facts)
+        issues = []
+        for name, fn, issue in self._scalar:
+            value = fn(facts)
+            facts[name] = value
+            if issue and value:
+                issues.append(issue)
+        return RuleResult(facts, issues)
+
+    def evaluate_batch(self, columns: Columns) -> Columns:
+        """
+        Evaluate every rule over fact columns for a whole population.
+
+        Returns:
+            Columns: The input columns plus one result column per rule
+        """
+        columns = dict(columns)
+        size = len(next(iter(columns.values()))) if columns else 0
+        for name, fn in self._vector:
+            value = fn(columns)
+            columns[name] = np.broadcast_to(value, (size,)) if np.ndim(value) == 0 else value
+        return columns
+
+    def issue_counts(self, columns: Columns) -> Dict[str, int]:
+        """Count members affected by each compliance issue in evaluated columns."""
+        return {
+            rule.issue: int(np.count_nonzero(columns[rule.name]))
+            for rule in self.rules if rule.issue
+        }
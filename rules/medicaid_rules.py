@@ -0,0 +1,106 @@
+"""
+Medicaid eligibility, document, work-hour, exemption and compliance rules.
+
+This is the single source of truth for compliance decisions. The workflow
+simulation, the agents and batch reporting all evaluate these rules, either
+for one member via `evaluate_member` or for a population via
+`evaluate_population`.
+"""
+
+from typing import Dict, List, Optional
+import numpy as np
+
+from models.documents import split_documents
+from models.member import Member
+from models.state import AgentState
+from rules.engine import F, Rule, RuleResult, RuleSet
+from storage.document_index import DocumentMaskTable
+
+# Exemption statuses that do not excuse a member from work requirements
+NON_EXEMPT_STATUSES = ("none", "not_required")
+
+MEDICAID_RULES = RuleSet([
+    # Exemptions and work hours
+    Rule("work_exempt", ~F("exemption_status").isin(NON_EXEMPT_STATUSES), category="exemption"),
+    Rule("work_requirement_applies", F("work_required") & ~F("work_exempt"), category="work"),
+    Rule("work_hours_sufficient", F("hours_reported") >= F("hours_needed"), category="work"),
+    Rule("work_requirements_met", ~F("work_requirement_applies") | F("work_hours_sufficient"), category="work"),
+    Rule("work_hours_remaining", F("hours_needed") - F("hours_reported"), category="work"),
+
+    # Documents
+    Rule("documents_complete", F("missing_document_count") == 0, category="documents"),
+
+    # Eligibility
+    Rule("renewal_needed", F("eligibility_status") == "renewal_needed", category="eligibility"),
+
+    # Compliance issues, reported when the condition holds
+    Rule("eligibility_unverified", ~F("eligibility_verified"), category="compliance",
+         issue="Eligibility not verified"),
+    Rule("work_noncompliant", ~F("work_requirements_met"), category="compliance",
+         issue="Work requirements not met"),
+    Rule("documents_missing", ~F("documents_complete"), category="compliance",
+         issue="Missing required documents"),
+    Rule("eligibility_inactive", F("eligibility_status") == "inactive", category="compliance",
+         issue="Inactive eligibility status")
+])
+
+
+def member_facts(member: Member, state: Optional[AgentState] = None) -> Dict:
+    """
+    Extract the facts the rules read for one member.
+
+    When a workflow state is given, document facts come from the documents
+    the workflow has required and found on file; otherwise from the member.
+    """
+    if state is not None and state.get("documents_required") is not None:
+        required = state.get("documents_required") or []
+        on_file = state.get("documents_submitted") or []
+    else:
+        required = member.eligibility.required_documents
+        on_file = member.documents or {}
+
+    return {
+        "work_required": member.work_requirement.required,
+        "exemption_status": member.work_requirement.exemption_status,
+        "hours_reported": member.work_requirement.hours_reported,
+        "hours_needed": member.work_requirement.hours_needed,
+        "eligibility_status": member.eligibility.status,
+        "eligibility_verified": bool(state.get("eligibility_verified")) if state is not None else True,
+        "missing_document_count": len(split_documents(required, on_file)[1])
+    }
+
+
+def evaluate_member(member: Member, state: Optional[AgentState] = None) -> RuleResult:
+    """Evaluate the Medicaid rules for one member."""
+    return MEDICAID_RULES.evaluate(member_facts(member, state))
+
+
+def population_facts(members: List[Member], document_table: Optional[DocumentMaskTable] = None) -> Dict[str, np.ndarray]:
+    """
+    Build NumPy fact columns for a population.
+
+    Args:
+        members: The members, in row order
+        document_table: Document masks for the same members in the same order;
+            built from `members` if not given
+    """
+    if document_table is None:
+        document_table = DocumentMaskTable(members)
+    missing_count = document_table.missing_per_member()
+
+    return {
+        "work_required": np.fromiter((m.work_requirement.required for m in members), dtype=bool, count=len(members)),
+        "exemption_status": np.array([m.work_requirement.exemption_status for m in members], dtype=object),
+        "hours_reported": np.fromiter((m.work_requirement.hours_reported for m in members), dtype=np.int64,
+                                      count=len(members)),
+        "hours_needed": np.fromiter((m.work_requirement.hours_needed for m in members), dtype=np.int64,
+                                    count=len(members)),
+        "eligibility_status": np.array([m.eligibility.status for m in members], dtype=object),
+        "eligibility_verified": np.ones(len(members), dtype=bool),
+        "missing_document_count": missing_count
+    }
+
+
+def evaluate_population(members: List[Member], document_table: Optional[DocumentMaskTable] = None) -> Dict[str, np.ndarray]:
+    """Evaluate the Medicaid rules for a population in vectorized form."""
+    return MEDICAID_RULES.evaluate_batch(population_facts(members, document_table))
@@ -0,0 +1,300 @@
+"""
+Renewal and document reminder scheduler.
+
+Schedules outreach at fixed offsets before each member's renewal date
+(60/30/7 days by default, plus document reminders while documents are
+missing) and fires reminder jobs when they come due. Jobs live in a
+hierarchical timing wheel for O(1) insert and fire, and are persisted to
+SQLite so a restarted scheduler picks up where it left off.
+
+Usage:
+    python -m scheduler.reminder_scheduler --db data/reminders.db
+"""
+
+import argparse
+import os
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from pydantic import BaseModel
+
+from models.member import Member, to_epoch_day
+from scheduler.clock import SystemClock
+from scheduler.timing_wheel import TimingWheel
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger()
+
+SECONDS_PER_DAY = 86400
+
+# Days before renewal_date at which each reminder kind is sent
+RENEWAL_OFFSETS = (60, 30, 7)
+DOCUMENT_OFFSETS = (45, 14)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminder_jobs (
+    key TEXT PRIMARY KEY,
+    member_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    offset_days INTEGER NOT NULL,
+    due_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    fired_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_reminder_jobs_member ON reminder_jobs (member_id);
+CREATE INDEX IF NOT EXISTS idx_reminder_jobs_pending ON reminder_jobs (status, due_at);
+"""
+
+
+class ReminderJob(BaseModel):
+    """A reminder due for a member at a given time."""
+    key: str
+    member_id: str
+    kind: str
+    offset_days: int
+    due_at: float
+
+
+def log_reminder(job: ReminderJob) -> None:
+    """Default handler: log the reminder that came due."""
+    logger.info(f"Reminder due for member {job.member_id}: {job.kind} ({job.offset_days} days before renewal)")
+
+
+def plan_member_reminders(member: Member, now: float,
+                          renewal_offsets: Sequence[int] = RENEWAL_OFFSETS,
+                          document_offsets: Sequence[int] = DOCUMENT_OFFSETS) -> List[ReminderJob]:
+    """
+    Work out the reminders a member should receive.
+
+    Offsets already in the past are dropped, except the most recent one while
+    the renewal date is still ahead, so a member scheduled late still gets
+    one reminder immediately.
+
+    Args:
+        member: The member to plan for
+        now: Current time in seconds since the epoch
+        renewal_offsets: Days before renewal for renewal reminders
+        document_offsets: Days before renewal for missing-document reminders
+
+    Returns:
+        List[ReminderJob]: The reminders to schedule
+    """
+    renewal_day = to_epoch_day(member.eligibility.renewal_date)
+    if renewal_day is None:
+        return []
+    renewal_at = renewal_day * SECONDS_PER_DAY
+    if renewal_at <= now:
+        return []
+
+    plan = [("renewal", offset) for offset in renewal_offsets]
+    if member.get_missing_documents():
+        plan.extend(("documents", offset) for offset in document_offsets)
+
+    jobs = []
+    for kind in {kind for kind, _ in plan}:
+        offsets = sorted((offset for k, offset in plan if k == kind), reverse=True)
+        upcoming = [offset for offset in offsets if renewal_at - offset * SECONDS_PER_DAY > now]
+        overdue = [offset for offset in offsets if offset not in upcoming]
+        if overdue:
+            upcoming.append(overdue[-1])
+        for offset in upcoming:
+            jobs.append(ReminderJob(
+                key=f"{member.id}:{renewal_day}:{kind}:{offset}",
+                member_id=member.id,
+                kind=kind,
+                offset_days=offset,
+                due_at=max(renewal_at - offset * SECONDS_PER_DAY, now)
+            ))
+    return jobs
+
+
+class ReminderScheduler:
+    """
+    Fires reminder jobs at their due time.
+
+    Pending jobs are kept in a timing wheel keyed by job key and mirrored in
+    SQLite. Rescheduling or cancelling a member removes its pending jobs from
+    the wheel. Jobs fire at most once: a job is recorded as fired before its
+    handler runs, so a crash mid-handler never sends the reminder twice, and
+    a job whose handler raises is recorded as failed.
+    """
+
+    def __init__(self, path: str, clock=None, handler: Callable[[ReminderJob], None] = log_reminder,
+                 tick_seconds: int = 3600):
+        """
+        Args:
+            path: SQLite database used to persist jobs
+            clock: Clock providing `now()`; defaults to the system clock
+            handler: Called with each job as it fires
+            tick_seconds: Scheduling resolution
+        """
+        self.clock = clock or SystemClock()
+        self.handler = handler
+        self.tick_seconds = tick_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._wheel = TimingWheel(start_tick=self._tick(self.clock.now()))
+        self._jobs: Dict[str, ReminderJob] = {}
+        self._member_jobs: Dict[str, List[str]] = {}
+        self._load_pending()
+
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def _track(self, job: ReminderJob) -> None:
+        self._jobs[job.key] = job
+        self._member_jobs.setdefault(job.member_id, []).append(job.key)
+        self._wheel.insert(self._tick(job.due_at), job.key)
+
+    def _load_pending(self) -> None:
+        """Rebuild the wheel from jobs persisted by an earlier run."""
+        rows = self._conn.execute(
+            "SELECT key, member_id, kind, offset_days, due_at FROM reminder_jobs WHERE status = 'pending'"
+        )
+        count = 0
+        for key, member_id, kind, offset_days, due_at in rows:
+            self._track(ReminderJob(key=key, member_id=member_id, kind=kind,
+                                    offset_days=offset_days, due_at=due_at))
+            count += 1
+        if count:
+            logger.info(f"Reminder scheduler restored {count} pending jobs")
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def pending_jobs(self, member_id: str) -> List[ReminderJob]:
+        """Get a member's pending reminder jobs."""
+        return [self._jobs[key] for key in self._member_jobs.get(member_id, []) if key in self._jobs]
+
+    def _fired_keys(self, keys: List[str]) -> set:
+        fired = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT key FROM reminder_jobs WHERE status = 'fired' AND key IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            fired.update(row[0] for row in rows)
+        return fired
+
+    def schedule_members(self, members: Iterable[Member]) -> int:
+        """
+        Plan and schedule reminders for members, replacing any pending
+        reminders they already have. Reminders already sent for the same
+        renewal date are not sent again.
+
+        Returns:
+            int: Number of jobs scheduled
+        """
+        now = self.clock.now()
+        member_ids = []
+        jobs = []
+        for member in members:
+            member_ids.append(member.id)
+            jobs.extend(plan_member_reminders(member, now))
+        fired = self._fired_keys([job.key for job in jobs])
+        jobs = [job for job in jobs if job.key not in fired]
+
+        with self._conn:
+            self._cancel(member_ids)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO reminder_jobs (key, member_id, kind, offset_days, due_at, status) "
+                "VALUES (?, ?, ?, ?, ?, 'pending')",
+                ((job.key, job.member_id, job.kind, job.offset_days, job.due_at) for job in jobs)
+            )
+        for job in jobs:
+            self._track(job)
+        return len(jobs)
+
+    def schedule_member(self, member: Member) -> int:
+        """Plan and schedule reminders for a single member."""
+        return self.schedule_members([member])
+
+    def cancel_member(self, member_id: str) -> None:
+        """Cancel a member's pending reminders."""
+        with self._conn:
+            self._cancel([member_id])
+
+    def _cancel(self, member_ids: List[str]) -> None:
+        for member_id in member_ids:
+            for key in self._member_jobs.pop(member_id, []):
+                self._jobs.pop(key, None)
+                self._wheel.remove(key)
+        self._conn.executemany(
+            "UPDATE reminder_jobs SET status = 'cancelled' WHERE member_id = ? AND status = 'pending'",
+            ((member_id,) for member_id in member_ids)
+        )
+
+    def run_pending(self) -> List[ReminderJob]:
+        """
+        Fire every job due at the clock's current time. Jobs are marked fired
+        before their handlers run; a failed handler marks its job failed, and
+        the job is planned again the next time its member is scheduled.
+
+        Returns:
+            List[ReminderJob]: The jobs that fired, in due order
+        """
+        fired = []
+        for _, key in self._wheel.advance(self._tick(self.clock.now())):
+            job = self._jobs.pop(key, None)
+            if job is None:
+                continue
+            keys = self._member_jobs.get(job.member_id)
+            if keys is not None:
+                keys.remove(key)
+                if not keys:
+                    del self._member_jobs[job.member_id]
+            fired.append(job)
+
+        if not fired:
+            return fired
+
+        fired_at = self.clock.now()
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE reminder_jobs SET status = 'fired', fired_at = ? WHERE key = ? AND status = 'pending'",
+                ((fired_at, job.key) for job in fired)
+            )
+
+        failed = []
+        for job in fired:
+            try:
+                self.handler(job)
+            except Exception as e:
+                logger.error(f"Reminder handler failed for member {job.member_id}: {str(e)}")
+                failed.append(job.key)
+        if failed:
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE reminder_jobs SET status = 'failed' WHERE key = ?", ((key,) for key in failed)
+                )
+        return fired
+
+    def run_forever(self, poll_seconds: Optional[float] = None) -> None:
+        """Fire due jobs until interrupted."""
+        poll_seconds = poll_seconds if poll_seconds is not None else self.tick_seconds
+        while True:
+            self.run_pending()
+            self.clock.sleep(poll_seconds)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    from storage.member_repository import get_all_members, load_members
+
+    parser = argparse.ArgumentParser(description="Medicaid Assist reminder scheduler")
+    parser.add_argument("--db", type=str, default="data/reminders.db", help="Path to the scheduler database")
+    parser.add_argument("--poll_seconds", type=float, default=60.0, help="Seconds between checks for due reminders")
+
+    args = parser.parse_args()
+
+    load_members()
+    scheduler = ReminderScheduler(args.db)
+    scheduled = scheduler.schedule_members(get_all_members())
+    print(f"Scheduled {scheduled} reminders")
+    scheduler.run_forever(args.poll_seconds)
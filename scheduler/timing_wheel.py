@@ -0,0 +1,120 @@
+"""
+Hierarchical timing wheel.
+
+Timers are bucketed by deadline into a stack of wheels, each `2**slot_bits`
+slots wide and covering a span `2**slot_bits` times larger than the wheel
+below it. Insertion and removal are O(1); on each tick only the current slot
+is fired and, on wheel boundaries, one slot of the wheel above is cascaded
+down. Every timer cascades at most once per level, so firing is O(1)
+amortized.
+"""
+
+from typing import Dict, Hashable, List, Tuple
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel over integer ticks.
+
+    Items are (deadline tick, key) pairs with unique keys; inserting a key
+    that is already scheduled moves it to the new deadline. Each slot maps
+    keys to deadlines, and a key's slot on any level follows from its
+    deadline, so `remove` touches at most one slot per level.
+    """
+
+    def __init__(self, start_tick: int = 0, slot_bits: int = 6, levels: int = 5):
+        """
+        Args:
+            start_tick: Tick the wheel starts at
+            slot_bits: log2 of the number of slots per level
+            levels: Number of wheel levels; deadlines beyond the top level
+                are kept in an overflow map and re-placed as time advances
+        """
+        self.slot_bits = slot_bits
+        self.slots = 1 << slot_bits
+        self.mask = self.slots - 1
+        self.levels = levels
+        self.current_tick = start_tick
+        self._wheels: List[List[Dict[Hashable, int]]] = [
+            [{} for _ in range(self.slots)] for _ in range(levels)
+        ]
+        self._overflow: Dict[Hashable, int] = {}
+        self._due: Dict[Hashable, int] = {}
+        self._deadlines: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def insert(self, deadline: int, key: Hashable) -> None:
+        """Schedule `key` to fire once the wheel reaches `deadline`."""
+        if key in self._deadlines:
+            self.remove(key)
+        self._deadlines[key] = deadline
+        self._place(deadline, key)
+
+    def remove(self, key: Hashable) -> bool:
+        """Unschedule `key`; returns False if it was not scheduled."""
+        deadline = self._deadlines.pop(key, None)
+        if deadline is None:
+            return False
+        if self._due.pop(key, None) is not None or self._overflow.pop(key, None) is not None:
+            return True
+        for level in range(self.levels):
+            slot = (deadline >> (self.slot_bits * level)) & self.mask
+            if self._wheels[level][slot].pop(key, None) is not None:
+                break
+        return True
+
+    def _place(self, deadline: int, key: Hashable) -> None:
+        if deadline <= self.current_tick:
+            self._due[key] = deadline
+            return
+        delta = deadline - self.current_tick
+        for level in range(self.levels):
+            if delta < 1 << (self.slot_bits * (level + 1)):
+                slot = (deadline >> (self.slot_bits * level)) & self.mask
+                self._wheels[level][slot][key] = deadline
+                return
+        self._overflow[key] = deadline
+
+    def advance(self, target_tick: int) -> List[Tuple[int, Hashable]]:
+        """
+        Advance the wheel to `target_tick`, returning every (deadline, key)
+        that became due, in tick order.
+        """
+        fired = [(deadline, key) for key, deadline in self._due.items()]
+        self._due = {}
+        while self.current_tick < target_tick:
+            if len(self._deadlines) == len(fired):
+                # Nothing left in the wheel; skip idle ticks.
+                self.current_tick = target_tick
+                break
+            self.current_tick += 1
+            tick = self.current_tick
+            for level in range(1, self.levels):
+                if tick & ((1 << (self.slot_bits * level)) - 1):
+                    break
+                slot = (tick >> (self.slot_bits * level)) & self.mask
+                bucket = self._wheels[level][slot]
+                if bucket:
+                    self._wheels[level][slot] = {}
+                    for key, deadline in bucket.items():
+                        self._place(deadline, key)
+            else:
+                if self._overflow and tick & ((1 << (self.slot_bits * self.levels)) - 1) == 0:
+                    overflow, self._overflow = self._overflow, {}
+                    for key, deadline in overflow.items():
+                        self._place(deadline, key)
+            bucket = self._wheels[0][tick & self.mask]
+            if bucket:
+                self._wheels[0][tick & self.mask] = {}
+                fired.extend((deadline, key) for key, deadline in bucket.items())
+            if self._due:
+                fired.extend((deadline, key) for key, deadline in self._due.items())
+                self._due = {}
+        for _, key in fired:
+            del self._deadlines[key]
+        return fired
@@ -0,0 +1,615 @@
+"""
+Indexed, date-partitioned columnar store for the audit trail.
+
+Audit entries appended by the agents are buffered and flushed as immutable
+segments, one or more per calendar day. Each segment holds NumPy columns:
+timestamps, dictionary-encoded member_id/agent/action/status codes, and
+the full entries as JSON. Rows are sorted by member so a member lookup is a
+binary search. A manifest records every segment's time range, member ID
+range and the agents, actions and statuses it contains, so queries skip
+partitions and segments that cannot match before reading any column data.
+Segment files are memory-mapped and columns are views of the mapping, so a
+lookup reads only the pages it touches, including the JSON of matched rows.
+
+Segments are hash-chained for tamper evidence. At flush time each segment's
+columns are hashed in one pass and the segment header records the previous
+segment's chain digest, so altering, removing or reordering any flushed
+entry breaks the chain from that point on. `verify` recomputes the segment
+hashes in parallel across processes and then checks the chain links.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from models.state import AgentState
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger()
+
+Timestamp = Union[float, str, datetime]
+
+# Columns with a dictionary encoding and an equality filter
+INDEXED_FIELDS = ("member_id", "agent", "action", "status")
+
+_MANIFEST = "manifest.json"
+
+# Chain digest that the first segment links to
+GENESIS_DIGEST = "0" * 64
+
+# Segment header arrays, excluded from the content hash
+_HEADER_FIELDS = ("sequence", "prev_digest", "digest")
+
+# Segments kept open (memory-mapped) by a store between queries
+SEGMENT_CACHE_SIZE = 128
+
+# Zip local file header: fixed part, and the offset of its name/extra lengths
+_ZIP_LOCAL_HEADER_SIZE = 30
+_ZIP_NAME_LENGTHS = struct.Struct("<HH")
+
+
+def to_epoch_seconds(value: Timestamp) -> Optional[float]:
+    """Convert an epoch, ISO string or datetime to epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return value.timestamp()
+
+
+def entry_status(entry: Dict[str, Any]) -> str:
+    """Outcome recorded on an audit entry, under "status" or "result"."""
+    return str(entry.get("status") or entry.get("result") or "")
+
+
+def content_digest(arrays: Dict[str, np.ndarray]) -> str:
+    """SHA-256 over every non-header column of a segment, in name order."""
+    sha256 = hashlib.sha256()
+    for name in sorted(arrays):
+        if name in _HEADER_FIELDS:
+            continue
+        array = np.ascontiguousarray(arrays[name])
+        sha256.update(f"{name}:{array.dtype.str}:{array.shape}".encode("utf-8"))
+        sha256.update(array.tobytes())
+    return sha256.hexdigest()
+
+
+def chain_digest(sequence: int, prev_digest: str, segment_digest: str) -> str:
+    """Chain digest linking a segment's content to its predecessor."""
+    return hashlib.sha256(f"{sequence}:{prev_digest}:{segment_digest}".encode("utf-8")).hexdigest()
+
+
+def hash_segment_file(path: str) -> Dict[str, Any]:
+    """
+    Recompute a segment file's digests. Runs in a worker process.
+
+    Returns:
+        Dict[str, Any]: The header's sequence and digests, plus the
+            recomputed chain digest, or an "error" if unreadable
+    """
+    try:
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+    except (OSError, ValueError) as e:
+        return {"path": path, "error": str(e)}
+    if any(name not in arrays for name in _HEADER_FIELDS):
+        return {"path": path, "error": "missing segment header"}
+    sequence = int(arrays["sequence"])
+    prev_digest = str(arrays["prev_digest"])
+    return {
+        "path": path,
+        "sequence": sequence,
+        "prev_digest": prev_digest,
+        "digest": str(arrays["digest"]),
+        "computed_digest": chain_digest(sequence, prev_digest, content_digest(arrays)),
+        "count": len(arrays["timestamp"])
+    }
+
+
+class AuditVerificationResult(BaseModel):
+    """Outcome of verifying the audit hash chain."""
+    valid: bool
+    segments_checked: int
+    entries_checked: int
+    head_digest: str
+    errors: List[str] = []
+
+
+def _npz_layout(f) -> Dict[str, tuple]:
+    """
+    Locate each array stored in an uncompressed .npz file.
+
+    Returns:
+        Dict[str, tuple]: Array name -> (data offset in the file, dtype, shape)
+    """
+    layout = {}
+    with zipfile.ZipFile(f) as archive:
+        infos = archive.infolist()
+    for info in infos:
+        if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith(".npy"):
+            continue
+        f.seek(info.header_offset + _ZIP_LOCAL_HEADER_SIZE - _ZIP_NAME_LENGTHS.size)
+        name_length, extra_length = _ZIP_NAME_LENGTHS.unpack(f.read(_ZIP_NAME_LENGTHS.size))
+        f.seek(name_length + extra_length, os.SEEK_CUR)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        layout[info.filename[:-len(".npy")]] = (f.tell(), dtype, shape)
+    return layout
+
+
+class AuditSegment:
+    """
+    Read access to one flushed segment's columns.
+
+    The file is memory-mapped once and each column is a cached NumPy view of
+    the mapping, so reading a few rows touches only the pages that hold them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._layout = _npz_layout(f)
+            self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            offset, dtype, shape = self._layout[name]
+            count = int(np.prod(shape)) if shape else 1
+            column = np.frombuffer(self._mapping, dtype=dtype, count=count, offset=offset).reshape(shape)
+            self._columns[name] = column
+        return column
+
+    def code(self, field: str, value: str) -> Optional[int]:
+        """Dictionary code of a value in an indexed column, or None if absent."""
+        values = self.column(f"{field}_values")
+        code = int(np.searchsorted(values, value))
+        if code < len(values) and values[code] == value:
+            return code
+        return None
+
+    def entries(self, rows: np.ndarray) -> Iterator[Dict[str, Any]]:
+        """Decode the JSON entries of the given rows."""
+        offsets = self.column("payload_offsets")
+        payload = self.column("payload")
+        for row in rows.tolist():
+            yield json.loads(payload[offsets[row]:offsets[row + 1]].tobytes())
+
+    def close(self) -> None:
+        self._columns.clear()
+        try:
+            self._mapping.close()
+        except BufferError:
+            # A caller still holds a column view; the mapping closes when it is released
+            pass
+
+
+def _encode(values: List[str]):
+    """Dictionary-encode strings as (codes, sorted dictionary)."""
+    dictionary, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return codes.astype(np.int32), dictionary
+
+
+class AuditStore:
+    """
+    Append-only audit store with partition pruning and indexed lookups.
+
+    Entries are visible to queries as soon as they are appended; they are
+    written to disk when the buffer reaches `segment_size` or on flush().
+    """
+
+    def __init__(self, root: str, segment_size: int = 50000):
+        """
+        Args:
+            root: Directory holding the partitions and the manifest
+            segment_size: Buffered entries that trigger a flush
+
+        Raises:
+            ValueError: If the manifest has no head digest
+        """
+        self.root = root
+        self.segment_size = segment_size
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.RLock()
+        self._buffer: List[Dict[str, Any]] = []
+        self._manifest = self._load_manifest()
+        self._open_segments: "OrderedDict[str, AuditSegment]" = OrderedDict()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.root, _MANIFEST)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {"next_segment": 1, "head_digest": GENESIS_DIGEST, "partitions": {}}
+        if "head_digest" not in manifest:
+            raise ValueError(f"Audit manifest in {self.root} has no head digest; the store is corrupt")
+        return manifest
+
+    def _write_manifest(self) -> None:
+        path = os.path.join(self.root, _MANIFEST)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Append one audit entry."""
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Append audit entries, flushing full segments."""
+        with self._lock:
+            self._buffer.extend(entries)
+            if len(self._buffer) >= self.segment_size:
+                self.flush()
+
+    def append_state(self, state: AgentState) -> None:
+        """Append every audit entry of a finished workflow state."""
+        self.append_many(state.get("audit_log", []))
+
+    def flush(self) -> int:
+        """
+        Write buffered entries as one new segment per calendar day.
+
+        Returns:
+            int: Number of entries written
+        """
+        with self._lock:
+            if not self._buffer:
+                return 0
+            buffered, self._buffer = self._buffer, []
+            now = time.time()
+            by_day: Dict[str, List[tuple]] = {}
+            for entry in buffered:
+                timestamp = to_epoch_seconds(entry.get("timestamp"))
+                if timestamp is None:
+                    timestamp = now
+                day = datetime.fromtimestamp(timestamp, timezone.utc).date().isoformat()
+                by_day.setdefault(day, []).append((timestamp, entry))
+
+            for day, rows in sorted(by_day.items()):
+                self._write_segment(day, rows)
+            self._write_manifest()
+            logger.info(f"Flushed {len(buffered)} audit entries into {len(by_day)} partitions")
+            return len(buffered)
+
+    def _write_segment(self, day: str, rows: List[tuple]) -> None:
+        columns = {field: [] for field in INDEXED_FIELDS}
+        for _, entry in rows:
+            columns["member_id"].append(str(entry.get("member_id") or ""))
+            columns["agent"].append(str(entry.get("agent") or ""))
+            columns["action"].append(str(entry.get("action") or ""))
+            columns["status"].append(entry_status(entry))
+        arrays = {}
+        for field in INDEXED_FIELDS:
+            arrays[field], arrays[f"{field}_values"] = _encode(columns[field])
+        arrays["timestamp"] = np.array([timestamp for timestamp, _ in rows], dtype=np.float64)
+
+        # Sort rows by member, then time, so member lookups are a contiguous slice
+        order = np.lexsort((arrays["timestamp"], arrays["member_id"]))
+        for field in INDEXED_FIELDS + ("timestamp",):
+            arrays[field] = arrays[field][order]
+
+        encoded = [
+            json.dumps(rows[row][1], separators=(",", ":"), default=str).encode("utf-8")
+            for row in order.tolist()
+        ]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(payload) for payload in encoded], out=offsets[1:])
+        arrays["payload_offsets"] = offsets
+        arrays["payload"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        sequence = self._manifest["next_segment"]
+        prev_digest = self._manifest["head_digest"]
+        digest = chain_digest(sequence, prev_digest, content_digest(arrays))
+        arrays["sequence"] = np.array(sequence, dtype=np.int64)
+        arrays["prev_digest"] = np.array(prev_digest)
+        arrays["digest"] = np.array(digest)
+        self._manifest["next_segment"] = sequence + 1
+        self._manifest["head_digest"] = digest
+        relative_path = os.path.join(day, f"{sequence:08d}.npz")
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+        partition = self._manifest["partitions"].setdefault(day, {"min_ts": None, "max_ts": None, "segments": []})
+        min_ts, max_ts = float(arrays["timestamp"].min()), float(arrays["timestamp"].max())
+        partition["min_ts"] = min_ts if partition["min_ts"] is None else min(partition["min_ts"], min_ts)
+        partition["max_ts"] = max_ts if partition["max_ts"] is None else max(partition["max_ts"], max_ts)
+        partition["segments"].append({
+            "sequence": sequence,
+            "path": relative_path,
+            "count": len(rows),
+            "min_ts": min_ts,
+            "max_ts": max_ts,
+            "agents": arrays["agent_values"].tolist(),
+            "actions": arrays["action_values"].tolist(),
+            "statuses": arrays["status_values"].tolist(),
+            "min_member": str(arrays["member_id_values"][0]),
+            "max_member": str(arrays["member_id_values"][-1]),
+            "prev_digest": prev_digest,
+            "digest": digest
+        })
+
+    def query(self, member_id: Optional[str] = None, agent: Optional[str] = None, action: Optional[str] = None,
+              status: Optional[str] = None, start: Optional[Timestamp] = None,
+              end: Optional[Timestamp] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream audit entries matching every given filter.
+
+        Results are ordered by partition and, within a segment, by time.
+        Entries still in the write buffer are returned last.
+
+        Args:
+            member_id: Only entries for this member
+            agent: Only entries from this agent
+            action: Only entries with this action
+            status: Only entries with this status or result
+            start: Inclusive lower bound on the entry timestamp
+            end: Exclusive upper bound on the entry timestamp
+
+        Yields:
+            Dict[str, Any]: Matching audit entries
+        """
+        filters = {"member_id": member_id, "agent": agent, "action": action, "status": status}
+        start_ts, end_ts = to_epoch_seconds(start), to_epoch_seconds(end)
+
+        for segment_info in self.segments(start_ts, end_ts, agent, action, status, member_id):
+            segment = self._segment(segment_info["path"])
+            rows = self._match(segment, filters, start_ts, end_ts)
+            if rows is not None and len(rows):
+                yield from segment.entries(rows)
+
+        with self._lock:
+            buffered = list(self._buffer)
+        for entry in buffered:
+            if self._match_entry(entry, filters, start_ts, end_ts):
+                yield entry
+
+    def _segment(self, relative_path: str) -> AuditSegment:
+        """Open a segment, reusing recently opened ones; segments never change once written."""
+        with self._lock:
+            segment = self._open_segments.pop(relative_path, None)
+            if segment is None:
+                segment = AuditSegment(os.path.join(self.root, relative_path))
+            self._open_segments[relative_path] = segment
+            if len(self._open_segments) > SEGMENT_CACHE_SIZE:
+                _, evicted = self._open_segments.popitem(last=False)
+                evicted.close()
+            return segment
+
+    def segments(self, start_ts: Optional[float] = None, end_ts: Optional[float] = None,
+                 agent: Optional[str] = None, action: Optional[str] = None,
+                 status: Optional[str] = None, member_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Manifest entries of the segments that may hold matching rows."""
+        with self._lock:
+            partitions = sorted(self._manifest["partitions"].items())
+        selected = []
+        for _, partition in partitions:
+            if start_ts is not None and partition["max_ts"] < start_ts:
+                continue
+            if end_ts is not None and partition["min_ts"] >= end_ts:
+                continue
+            for info in partition["segments"]:
+                if start_ts is not None and info["max_ts"] < start_ts:
+                    continue
+                if end_ts is not None and info["min_ts"] >= end_ts:
+                    continue
+                if agent is not None and agent not in info["agents"]:
+                    continue
+                if action is not None and action not in info["actions"]:
+                    continue
+                if status is not None and status not in info["statuses"]:
+                    continue
+                if member_id is not None and not info["min_member"] <= member_id <= info["max_member"]:
+                    continue
+                selected.append(info)
+        return selected
+
+    @staticmethod
+    def _match(segment: AuditSegment, filters: Dict[str, Optional[str]],
+               start_ts: Optional[float], end_ts: Optional[float]) -> Optional[np.ndarray]:
+        """Row numbers of a segment matching the filters, in time order."""
+        codes = {}
+        for field, value in filters.items():
+            if value is not None:
+                codes[field] = segment.code(field, value)
+                if codes[field] is None:
+                    return None
+
+        if "member_id" in codes:
+            members = segment.column("member_id")
+            low = np.searchsorted(members, codes["member_id"], side="left")
+            high = np.searchsorted(members, codes["member_id"], side="right")
+            rows = np.arange(low, high)
+        else:
+            rows = np.arange(len(segment.column("timestamp")))
+
+        timestamps = segment.column("timestamp")[rows]
+        mask = np.ones(len(rows), dtype=bool)
+        for field, code in codes.items():
+            if field != "member_id":
+                mask &= segment.column(field)[rows] == code
+        if start_ts is not None:
+            mask &= timestamps >= start_ts
+        if end_ts is not None:
+            mask &= timestamps < end_ts
+        rows = rows[mask]
+        return rows[np.argsort(timestamps[mask], kind="stable")]
+
+    @staticmethod
+    def _match_entry(entry: Dict[str, Any], filters: Dict[str, Optional[str]],
+                     start_ts: Optional[float], end_ts: Optional[float]) -> bool:
+        values = {
+            "member_id": str(entry.get("member_id") or ""),
+            "agent": str(entry.get("agent") or ""),
+            "action": str(entry.get("action") or ""),
+            "status": entry_status(entry)
+        }
+        if any(value is not None and values[field] != value for field, value in filters.items()):
+            return False
+        if start_ts is None and end_ts is None:
+            return True
+        timestamp = to_epoch_seconds(entry.get("timestamp"))
+        if timestamp is None:
+            return False
+        return (start_ts is None or timestamp >= start_ts) and (end_ts is None or timestamp < end_ts)
+
+    def partitions(self) -> Dict[str, Dict[str, Any]]:
+        """Per-day partition summaries: time range, segment and entry counts."""
+        with self._lock:
+            return {
+                day: {
+                    "min_ts": partition["min_ts"],
+                    "max_ts": partition["max_ts"],
+                    "segments": len(partition["segments"]),
+                    "entries": sum(info["count"] for info in partition["segments"])
+                }
+                for day, partition in sorted(self._manifest["partitions"].items())
+            }
+
+    def head_digest(self) -> str:
+        """Chain digest of the latest segment; publish it to anchor the trail."""
+        with self._lock:
+            return self._manifest["head_digest"]
+
+    def verify(self, processes: Optional[int] = None,
+               expected_head: Optional[str] = None) -> AuditVerificationResult:
+        """
+        Verify the hash chain over every flushed segment.
+
+        Segment contents are rehashed in parallel; the chain links are then
+        checked in sequence order against the headers and the manifest.
+
+        Args:
+            processes: Worker processes (defaults to the CPU count)
+            expected_head: Head digest recorded elsewhere, to detect the
+                trail being truncated or rewritten along with the manifest
+
+        Returns:
+            AuditVerificationResult: Whether the chain is intact, with errors
+        """
+        with self._lock:
+            manifest_segments = sorted(
+                (info for partition in self._manifest["partitions"].values() for info in partition["segments"]),
+                key=lambda info: info["sequence"]
+            )
+            head = self._manifest["head_digest"]
+            next_segment = self._manifest["next_segment"]
+
+        paths = [os.path.join(self.root, info["path"]) for info in manifest_segments]
+        processes = processes or os.cpu_count() or 1
+        if processes == 1 or len(paths) < 2:
+            hashed = [hash_segment_file(path) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                hashed = list(pool.map(hash_segment_file, paths, chunksize=max(1, len(paths) // (processes * 4))))
+
+        errors = []
+        if [info["sequence"] for info in manifest_segments] != list(range(1, next_segment)):
+            errors.append("Segment sequence numbers are not contiguous")
+        prev_digest = GENESIS_DIGEST
+        entries = 0
+        for info, result in zip(manifest_segments, hashed):
+            label = f"segment {info['sequence']} ({info['path']})"
+            if "error" in result:
+                errors.append(f"{label}: {result['error']}")
+                prev_digest = info["digest"]
+                continue
+            entries += result["count"]
+            if result["sequence"] != info["sequence"]:
+                errors.append(f"{label}: header sequence {result['sequence']} does not match the manifest")
+            if result["prev_digest"] != prev_digest:
+                errors.append(f"{label}: does not link to the previous segment")
+            if result["computed_digest"] != result["digest"]:
+                errors.append(f"{label}: contents do not match the recorded digest")
+            if result["digest"] != info["digest"]:
+                errors.append(f"{label}: digest does not match the manifest")
+            prev_digest = result["digest"]
+        if prev_digest != head:
+            errors.append("Last segment does not match the manifest head digest")
+        if expected_head is not None and head != expected_head:
+            errors.append("Head digest does not match the expected head")
+
+        if errors:
+            logger.warning(f"Audit chain verification failed with {len(errors)} errors")
+        return AuditVerificationResult(
+            valid=not errors,
+            segments_checked=len(hashed),
+            entries_checked=entries,
+            head_digest=head,
+            errors=errors
+        )
+
+    def close(self) -> None:
+        """Flush any buffered entries and release open segments."""
+        self.flush()
+        with self._lock:
+            for segment in self._open_segments.values():
+                segment.close()
+            self._open_segments.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest and query the audit trail")
+    parser.add_argument("--root", type=str, default="data/audit", help="Audit store directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest JSONL audit entries or workflow results")
+    ingest_parser.add_argument("inputs", nargs="+", help="JSONL files")
+
+    query_parser = subparsers.add_parser("query", help="Print matching entries as JSONL")
+    for field in INDEXED_FIELDS:
+        query_parser.add_argument(f"--{field}", type=str, default=None)
+    query_parser.add_argument("--start", type=str, default=None, help="Inclusive ISO start time")
+    query_parser.add_argument("--end", type=str, default=None, help="Exclusive ISO end time")
+
+    verify_parser = subparsers.add_parser("verify", help="Verify the audit hash chain")
+    verify_parser.add_argument("--processes", type=int, default=None, help="Worker processes")
+    verify_parser.add_argument("--expected_head", type=str, default=None, help="Previously published head digest")
+
+    args = parser.parse_args()
+
+    store = AuditStore(args.root)
+    if args.command == "ingest":
+        from reporting.compliance_report import iter_records
+
+        for path in args.inputs:
+            for record in iter_records(path):
+                store.append_many(record["audit_log"] if "audit_log" in record else [record])
+        store.close()
+        print(store.head_digest())
+    elif args.command == "verify":
+        result = store.verify(args.processes, args.expected_head)
+        print(result.model_dump_json(indent=2))
+        raise SystemExit(0 if result.valid else 1)
+    else:
+        for entry in store.query(member_id=args.member_id, agent=args.agent, action=args.action,
+                                 status=args.status, start=args.start, end=args.end):
+            print(json.dumps(entry))
@@ -0,0 +1,171 @@
+"""
+Per-agent step checkpointing for mid-workflow resume.
+
+After each agent step the workflow state is serialized to compact,
+zlib-compressed JSON and written to a pluggable store keyed by run and
+member ID. A member whose workflow fails part way through resumes from the
+last completed step instead of rerunning every agent. Checkpoints from
+another run are never seen, and one whose member has changed since it was
+saved is discarded rather than resumed.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from models.state import AgentState, deserialize_state, serialize_state
+
+
+def encode_state(state: AgentState) -> bytes:
+    """Serialize a workflow state to compressed JSON."""
+    payload = json.dumps(serialize_state(state), separators=(",", ":"), default=str)
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def decode_state(payload: bytes) -> AgentState:
+    """Restore a workflow state written by `encode_state`."""
+    return deserialize_state(json.loads(zlib.decompress(payload).decode("utf-8")), trusted=True)
+
+
+class CheckpointStore:
+    """Storage backend for checkpoints: one (step, payload) record per key."""
+
+    def put(self, key: str, step: str, payload: bytes) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """In-process checkpoint store, useful for retries within one worker."""
+
+    def __init__(self):
+        self._records: Dict[str, Tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, step: str, payload: bytes) -> None:
+        with self._lock:
+            self._records[key] = (step, payload)
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            return self._records.get(key)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._records.pop(key, None)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Checkpoint store backed by a SQLite database shared between processes."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "key TEXT PRIMARY KEY, step TEXT NOT NULL, payload BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def put(self, key: str, step: str, payload: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, step, payload, updated_at) VALUES (?, ?, ?, ?)",
+                (key, step, payload, time.time())
+            )
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            row = self._conn.execute("SELECT step, payload FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Checkpoint store writing one file per key, replaced atomically."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        safe_key = "".join(c if c.isalnum() or c in "-_" else "_" for c in key)
+        return os.path.join(self.directory, f"{safe_key}.ckpt")
+
+    def put(self, key: str, step: str, payload: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(step.encode("utf-8") + b"\n" + payload)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        step, _, payload = data.partition(b"\n")
+        return step.decode("utf-8"), payload
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class Checkpointer:
+    """Saves and restores workflow states after each completed agent step."""
+
+    def __init__(self, store: Optional[CheckpointStore] = None, run_id: Optional[str] = None):
+        """
+        Args:
+            store: Checkpoint storage (defaults to in-process memory)
+            run_id: Run the checkpoints belong to, e.g. a sweep's queue; a
+                shared store keeps each run's checkpoints apart
+        """
+        self.store = store or MemoryCheckpointStore()
+        self.run_id = run_id
+
+    def _key(self, member_id: str) -> str:
+        return member_id if self.run_id is None else f"{self.run_id}:{member_id}"
+
+    def save(self, member_id: str, step: str, state: AgentState) -> None:
+        """Record that `step` completed for the member, with the resulting state."""
+        self.store.put(self._key(member_id), step, encode_state(state))
+
+    def restore(self, member_id: str) -> Optional[Tuple[str, AgentState]]:
+        """
+        Load the member's last checkpoint.
+
+        Returns:
+            Optional[Tuple[str, AgentState]]: The last completed step and its state,
+            or None if the member has no checkpoint
+        """
+        record = self.store.get(self._key(member_id))
+        if record is None:
+            return None
+        step, payload = record
+        return step, decode_state(payload)
+
+    def clear(self, member_id: str) -> None:
+        """Remove the member's checkpoint once the workflow has completed."""
+        self.store.delete(self._key(member_id))
@@ -0,0 +1,139 @@
+"""
+Population-wide document masks for vectorized document queries.
+
+Required and submitted documents for every member are held as two uint64
+NumPy columns, so questions like "how many members are missing
+income_verification" are a single vectorized pass instead of a Python loop
+over members and documents.
+
+Building or updating the table registers the members' document types. Types
+that get no bit because the registry is full are kept by name for the few
+members that have them, so every query stays exact.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import numpy as np
+
+from models.documents import DOCUMENT_REGISTRY
+from models.member import Member
+
+# Required and submitted document types of a member with types outside the registry
+Unencoded = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+def _unencoded(member: Member) -> Optional[Unencoded]:
+    """Register a member's document types; returns them by name if any could not be encoded."""
+    required = member.eligibility.required_documents
+    on_file = member.documents or {}
+    DOCUMENT_REGISTRY.register_all(required)
+    DOCUMENT_REGISTRY.register_all(on_file)
+    if DOCUMENT_REGISTRY.encodes(required):
+        return None
+    return frozenset(required), frozenset(on_file)
+
+
+def _popcount(masks: np.ndarray) -> np.ndarray:
+    counts = np.zeros(len(masks), dtype=np.int64)
+    for index in range(64):
+        counts += ((masks >> np.uint64(index)) & np.uint64(1)).astype(np.int64)
+    return counts
+
+
+class DocumentMaskTable:
+    """Required/submitted document bitmasks for a population of members."""
+
+    def __init__(self, members: Iterable[Member]):
+        members = list(members)
+        self.member_ids: List[str] = [member.id for member in members]
+        self._rows: Dict[str, int] = {member_id: row for row, member_id in enumerate(self.member_ids)}
+        self.unencoded: Dict[int, Unencoded] = {}
+        for row, member in enumerate(members):
+            unencoded = _unencoded(member)
+            if unencoded is not None:
+                self.unencoded[row] = unencoded
+        self.required = np.fromiter(
+            (member.required_document_mask() for member in members), dtype=np.uint64, count=len(members)
+        )
+        self.submitted = np.fromiter(
+            (member.submitted_document_mask() for member in members), dtype=np.uint64, count=len(members)
+        )
+
+    @classmethod
+    def from_arrays(cls, member_ids: List[str], required: np.ndarray, submitted: np.ndarray,
+                    unencoded: Optional[Dict[int, Unencoded]] = None) -> "DocumentMaskTable":
+        """Rebuild a table from saved mask columns, e.g. from a repository snapshot."""
+        table = cls.__new__(cls)
+        table.member_ids = member_ids
+        table._rows = {member_id: row for row, member_id in enumerate(member_ids)}
+        table.required = required
+        table.submitted = submitted
+        table.unencoded = dict(unencoded or {})
+        return table
+
+    def __len__(self) -> int:
+        return len(self.member_ids)
+
+    def __contains__(self, member_id: str) -> bool:
+        return member_id in self._rows
+
+    def update(self, member: Member) -> None:
+        """Refresh the masks of a member already in the table."""
+        row = self._rows[member.id]
+        unencoded = _unencoded(member)
+        if unencoded is None:
+            self.unencoded.pop(row, None)
+        else:
+            self.unencoded[row] = unencoded
+        self.required[row] = member.required_document_mask()
+        self.submitted[row] = member.submitted_document_mask()
+
+    def missing(self) -> np.ndarray:
+        """Missing-document mask per member: required & ~submitted, for registered types."""
+        return self.required & ~self.submitted
+
+    def _unencoded_missing(self, document_type: str) -> List[int]:
+        """Rows missing a document type that has no bit."""
+        return sorted(
+            row for row, (required, on_file) in self.unencoded.items()
+            if document_type in required and document_type not in on_file
+        )
+
+    def missing_per_member(self) -> np.ndarray:
+        """Number of missing required documents per member."""
+        counts = _popcount(self.missing())
+        for row, (required, on_file) in self.unencoded.items():
+            counts[row] += sum(1 for document_type in required
+                               if document_type not in on_file and document_type not in DOCUMENT_REGISTRY)
+        return counts
+
+    def count_missing(self, document_type: str) -> int:
+        """Count members missing a specific document."""
+        bit = DOCUMENT_REGISTRY.bit(document_type)
+        if not bit:
+            return len(self._unencoded_missing(document_type))
+        return int(np.count_nonzero(self.missing() & np.uint64(bit)))
+
+    def missing_counts(self) -> Dict[str, int]:
+        """Count members missing each document type."""
+        missing = self.missing()
+        counts = {
+            document_type: int(np.count_nonzero(missing & np.uint64(1 << index)))
+            for index, document_type in enumerate(DOCUMENT_REGISTRY.document_types)
+        }
+        for required, on_file in self.unencoded.values():
+            for document_type in required:
+                if document_type not in on_file and document_type not in DOCUMENT_REGISTRY:
+                    counts[document_type] = counts.get(document_type, 0) + 1
+        return counts
+
+    def members_missing(self, document_type: str) -> List[str]:
+        """IDs of members missing a specific document."""
+        bit = DOCUMENT_REGISTRY.bit(document_type)
+        if not bit:
+            return [self.member_ids[row] for row in self._unencoded_missing(document_type)]
+        rows = np.flatnonzero(self.missing() & np.uint64(bit))
+        return [self.member_ids[row] for row in rows]
+
+    def incomplete_count(self) -> int:
+        """Count members missing at least one required document."""
+        return int(np.count_nonzero(self.missing_per_member()))
@@ -0,0 +1,455 @@
+"""
+Content-addressed document store.
+
+Uploads are streamed to disk in chunks and hashed with SHA-256 while they are
+written, then moved to a path derived from the digest. Identical uploads
+(for example the same address proof submitted by every member of a
+household) are stored once and referenced many times. Reads are served from
+memory-mapped files, and validation (type sniffing, size and page limits)
+runs on a worker pool so intake never blocks on it.
+
+An upload can be staged with `put_object` (or written chunk by chunk with
+`open_object`), validated, and only then referenced by a member with
+`add_reference`; `StoredDocument.to_document_record` is the entry put on
+file in `Member.documents`, where the document checks read it.
+Objects no member references any more are removed by `collect_garbage`.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from pydantic import BaseModel
+
+from models.member import Member
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 25 * 1024 * 1024
+DEFAULT_MAX_PAGES = 50
+
+# Magic-number signatures for accepted document formats
+_SIGNATURES = [
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff")
+]
+_PDF_PAGE = re.compile(rb"/Type\s*/Page(?!s)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    content_type TEXT,
+    pages INTEGER,
+    valid INTEGER,
+    errors TEXT
+);
+CREATE TABLE IF NOT EXISTS refs (
+    member_id TEXT NOT NULL,
+    document_type TEXT NOT NULL,
+    digest TEXT NOT NULL REFERENCES objects (digest),
+    filename TEXT,
+    uploaded_at TEXT NOT NULL,
+    PRIMARY KEY (member_id, document_type)
+);
+CREATE INDEX IF NOT EXISTS idx_refs_digest ON refs (digest);
+"""
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised when an upload exceeds the store's size limit."""
+
+
+class StoredDocument(BaseModel):
+    """A member's reference to a stored document."""
+    member_id: str
+    document_type: str
+    digest: str
+    size: int
+    filename: Optional[str] = None
+    uploaded_at: str
+    deduplicated: bool = False
+
+    def to_document_record(self) -> Dict[str, Any]:
+        """Build the entry stored in `Member.documents` for this upload."""
+        return {
+            "status": "submitted",
+            "date": self.uploaded_at,
+            "sha256": self.digest,
+            "size": self.size,
+            "filename": self.filename
+        }
+
+    def apply_to_member(self, member: Member) -> Member:
+        """Return a copy of the member with this upload on file for its document type."""
+        documents = dict(member.documents or {})
+        documents[self.document_type] = self.to_document_record()
+        return member.model_copy(update={"documents": documents})
+
+
+class ValidationResult(BaseModel):
+    """Outcome of validating a stored document."""
+    digest: str
+    valid: bool
+    content_type: Optional[str] = None
+    pages: Optional[int] = None
+    errors: List[str] = []
+
+
+def sniff_content_type(header: bytes) -> Optional[str]:
+    """Identify a document format from its leading bytes."""
+    for signature, content_type in _SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+
+def validate_document_file(path: str, digest: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                           max_pages: int = DEFAULT_MAX_PAGES) -> ValidationResult:
+    """
+    Validate a stored document file. Runs in a worker process.
+
+    Args:
+        path: Path of the stored object
+        digest: SHA-256 digest of the object
+        max_bytes: Maximum accepted size
+        max_pages: Maximum accepted page count for PDFs
+
+    Returns:
+        ValidationResult: The detected type, page count and any errors
+    """
+    errors = []
+    size = os.path.getsize(path)
+    if size == 0:
+        return ValidationResult(digest=digest, valid=False, errors=["Document is empty"])
+    if size > max_bytes:
+        errors.append(f"Document is {size} bytes, limit is {max_bytes}")
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        content_type = sniff_content_type(data[:16])
+        pages = None
+        if content_type is None:
+            errors.append("Unsupported document type")
+        elif content_type == "application/pdf":
+            pages = sum(1 for _ in _PDF_PAGE.finditer(data))
+            if pages > max_pages:
+                errors.append(f"Document has {pages} pages, limit is {max_pages}")
+        else:
+            pages = 1
+
+    return ValidationResult(digest=digest, valid=not errors, content_type=content_type,
+                            pages=pages, errors=errors)
+
+
+class ObjectWriter:
+    """
+    An object being written to the store. Each chunk is hashed and written
+    once, to a temporary file that `commit` moves to the object path; an
+    uncommitted file is removed when the writer is closed.
+    """
+
+    def __init__(self, store: "DocumentStore"):
+        self._store = store
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=store._tmp_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        """
+        Append a chunk.
+
+        Raises:
+            DocumentTooLargeError: If the object would exceed the store's `max_bytes`
+        """
+        self.size += len(chunk)
+        if self.size > self._store.max_bytes:
+            raise DocumentTooLargeError(f"Upload exceeds {self._store.max_bytes} bytes")
+        self._sha256.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self) -> Tuple[str, int, bool]:
+        """
+        Add the written content to the store.
+
+        Returns:
+            Tuple[str, int, bool]: (digest, size, whether the content was already stored)
+        """
+        self._file.close()
+        tmp_path, self._tmp_path = self._tmp_path, None
+        return self._store._place(self._sha256.hexdigest(), self.size, tmp_path)
+
+    def close(self) -> None:
+        """Discard the content unless it was committed."""
+        self._file.close()
+        if self._tmp_path is not None:
+            os.remove(self._tmp_path)
+            self._tmp_path = None
+
+    def __enter__(self) -> "ObjectWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DocumentStore:
+    """Deduplicating, content-addressed store for member documents."""
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES, max_pages: int = DEFAULT_MAX_PAGES,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            root: Directory holding objects and the reference index
+            max_bytes: Uploads larger than this are rejected while streaming
+            max_pages: Maximum page count accepted by validation
+            executor: Pool used for validation; defaults to a process pool
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self._objects_dir = os.path.join(root, "objects")
+        self._tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor()
+        return self._executor
+
+    def object_path(self, digest: str) -> str:
+        """Path of the object with the given digest."""
+        return os.path.join(self._objects_dir, digest[:2], digest[2:4], digest)
+
+    def put(self, member_id: str, document_type: str, stream: BinaryIO,
+            filename: Optional[str] = None) -> StoredDocument:
+        """
+        Stream an upload into the store and record it for a member.
+
+        Args:
+            member_id: The uploading member
+            document_type: Document type, e.g. "address_proof"
+            stream: Binary file-like object to read the upload from
+            filename: Original file name, kept for display
+
+        Returns:
+            StoredDocument: The member's reference to the stored content
+
+        Raises:
+            DocumentTooLargeError: If the upload exceeds `max_bytes`
+        """
+        digest, size, deduplicated = self.put_object(stream)
+        stored = self.add_reference(member_id, document_type, digest, filename)
+        return stored.model_copy(update={"deduplicated": deduplicated})
+
+    def put_object(self, stream: BinaryIO) -> Tuple[str, int, bool]:
+        """
+        Stream content into the store without referencing it from a member,
+        e.g. to validate it first. Unreferenced objects are kept for at least
+        the garbage-collection grace period.
+
+        Returns:
+            Tuple[str, int, bool]: (digest, size, whether the content was already stored)
+
+        Raises:
+            DocumentTooLargeError: If the upload exceeds `max_bytes`
+        """
+        with self.open_object() as writer:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+            return writer.commit()
+
+    def open_object(self) -> "ObjectWriter":
+        """
+        Start an object written chunk by chunk, e.g. straight from a request
+        body; `commit` adds it to the store like `put_object`.
+        """
+        return ObjectWriter(self)
+
+    def _place(self, digest: str, size: int, tmp_path: str) -> Tuple[str, int, bool]:
+        """Move a fully written temporary file to its object path, or drop it if the content is stored."""
+        path = self.object_path(digest)
+        with self._lock, self._conn:
+            # Placing the file under the write lock keeps a concurrent collect_garbage from deleting it
+            self._conn.execute("BEGIN IMMEDIATE")
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            # A re-upload restarts the grace period of an unreferenced object
+            self._conn.execute(
+                "INSERT INTO objects (digest, size, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (digest) DO UPDATE SET created_at = excluded.created_at",
+                (digest, size, time.time())
+            )
+        return digest, size, deduplicated
+
+    def add_reference(self, member_id: str, document_type: str, digest: str,
+                      filename: Optional[str] = None) -> StoredDocument:
+        """
+        Record a stored object as a member's document of a type, replacing
+        any earlier one.
+
+        Raises:
+            FileNotFoundError: If the object is not in the store
+        """
+        uploaded_at = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT size FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                raise FileNotFoundError(f"Document object {digest} is not in the store")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refs (member_id, document_type, digest, filename, uploaded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (member_id, document_type, digest, filename, uploaded_at)
+            )
+        return StoredDocument(member_id=member_id, document_type=document_type, digest=digest, size=row[0],
+                              filename=filename, uploaded_at=uploaded_at)
+
+    def remove(self, member_id: str, document_type: str) -> bool:
+        """Drop a member's document reference; the object is collected once unreferenced."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM refs WHERE member_id = ? AND document_type = ?", (member_id, document_type)
+            )
+        return cursor.rowcount > 0
+
+    def get(self, member_id: str, document_type: str) -> Optional[StoredDocument]:
+        """Look up a member's stored document."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.digest, o.size, r.filename, r.uploaded_at FROM refs r JOIN objects o USING (digest) "
+                "WHERE r.member_id = ? AND r.document_type = ?",
+                (member_id, document_type)
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredDocument(member_id=member_id, document_type=document_type, digest=row[0], size=row[1],
+                              filename=row[2], uploaded_at=row[3])
+
+    @contextmanager
+    def open(self, digest: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        """Memory-map a stored object read-only (empty objects yield b"")."""
+        with open(self.object_path(digest), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+
+    def validate(self, digest: str) -> Future:
+        """
+        Validate a stored object on the worker pool. Results are cached per
+        digest, so deduplicated uploads are validated once.
+
+        Returns:
+            Future: Resolves to a ValidationResult
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valid, content_type, pages, errors FROM objects WHERE digest = ?", (digest,)
+            ).fetchone()
+        if row is not None and row[0] is not None:
+            future: Future = Future()
+            future.set_result(ValidationResult(
+                digest=digest, valid=bool(row[0]), content_type=row[1], pages=row[2],
+                errors=row[3].split("\n") if row[3] else []
+            ))
+            return future
+
+        future = self._pool().submit(
+            validate_document_file, self.object_path(digest), digest, self.max_bytes, self.max_pages
+        )
+        future.add_done_callback(self._record_validation)
+        return future
+
+    def _record_validation(self, future: Future) -> None:
+        if future.exception() is not None:
+            return
+        result = future.result()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE objects SET valid = ?, content_type = ?, pages = ?, errors = ? WHERE digest = ?",
+                (int(result.valid), result.content_type, result.pages, "\n".join(result.errors), result.digest)
+            )
+
+    def put_and_validate(self, member_id: str, document_type: str, stream: BinaryIO,
+                         filename: Optional[str] = None) -> Future:
+        """Store an upload and return a future for its validation result."""
+        stored = self.put(member_id, document_type, stream, filename)
+        return self.validate(stored.digest)
+
+    def reference_count(self, digest: str) -> int:
+        """Number of member documents that point at an object."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM refs WHERE digest = ?", (digest,)).fetchone()[0]
+
+    def collect_garbage(self, grace_seconds: float = 3600.0) -> int:
+        """
+        Delete objects no member document references, and abandoned upload
+        temp files. Objects stored within the grace period are kept so an
+        upload awaiting validation is not collected before it is referenced.
+
+        Args:
+            grace_seconds: Minimum age of an unreferenced object or temp file
+
+        Returns:
+            int: Number of objects deleted
+        """
+        cutoff = time.time() - grace_seconds
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            digests = [row[0] for row in self._conn.execute(
+                "SELECT digest FROM objects o WHERE created_at < ? "
+                "AND NOT EXISTS (SELECT 1 FROM refs r WHERE r.digest = o.digest)",
+                (cutoff,)
+            )]
+            self._conn.executemany("DELETE FROM objects WHERE digest = ?", ((digest,) for digest in digests))
+            for digest in digests:
+                path = self.object_path(digest)
+                try:
+                    os.remove(path)
+                    # Prune the fan-out directories once they are empty
+                    os.rmdir(os.path.dirname(path))
+                    os.rmdir(os.path.dirname(os.path.dirname(path)))
+                except OSError:
+                    pass
+
+        for name in os.listdir(self._tmp_dir):
+            path = os.path.join(self._tmp_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(digests)
+
+    def close(self) -> None:
+        """Shut down the validation pool and close the index."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+        self._conn.close()
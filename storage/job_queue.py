@@ -0,0 +1,240 @@
+"""
+Durable SQLite-backed job queue for per-member work items.
+
+Workers lease items with a visibility timeout, acknowledge completion, and
+report failures. An item whose lease expires becomes visible again; items
+that fail `max_attempts` times are moved to the dead-letter state.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from pydantic import BaseModel
+
+# Job statuses
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+DEAD = "dead"
+
+# Returned by `fail` when the worker no longer held the lease; never stored
+LOST = "lost"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    member_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (queue, member_id)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (queue, status, lease_expires);
+"""
+
+
+class Job(BaseModel):
+    """A leased work item."""
+    id: int
+    queue: str
+    member_id: str
+    attempts: int
+    lease_owner: str
+    lease_expires: float
+
+
+class JobQueue:
+    """
+    Durable work queue stored in a single SQLite file.
+
+    Safe to share between processes: every state change runs in an
+    immediate transaction, so two workers can never lease the same item.
+    """
+
+    def __init__(self, path: str, visibility_timeout: float = 300.0, max_attempts: int = 3):
+        """
+        Open (and create if needed) a job queue.
+
+        Args:
+            path: Path to the SQLite database file
+            visibility_timeout: Seconds a leased item stays invisible to other workers
+            max_attempts: Number of leases before a failing item is dead-lettered
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def enqueue(self, member_ids: Iterable[str], queue: str = "default") -> int:
+        """
+        Add work items for members. Members already in the queue are skipped,
+        so re-enqueueing the same population resumes instead of duplicating.
+
+        Args:
+            member_ids: IDs of the members to process
+            queue: Name of the queue
+
+        Returns:
+            int: Number of newly added items
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (queue, member_id, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((queue, member_id, PENDING, now, now) for member_id in member_ids)
+            )
+            return conn.total_changes - before
+
+    def lease(self, worker_id: str, limit: int = 1, queue: str = "default") -> List[Job]:
+        """
+        Lease up to `limit` visible items.
+
+        Items whose lease expired after their final attempt are dead-lettered
+        here rather than handed out again.
+
+        Args:
+            worker_id: Identifier of the leasing worker
+            limit: Maximum number of items to lease
+            queue: Name of the queue
+
+        Returns:
+            List[Job]: The leased items
+        """
+        now = time.time()
+        expires = now + self.visibility_timeout
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, last_error = COALESCE(last_error, 'lease expired'), updated_at = ? "
+                "WHERE queue = ? AND status = ? AND lease_expires <= ? AND attempts >= ?",
+                (DEAD, now, queue, LEASED, now, self.max_attempts)
+            )
+            rows = conn.execute(
+                "SELECT id, member_id, attempts FROM jobs "
+                "WHERE queue = ? AND (status = ? OR (status = ? AND lease_expires <= ?)) "
+                "ORDER BY id LIMIT ?",
+                (queue, PENDING, LEASED, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                ((LEASED, worker_id, expires, now, row[0]) for row in rows)
+            )
+        return [
+            Job(id=row[0], queue=queue, member_id=row[1], attempts=row[2] + 1,
+                lease_owner=worker_id, lease_expires=expires)
+            for row in rows
+        ]
+
+    def extend_lease(self, job: Job, seconds: Optional[float] = None) -> bool:
+        """
+        Extend the lease on an item the worker still owns.
+
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+        expires = time.time() + (seconds if seconds is not None else self.visibility_timeout)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (expires, job.id, LEASED, job.lease_owner)
+            )
+        if cursor.rowcount:
+            job.lease_expires = expires
+        return cursor.rowcount == 1
+
+    def ack(self, job: Job, result: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Mark a leased item as done.
+
+        Returns:
+            bool: False if the lease was lost and the item was not updated
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (DONE, json.dumps(result) if result is not None else None, time.time(),
+                 job.id, LEASED, job.lease_owner)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job: Job, error: str) -> str:
+        """
+        Record a failed attempt. The item is made visible again, or
+        dead-lettered once it has used up its attempts.
+
+        Returns:
+            str: The new status of the item, or LOST if the lease had passed to
+                another worker and the item was not updated
+        """
+        status = DEAD if job.attempts >= self.max_attempts else PENDING
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (status, error, time.time(), job.id, LEASED, job.lease_owner)
+            )
+        return status if cursor.rowcount == 1 else LOST
+
+    def requeue_dead(self, queue: str = "default") -> int:
+        """Give dead-lettered items a fresh set of attempts."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, updated_at = ? WHERE queue = ? AND status = ?",
+                (PENDING, time.time(), queue, DEAD)
+            )
+        return cursor.rowcount
+
+    def stats(self, queue: str = "default") -> Dict[str, int]:
+        """Count items in each status."""
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, DEAD: 0}
+        for status, count in self._conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE queue = ? GROUP BY status", (queue,)
+        ):
+            counts[status] = count
+        return counts
+
+    def dead_letters(self, queue: str = "default") -> List[Dict[str, Any]]:
+        """List dead-lettered items with their last error."""
+        rows = self._conn.execute(
+            "SELECT member_id, attempts, last_error FROM jobs WHERE queue = ? AND status = ? ORDER BY id",
+            (queue, DEAD)
+        ).fetchall()
+        return [{"member_id": row[0], "attempts": row[1], "error": row[2]} for row in rows]
+
+    def results(self, queue: str = "default") -> Iterator[Dict[str, Any]]:
+        """Iterate over the stored results of completed items."""
+        for member_id, result in self._conn.execute(
+            "SELECT member_id, result FROM jobs WHERE queue = ? AND status = ? ORDER BY id", (queue, DONE)
+        ):
+            yield {"member_id": member_id, "result": json.loads(result) if result else None}
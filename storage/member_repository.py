@@ -2,16 +2,76 @@
 Member repository for loading and managing member data.
 """
 
+import argparse
+import gc
 import json
+import mmap
 import os
+import pickle
 import random
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from models.member import Member, Address, ContactInfo, EligibilityInfo, WorkRequirement
+import struct
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from models.documents import DOCUMENT_REGISTRY
+from models.member import (
+    Member, Address, ContactInfo, EligibilityInfo, WorkRequirement, construct_members, to_epoch_day, today_epoch_day
+)
+from storage.document_index import DocumentMaskTable
+from storage.search_index import MemberSearchIndex, SearchPage, search_terms
 
 # Simulated in-memory storage
 _members: Dict[str, Member] = {}
 
+# Renewal index: member IDs bucketed by epoch day (insertion-ordered dicts,
+# so removal is O(1)), with the distinct days sorted ascending for range
+# lookups. Updates touch one bucket and at most one slot of the day list,
+# which holds a few thousand days however many members there are
+_renewal_days: List[int] = []
+_renewal_buckets: Dict[int, Dict[str, None]] = {}
+_renewal_day_by_id: Dict[str, int] = {}
+
+# After `load_snapshot`: the saved per-member renewal days (a NumPy view of
+# the snapshot) and IDs in the same order, queried directly until the first
+# update turns them into buckets
+_mapped_renewal: Optional[Tuple[np.ndarray, List[str]]] = None
+
+# Document masks for the whole population, built on first use
+_document_table: Optional[DocumentMaskTable] = None
+
+# Typeahead search index for the whole population, built on first use or by
+# `build_search_index` at load time, and updated in place by `update_member`
+_search_index: Optional[MemberSearchIndex] = None
+
+# Serializes updates, so index maintenance and read-modify-write updates
+# from concurrent threads do not interleave
+_update_lock = threading.RLock()
+
+# Shard router (storage.sharded_repository.ShardRouter); when set, member
+# lookups, updates and cohort queries go to the shard processes instead
+_router = None
+
+# Snapshot written by `save_snapshot`; when set and present, `load_members` loads it
+SNAPSHOT_PATH = os.environ.get("MEDICAID_MEMBER_SNAPSHOT")
+
+# Snapshot layout: header (magic, pickle length, buffer count), then one
+# (offset, length) pair per out-of-band buffer, the pickle stream, and the
+# buffers themselves, each aligned for zero-copy NumPy views
+_SNAPSHOT_MAGIC = b"MEDSNAP1"
+_SNAPSHOT_HEADER = struct.Struct("<8sQQ")
+_SNAPSHOT_BUFFER = struct.Struct("<QQ")
+_SNAPSHOT_ALIGNMENT = 64
+
+class ShardedRepositoryError(RuntimeError):
+    """A repository operation that only works on local storage was called while sharded."""
+
+def _require_local(operation: str) -> None:
+    """Refuse an operation that has no sharded implementation rather than answer from empty local storage."""
+    if _router is not None:
+        raise ShardedRepositoryError(f"{operation} is not available while the repository is sharded")
+
 def create_synthetic_members() -> Dict[str, Member]:
     """Create synthetic member data for demonstration."""
     members = {}
@@ -125,29 +185,437 @@ def create_synthetic_members() -> Dict[str, Member]:
     
     return members
 
+def generate_synthetic_members(count: int, seed: int = 0) -> Dict[str, Member]:
+    """
+    Generate a deterministic synthetic population for load testing and benchmarks.
+
+    Members cycle through the demo scenarios with randomized names, languages,
+    renewal dates, work hours and documents.
+
+    Args:
+        count: Number of members to generate
+        seed: Random seed, so the same population can be regenerated
+
+    Returns:
+        Dict[str, Member]: Members keyed by ID ("M0000001", ...)
+    """
+    rng = random.Random(seed)
+    first_names = ["Maria", "James", "Sarah", "Ahmed", "Jennifer", "Luis", "Mei", "David", "Fatima", "Olga"]
+    last_names = ["Rodriguez", "Johnson", "Chen", "Hassan", "Smith", "Garcia", "Nguyen", "Brown", "Ali", "Ivanova"]
+    languages = ["English", "English", "English", "Spanish", "Spanish", "Arabic", "Chinese", "Vietnamese", "Russian"]
+    contact_methods = ["Email", "SMS", "App"]
+    statuses = ["active", "active", "active", "renewal_needed", "inactive"]
+    document_types = ["income_verification", "address_proof", "identity_proof", "medical_records"]
+    now = datetime.now()
+
+    members = {}
+    for index in range(count):
+        member_id = f"M{index + 1:07d}"
+        first_name = rng.choice(first_names)
+        last_name = rng.choice(last_names)
+        language = rng.choice(languages)
+        work_required = rng.random() < 0.4
+        work_hours = rng.randint(0, 120) if work_required else 0
+        documents = rng.sample(document_types, rng.randint(0, 3))
+        submitted = documents[:rng.randint(0, len(documents))]
+
+        members[member_id] = Member(
+            id=member_id,
+            first_name=first_name,
+            last_name=last_name,
+            date_of_birth=(now - timedelta(days=rng.randint(18*365, 65*365))).date().isoformat(),
+            address=Address(
+                street1=f"{rng.randint(100, 9999)} Main St",
+                city="Springfield",
+                state="IL",
+                zip_code=f"{rng.randint(60001, 62999)}"
+            ),
+            contact=ContactInfo(
+                email=f"{first_name.lower()}.{last_name.lower()}{index}@email.com",
+                phone=f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+                preferred_language=language,
+                language=language,
+                preferred_contact_method=rng.choice(contact_methods)
+            ),
+            eligibility=EligibilityInfo(
+                program="Medicaid",
+                status=rng.choice(statuses),
+                renewal_date=(now + timedelta(days=rng.randint(-30, 365))).date().isoformat(),
+                category="Adult",
+                income_verified=rng.random() < 0.8,
+                required_documents=documents
+            ),
+            work_requirement=WorkRequirement(
+                required=work_required,
+                hours_needed=80,
+                current_month_hours=work_hours,
+                hours_reported=work_hours,
+                verified=work_hours >= 80 if work_required else True,
+                exempt_reason=None if work_required else "not_required",
+                exemption_status="none" if work_required else "not_required"
+            ),
+            documents={doc: {"status": "submitted", "date": now.date().isoformat()} for doc in submitted},
+            household_size=rng.randint(1, 6)
+        )
+
+    return members
+
+def set_members(members: Dict[str, Member]) -> None:
+    """Replace the repository contents with the given members and rebuild its indexes."""
+    global _members, _document_table, _search_index
+    _members = dict(members)
+    _rebuild_renewal_index()
+    _document_table = None
+    _search_index = None
+
 def load_members() -> Dict[str, Member]:
-    """Load members into the repository."""
-    global _members
+    """Load members into the repository, from the configured snapshot if there is one."""
+    global _members, _document_table, _search_index
     if not _members:
+        if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+            return load_snapshot(SNAPSHOT_PATH)
         _members = create_synthetic_members()
+        _rebuild_renewal_index()
+        _document_table = None
+        _search_index = None
     return _members
 
+def set_router(router) -> None:
+    """
+    Send member lookups, updates and cohort queries to a shard router, or
+    back to local storage with None. While a router is set, search, the
+    document table and snapshots raise `ShardedRepositoryError`.
+    """
+    global _router
+    _router = router
+
 def get_member(member_id: str) -> Optional[Member]:
     """Get a member by ID."""
+    if _router is not None:
+        return _router.get_member(member_id)
     return _members.get(member_id)
 
 def get_all_members() -> List[Member]:
     """Get all members."""
+    if _router is not None:
+        return _router.get_all_members()
     return list(_members.values())
 
 def get_all_member_ids() -> List[str]:
     """Get all member IDs."""
+    if _router is not None:
+        return _router.get_all_member_ids()
     return list(_members.keys())
 
 def get_members_by_status(status: str) -> List[Member]:
     """Get members by eligibility status."""
+    if _router is not None:
+        return _router.get_members_by_status(status)
     return [member for member in _members.values() if member.eligibility.status == status]
 
 def update_member(member_id: str, member: Member) -> None:
     """Update a member in the repository."""
-    _members[member_id] = member
\ No newline at end of file
+    global _document_table
+    if _router is not None:
+        _router.update_member(member_id, member)
+        return
+    with _update_lock:
+        previous = _members.get(member_id)
+        _members[member_id] = member
+        _writable_renewal_index()
+        if _search_index is not None and (previous is None or search_terms(previous) != search_terms(member)):
+            _search_index.update(member)
+        _unindex_renewal(member_id)
+        _index_renewal(member_id, member)
+        if _document_table is not None:
+            if member_id in _document_table and member.id == member_id:
+                _document_table.update(member)
+            else:
+                _document_table = None
+
+def update_member_documents(member_id: str, documents: Dict[str, Dict[str, Any]]) -> Optional[Member]:
+    """
+    Put documents on file for a member, merged into the member's current
+    documents in one step so concurrent uploads for the same member are
+    not lost.
+    
+    Args:
+        member_id: The member
+        documents: Document type -> document record
+        
+    Returns:
+        Optional[Member]: The updated member, or None if there is no such member
+    """
+    if _router is not None:
+        return _router.update_member_documents(member_id, documents)
+    with _update_lock:
+        member = _members.get(member_id)
+        if member is None:
+            return None
+        member = member.model_copy(update={"documents": {**(member.documents or {}), **documents}})
+        update_member(member_id, member)
+    return member
+
+def get_document_table() -> DocumentMaskTable:
+    """Get the population-wide document mask table, building it if needed."""
+    global _document_table
+    _require_local("get_document_table")
+    if _document_table is None:
+        _document_table = DocumentMaskTable(_members.values())
+    return _document_table
+
+def get_search_index() -> MemberSearchIndex:
+    """Get the population-wide search index, building it if needed."""
+    global _search_index
+    _require_local("get_search_index")
+    if _search_index is None:
+        _search_index = MemberSearchIndex(_members.values())
+    return _search_index
+
+def build_search_index() -> MemberSearchIndex:
+    """Build the search index now, e.g. right after loading, so the first search does not pay for it."""
+    global _search_index
+    _require_local("build_search_index")
+    _search_index = MemberSearchIndex(_members.values())
+    return _search_index
+
+def search_members(query: str, limit: int = 20, offset: int = 0) -> SearchPage:
+    """Search members by ID, name, phone or email, one page at a time."""
+    _require_local("search_members")
+    return get_search_index().search(query, limit, offset)
+
+def count_members_missing_document(document_type: str) -> int:
+    """Count members missing a required document, in one vectorized pass."""
+    if _router is not None:
+        return _router.count_members_missing_document(document_type)
+    return get_document_table().count_missing(document_type)
+
+def _rebuild_renewal_index() -> None:
+    """Parse every renewal date once and rebuild the renewal index."""
+    global _mapped_renewal
+    entries = []
+    for member_id, member in _members.items():
+        renewal_day = to_epoch_day(member.eligibility.renewal_date)
+        if renewal_day is not None:
+            entries.append((renewal_day, member_id))
+    entries.sort()
+    _mapped_renewal = None
+    _bucket_renewal_index(entries)
+
+def _bucket_renewal_index(entries: Iterable[Tuple[int, str]]) -> None:
+    """Build the day buckets from (epoch day, member ID) pairs sorted by day."""
+    global _renewal_days, _renewal_buckets, _renewal_day_by_id
+    _renewal_buckets = {}
+    _renewal_day_by_id = {}
+    for renewal_day, member_id in entries:
+        bucket = _renewal_buckets.get(renewal_day)
+        if bucket is None:
+            bucket = _renewal_buckets[renewal_day] = {}
+        bucket[member_id] = None
+        _renewal_day_by_id[member_id] = renewal_day
+    _renewal_days = list(_renewal_buckets)
+
+def _writable_renewal_index() -> None:
+    """Turn a snapshot's mapped renewal index into day buckets before its first update."""
+    global _mapped_renewal
+    if _mapped_renewal is not None:
+        days, member_ids = _mapped_renewal
+        _mapped_renewal = None
+        _bucket_renewal_index(zip(days.tolist(), member_ids))
+
+def _renewal_ids_between(first_day: int, last_day: int) -> List[str]:
+    """IDs of members renewing from `first_day` through `last_day`, ordered by renewal day."""
+    if _mapped_renewal is not None:
+        days, member_ids = _mapped_renewal
+        low = int(np.searchsorted(days, first_day, side="left"))
+        high = int(np.searchsorted(days, last_day, side="right"))
+        return member_ids[low:high]
+    low = bisect_left(_renewal_days, first_day)
+    high = bisect_right(_renewal_days, last_day)
+    return [member_id for day in _renewal_days[low:high] for member_id in _renewal_buckets[day]]
+
+def _index_renewal(member_id: str, member: Member) -> None:
+    """Add a member to the bucket of its renewal day, after members already there."""
+    renewal_day = to_epoch_day(member.eligibility.renewal_date)
+    if renewal_day is None:
+        return
+    bucket = _renewal_buckets.get(renewal_day)
+    if bucket is None:
+        bucket = _renewal_buckets[renewal_day] = {}
+        insort(_renewal_days, renewal_day)
+    bucket[member_id] = None
+    _renewal_day_by_id[member_id] = renewal_day
+
+def _unindex_renewal(member_id: str) -> None:
+    """Remove a member from the renewal index if present."""
+    renewal_day = _renewal_day_by_id.pop(member_id, None)
+    if renewal_day is None:
+        return
+    bucket = _renewal_buckets[renewal_day]
+    del bucket[member_id]
+    if not bucket:
+        del _renewal_buckets[renewal_day]
+        del _renewal_days[bisect_left(_renewal_days, renewal_day)]
+
+def get_member_ids_due_between(start: date, end: date) -> List[str]:
+    """
+    Get IDs of members whose renewal date falls between two dates, inclusive.
+    
+    Args:
+        start: First renewal date in the range
+        end: Last renewal date in the range
+        
+    Returns:
+        List[str]: Member IDs ordered by renewal date
+    """
+    if _router is not None:
+        return [member.id for member in _router.get_members_due_between(start, end)]
+    return _renewal_ids_between(to_epoch_day(start.isoformat()), to_epoch_day(end.isoformat()))
+
+def get_members_due_between(start: date, end: date) -> List[Member]:
+    """Get members whose renewal date falls between two dates, inclusive, ordered by renewal date."""
+    if _router is not None:
+        return _router.get_members_due_between(start, end)
+    return [_members[member_id] for member_id in get_member_ids_due_between(start, end)]
+
+def get_members_renewal_due_soon(days_threshold: int = 60) -> List[Member]:
+    """
+    Get members whose renewal is due within the threshold, matching
+    `Member.is_renewal_due_soon` (tomorrow through `days_threshold` days out).
+    """
+    if _router is not None:
+        return _router.get_members_renewal_due_soon(days_threshold)
+    today = today_epoch_day()
+    return [_members[member_id] for member_id in _renewal_ids_between(today + 1, today + days_threshold)]
+
+def _align(offset: int) -> int:
+    return -(-offset // _SNAPSHOT_ALIGNMENT) * _SNAPSHOT_ALIGNMENT
+
+def save_snapshot(path: str) -> None:
+    """
+    Write the repository, with its renewal index and document masks, to a
+    binary snapshot.
+    
+    Members are stored as their `model_dump` records in a pickle (protocol 5)
+    stream; index columns are NumPy arrays written out of band so
+    `load_snapshot` can map them straight from the file.
+    
+    Args:
+        path: Snapshot file to write, replaced atomically
+    """
+    _require_local("save_snapshot")
+    table = get_document_table()
+    if _mapped_renewal is not None:
+        renewal_days, renewal_ids = _mapped_renewal
+    else:
+        renewal_ids = [member_id for day in _renewal_days for member_id in _renewal_buckets[day]]
+        renewal_days = np.repeat(np.array(_renewal_days, dtype=np.int64),
+                                 [len(_renewal_buckets[day]) for day in _renewal_days])
+    payload = {
+        "version": 1,
+        "created_at": datetime.now().isoformat(),
+        "document_types": DOCUMENT_REGISTRY.document_types,
+        "members": [member.model_dump() for member in _members.values()],
+        "renewal_days": renewal_days,
+        "renewal_ids": renewal_ids,
+        "document_member_ids": table.member_ids,
+        "document_required": table.required,
+        "document_submitted": table.submitted,
+        "document_unencoded": table.unencoded
+    }
+    buffers: List[pickle.PickleBuffer] = []
+    data = pickle.dumps(payload, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [buffer.raw() for buffer in buffers]
+
+    offset = _align(_SNAPSHOT_HEADER.size + _SNAPSHOT_BUFFER.size * len(raw_buffers) + len(data))
+    layout = []
+    for raw in raw_buffers:
+        layout.append((offset, raw.nbytes))
+        offset = _align(offset + raw.nbytes)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, len(data), len(raw_buffers)))
+        for buffer_offset, length in layout:
+            f.write(_SNAPSHOT_BUFFER.pack(buffer_offset, length))
+        f.write(data)
+        for (buffer_offset, _), raw in zip(layout, raw_buffers):
+            f.seek(buffer_offset)
+            f.write(raw)
+    os.replace(tmp_path, path)
+
+def load_snapshot(path: str) -> Dict[str, Member]:
+    """
+    Replace the repository contents with a snapshot written by `save_snapshot`.
+    
+    The file is memory-mapped copy-on-write: index columns are NumPy views
+    of the mapping rather than copies, and members are rebuilt on the
+    trusted construction path without re-validation. The renewal index and
+    document masks are restored as saved instead of being rebuilt; the
+    renewal days stay a view until the first `update_member`.
+    
+    Args:
+        path: Snapshot file
+        
+    Returns:
+        Dict[str, Member]: The loaded members keyed by ID
+    """
+    global _members, _mapped_renewal, _document_table, _search_index
+    _require_local("load_snapshot")
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(mapping)
+    magic, data_length, buffer_count = _SNAPSHOT_HEADER.unpack_from(view)
+    if magic != _SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a member repository snapshot")
+    buffers = []
+    position = _SNAPSHOT_HEADER.size
+    for _ in range(buffer_count):
+        buffer_offset, length = _SNAPSHOT_BUFFER.unpack_from(view, position)
+        buffers.append(view[buffer_offset:buffer_offset + length])
+        position += _SNAPSHOT_BUFFER.size
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        payload = pickle.loads(view[position:position + data_length], buffers=buffers)
+        members = construct_members(payload["members"])
+    finally:
+        if enabled:
+            gc.enable()
+
+    _members = {member.id: member for member in members}
+    _search_index = None
+    _mapped_renewal = (payload["renewal_days"], payload["renewal_ids"])
+
+    # Saved masks are only meaningful if document types map to the same bits
+    saved_types = payload["document_types"]
+    current_types = DOCUMENT_REGISTRY.document_types
+    if saved_types[:len(current_types)] == current_types:
+        for document_type in saved_types[len(current_types):]:
+            DOCUMENT_REGISTRY.register(document_type)
+        _document_table = DocumentMaskTable.from_arrays(
+            payload["document_member_ids"], payload["document_required"], payload["document_submitted"],
+            payload["document_unencoded"]
+        )
+    else:
+        _document_table = None
+    return _members
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a member repository snapshot")
+    parser.add_argument("--snapshot", type=str, required=True, help="Snapshot file to write")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Snapshot a generated population of this size instead of the demo members")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic population seed")
+
+    args = parser.parse_args()
+
+    if args.synthetic:
+        set_members(generate_synthetic_members(args.synthetic, args.seed))
+    else:
+        set_members(create_synthetic_members())
+    save_snapshot(args.snapshot)
+    print(f"Wrote {len(_members)} members to {args.snapshot}")
@@ -0,0 +1,405 @@
+"""
+Typeahead search over member ID, name, phone and email.
+
+Two structures answer a query token:
+
+- A prefix index: every searchable term (ID, first and last name, email,
+  email local part, phone digits) in one sorted array with the member row
+  alongside. It is a prefix trie flattened into a sorted array: all terms
+  under a prefix are one contiguous range found by binary search, at a
+  fraction of the memory of a node-per-character trie.
+- A trigram index for matches inside a name, email or phone number
+  ("driguez", the last digits of a phone number): NumPy posting arrays of
+  member rows per trigram, whose intersection is verified against each
+  member's search text. Trigrams are packed into integers and extracted
+  for a whole chunk of members at once.
+
+Members are numbered in (last name, first name, ID) order, so ordering
+matches by row is alphabetical and a page of results is a slice.
+"""
+
+import re
+from bisect import bisect_left, insort
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from models.member import Member
+
+_NON_DIGITS = re.compile(r"\D")
+_TOKEN = re.compile(r"[^\w@.+-]+")
+_PHONE_TOKEN = re.compile(r"[\d+.-]*\d[\d+.-]*")
+
+# Stop intersecting trigram postings once this few candidates remain; the
+# rest are checked directly against the search text
+_VERIFY_CANDIDATES = 256
+
+# Texts whose trigrams are packed at once while building, bounding build memory
+_BUILD_CHUNK = 50000
+
+# Updated members are folded into a rebuilt index once this many, or 1% of
+# the built rows if that is more, are in the delta or superseded
+_COMPACT_MIN = 1000
+_COMPACT_FRACTION = 0.01
+
+# Prefix matches on every query token rank ahead of matches inside terms
+_PREFIX_TIER = 0
+_SUBSTRING_TIER = 1
+
+
+class SearchPage(BaseModel):
+    """One page of search results."""
+    query: str
+    total: int
+    offset: int
+    member_ids: List[str]
+
+
+def normalize_query(text: str) -> List[str]:
+    """Split a query into lowercase tokens; phone-like tokens keep only their digits."""
+    tokens = []
+    for token in _TOKEN.split(text.lower()):
+        if _PHONE_TOKEN.fullmatch(token):
+            token = _NON_DIGITS.sub("", token)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def search_terms(member: Member) -> List[str]:
+    """Terms a member can be found by with a prefix query."""
+    terms = [member.id.lower(), member.first_name.lower(), member.last_name.lower()]
+    email = (member.contact.email or "").lower()
+    if email:
+        terms.extend((email, email.split("@", 1)[0]))
+    phone = _NON_DIGITS.sub("", member.contact.phone or "")
+    if phone:
+        terms.append(phone)
+    return [term for term in terms if term]
+
+
+def search_text(member: Member) -> str:
+    """Text a member can be found by with a match inside a term: name, email and phone digits."""
+    email = (member.contact.email or "").lower()
+    phone = _NON_DIGITS.sub("", member.contact.phone or "")
+    return " ".join(filter(None, (member.first_name.lower(), member.last_name.lower(), email, phone)))
+
+
+def _trigrams(text: str) -> List[str]:
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def _trigram_key(trigram: str) -> int:
+    """Pack a trigram's three code points (21 bits each) into one integer."""
+    return (ord(trigram[0]) << 42) | (ord(trigram[1]) << 21) | ord(trigram[2])
+
+
+def _trigram_postings(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build trigram postings for texts numbered by row, vectorized in chunks.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Sorted distinct packed
+            trigram keys, the offset of each key's postings (plus the end),
+            and the postings: rows grouped by key, each group sorted
+    """
+    key_parts = []
+    row_parts = []
+    for start in range(0, len(texts), _BUILD_CHUNK):
+        chunk = texts[start:start + _BUILD_CHUNK]
+        width = max(map(len, chunk))
+        if width < 3:
+            continue
+        # One row of UTF-32 code points per text, zero-padded to the longest
+        chars = np.array(chunk, dtype=f"<U{width}").view(np.uint32).reshape(len(chunk), width).astype(np.uint64)
+        keys = (chars[:, :-2] << np.uint64(42)) | (chars[:, 1:-1] << np.uint64(21)) | chars[:, 2:]
+        valid = chars[:, 2:] != 0
+        rows = np.broadcast_to(np.arange(start, start + len(chunk), dtype=np.int32)[:, None], keys.shape)
+        key_parts.append(keys[valid])
+        row_parts.append(rows[valid])
+    if not key_parts:
+        return np.empty(0, dtype=np.uint64), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+    keys = np.concatenate(key_parts)
+    rows = np.concatenate(row_parts)
+    order = np.lexsort((rows, keys))
+    keys = keys[order]
+    rows = rows[order]
+    distinct = np.ones(len(keys), dtype=bool)
+    distinct[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+    keys = keys[distinct]
+    rows = rows[distinct]
+    trigram_keys, starts = np.unique(keys, return_index=True)
+    return trigram_keys, np.append(starts, len(keys)), rows
+
+
+def _sort_key(member: Member) -> str:
+    """(last name, first name, ID) as one string that sorts the same way."""
+    return f"{member.last_name.lower()}\x00{member.first_name.lower()}\x00{member.id}"
+
+
+class MemberSearchIndex:
+    """
+    Prefix and trigram index over a population of members.
+
+    `update` re-indexes a changed or added member without a rebuild: the
+    member's built entries are masked out and the member goes into a small
+    delta that queries scan directly and merge into the ordering. Once the
+    delta or the masked rows pass `_COMPACT_MIN` members or
+    `_COMPACT_FRACTION` of the index, whichever is larger, `compact` folds
+    the delta into the built arrays.
+    """
+
+    def __init__(self, members: Iterable[Member]):
+        # (member ID, terms, search text, sort key) per member, in row order
+        entries = sorted(
+            ((member.id, frozenset(search_terms(member)), search_text(member), _sort_key(member))
+             for member in members),
+            key=lambda entry: entry[3]
+        )
+        self._sort_keys: List[str] = [entry[3] for entry in entries]
+        self.member_ids: List[str] = [entry[0] for entry in entries]
+        self._rows: Dict[str, int] = {member_id: row for row, member_id in enumerate(self.member_ids)}
+
+        pairs: List[Tuple[str, int]] = []
+        for row, (_, terms, _, _) in enumerate(entries):
+            pairs.extend((term, row) for term in terms)
+        pairs.sort()
+        self._terms: List[str] = [term for term, _ in pairs]
+        self._term_rows = np.fromiter((row for _, row in pairs), dtype=np.int32, count=len(pairs))
+
+        self._texts: List[str] = [entry[2] for entry in entries]
+        self._trigram_keys, self._posting_offsets, self._postings = _trigram_postings(self._texts)
+
+        # Built rows superseded by `update` (as a mask and in order), and the
+        # updated members' terms, text and sort key
+        self._stale = np.zeros(len(entries), dtype=bool)
+        self._stale_rows: List[int] = []
+        self._delta: Dict[str, Tuple[FrozenSet[str], str, str]] = {}
+
+    @property
+    def _stale_count(self) -> int:
+        return len(self._stale_rows)
+
+    def __len__(self) -> int:
+        return len(self.member_ids) - self._stale_count + len(self._delta)
+
+    def __contains__(self, member_id: str) -> bool:
+        if member_id in self._delta:
+            return True
+        row = self._rows.get(member_id)
+        return row is not None and not self._stale[row]
+
+    def update(self, member: Member) -> None:
+        """Re-index a member that is new or whose name, email or phone changed."""
+        row = self._rows.get(member.id)
+        if row is not None and not self._stale[row]:
+            self._stale[row] = True
+            insort(self._stale_rows, row)
+        self._delta[member.id] = (frozenset(search_terms(member)), search_text(member), _sort_key(member))
+        if max(len(self._delta), self._stale_count) > max(_COMPACT_MIN, _COMPACT_FRACTION * len(self.member_ids)):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Fold the updated members into the built index and drop the superseded rows.
+
+        Surviving rows keep their order, so the built arrays are renumbered and
+        the delta's entries inserted into them rather than rebuilt from scratch.
+        """
+        keep = ~self._stale
+        delta = sorted(
+            (sort_key, member_id, terms, text) for member_id, (terms, text, sort_key) in self._delta.items()
+        )
+        # New row of each surviving built row and of each updated member, which
+        # ranks just before the first built row that sorts after it
+        positions = np.array([bisect_left(self._sort_keys, entry[0]) for entry in delta], dtype=np.int64)
+        survivors_before = np.concatenate(([0], np.cumsum(keep)))
+        old_rows = np.arange(len(self.member_ids))
+        new_rows = np.where(keep, survivors_before[:-1] + np.searchsorted(positions, old_rows, side="right"), -1)
+        delta_rows = survivors_before[positions] + np.arange(len(delta))
+        size = int(survivors_before[-1]) + len(delta)
+
+        def merged(built: List[str], updated: List[str]) -> List[str]:
+            values = np.empty(size, dtype=object)
+            values[new_rows[keep]] = np.array(built, dtype=object)[keep]
+            values[delta_rows] = updated
+            return values.tolist()
+
+        self._sort_keys = merged(self._sort_keys, [entry[0] for entry in delta])
+        self.member_ids = merged(self.member_ids, [entry[1] for entry in delta])
+        self._texts = merged(self._texts, [entry[3] for entry in delta])
+        self._rows = {member_id: row for row, member_id in enumerate(self.member_ids)}
+
+        # Terms: drop superseded pairs, then insert the delta's in (term, row) order
+        term_keep = keep[self._term_rows]
+        terms = np.array(self._terms, dtype=object)[term_keep]
+        term_rows = new_rows[self._term_rows[term_keep]]
+        surviving = terms.tolist()
+        pairs = sorted((term, row) for row, entry in zip(delta_rows.tolist(), delta) for term in entry[2])
+        insert_at = []
+        for term, row in pairs:
+            low = bisect_left(surviving, term)
+            high = bisect_left(surviving, term + "\x00", low)
+            insert_at.append(low + int(np.searchsorted(term_rows[low:high], row)))
+        self._terms = np.insert(terms, insert_at, [term for term, _ in pairs]).tolist()
+        self._term_rows = np.insert(term_rows, insert_at, [row for _, row in pairs]).astype(np.int32)
+
+        # Trigram postings as sorted (trigram, row) integers: the surviving ones
+        # renumbered, with the delta's inserted
+        delta_keys, delta_offsets, delta_postings = _trigram_postings([entry[3] for entry in delta])
+        trigram_keys = np.union1d(self._trigram_keys, delta_keys)
+        groups = np.repeat(np.searchsorted(trigram_keys, self._trigram_keys), np.diff(self._posting_offsets))
+        posting_keep = keep[self._postings]
+        postings = (groups[posting_keep].astype(np.int64) << 32) | new_rows[self._postings[posting_keep]]
+        added = np.repeat(np.searchsorted(trigram_keys, delta_keys), np.diff(delta_offsets)).astype(np.int64)
+        added = np.sort((added << 32) | delta_rows[delta_postings])
+        postings = np.insert(postings, np.searchsorted(postings, added), added)
+        groups = postings >> 32
+        starts = np.flatnonzero(np.diff(groups, prepend=-1))
+        self._trigram_keys = trigram_keys[groups[starts]]
+        self._posting_offsets = np.append(starts, len(postings)).astype(np.int64)
+        self._postings = (postings & 0xFFFFFFFF).astype(np.int32)
+
+        self._stale = np.zeros(size, dtype=bool)
+        self._stale_rows = []
+        self._delta = {}
+
+    def prefix_rows(self, token: str) -> np.ndarray:
+        """Sorted rows of members with a term starting with `token`."""
+        low = bisect_left(self._terms, token)
+        high = bisect_left(self._terms, token + "\uffff", low)
+        return np.unique(self._term_rows[low:high])
+
+    def substring_rows(self, token: str) -> np.ndarray:
+        """Sorted rows of members whose name, email or phone digits contain `token` (three or more characters)."""
+        candidates: Optional[np.ndarray] = None
+        postings = [self._trigram_rows(trigram) for trigram in set(_trigrams(token))]
+        for rows in sorted(postings, key=len):
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if len(candidates) <= _VERIFY_CANDIDATES:
+                break
+        if candidates is None:
+            return np.empty(0, dtype=np.int32)
+        return np.array([row for row in candidates if token in self._texts[row]], dtype=np.int32)
+
+    def _trigram_rows(self, trigram: str) -> np.ndarray:
+        """Postings of one trigram; empty if no member has it."""
+        key = np.uint64(_trigram_key(trigram))
+        index = int(np.searchsorted(self._trigram_keys, key))
+        if index == len(self._trigram_keys) or self._trigram_keys[index] != key:
+            return np.empty(0, dtype=np.int32)
+        return self._postings[self._posting_offsets[index]:self._posting_offsets[index + 1]]
+
+    def _built_matches(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Built rows matching every token, and each row's tier."""
+        prefix: Optional[np.ndarray] = None
+        matches: Optional[np.ndarray] = None
+        for token in tokens:
+            token_prefix = self.prefix_rows(token)
+            token_matches = np.union1d(token_prefix, self.substring_rows(token)) if len(token) >= 3 else token_prefix
+            prefix = token_prefix if prefix is None else np.intersect1d(prefix, token_prefix, assume_unique=True)
+            matches = token_matches if matches is None else np.intersect1d(matches, token_matches, assume_unique=True)
+        return matches, np.where(np.isin(matches, prefix, assume_unique=True), _PREFIX_TIER, _SUBSTRING_TIER)
+
+    def _page_all(self, offset: int, limit: int) -> List[str]:
+        """
+        One page of every member in order, without materializing the ranking.
+
+        Runs of built rows between superseded rows and updated members are
+        skipped or sliced whole, so a page costs the delta size plus its length.
+        """
+        if not self._stale_rows and not self._delta:
+            return self.member_ids[offset:offset + limit]
+        delta = sorted((sort_key, member_id) for member_id, (_, _, sort_key) in self._delta.items())
+        # Updated members rank just before the first built row that sorts after them
+        positions = [bisect_left(self._sort_keys, sort_key) for sort_key, _ in delta]
+        end = len(self.member_ids)
+        page: List[str] = []
+        skip = offset
+        row = stale = 0
+        for index in range(len(delta) + 1):
+            until = positions[index] if index < len(delta) else end
+            while row < until and len(page) < limit:
+                next_stale = self._stale_rows[stale] if stale < len(self._stale_rows) else end
+                if row == next_stale:
+                    row += 1
+                    stale += 1
+                    continue
+                run = min(until, next_stale) - row
+                if skip >= run:
+                    skip -= run
+                    row += run
+                    continue
+                taken = self.member_ids[row + skip:row + min(run, skip + limit - len(page))]
+                page.extend(taken)
+                row += skip + len(taken)
+                skip = 0
+            if len(page) >= limit or index == len(delta):
+                break
+            if skip:
+                skip -= 1
+            else:
+                page.append(delta[index][1])
+        return page
+
+    def _delta_matches(self, tokens: List[str]) -> List[Tuple[int, str, str]]:
+        """(tier, sort key, member ID) of updated members matching every token, by sort key."""
+        matches = []
+        for member_id, (terms, text, sort_key) in self._delta.items():
+            tier = _PREFIX_TIER
+            for token in tokens:
+                if not any(term.startswith(token) for term in terms):
+                    if len(token) < 3 or token not in text:
+                        break
+                    tier = _SUBSTRING_TIER
+            else:
+                matches.append((tier, sort_key, member_id))
+        return sorted(matches, key=lambda match: match[1])
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> SearchPage:
+        """
+        Find members matching every token of a query.
+
+        A token matches a member when one of the member's terms starts with
+        it or, for tokens of three or more characters, when it appears
+        anywhere in the member's name, email or phone digits. An empty
+        query pages through every member.
+
+        Args:
+            query: Free text, e.g. "maria rod" or "555-0142"
+            limit: Page size
+            offset: Results to skip
+
+        Returns:
+            SearchPage: Total matches and one page of member IDs, prefix
+                matches first, then alphabetical by name
+        """
+        tokens = normalize_query(query)
+        if not tokens:
+            return SearchPage(query=query, total=len(self), offset=offset, member_ids=self._page_all(offset, limit))
+
+        matches, tiers = self._built_matches(tokens)
+        if self._stale_count:
+            current = ~self._stale[matches]
+            matches, tiers = matches[current], tiers[current]
+        delta = self._delta_matches(tokens) if self._delta else []
+        if not delta:
+            ranked = matches[np.lexsort((matches, tiers))]
+            return SearchPage(
+                query=query,
+                total=len(ranked),
+                offset=offset,
+                member_ids=[self.member_ids[row] for row in ranked[offset:offset + limit]]
+            )
+
+        # Updated members rank just before the first built row that sorts after them
+        positions = np.array([2 * bisect_left(self._sort_keys, sort_key) for _, sort_key, _ in delta], dtype=np.int64)
+        ranks = np.concatenate((2 * matches.astype(np.int64) + 1, positions))
+        all_tiers = np.concatenate((tiers, [tier for tier, _, _ in delta]))
+        order = np.lexsort((ranks, all_tiers))
+        member_ids = []
+        for index in order[offset:offset + limit].tolist():
+            member_ids.append(self.member_ids[matches[index]] if index < len(matches) else delta[index - len(matches)][2])
+        return SearchPage(query=query, total=len(order), offset=offset, member_ids=member_ids)
@@ -0,0 +1,331 @@
+"""
+Hash-sharded member repository across processes.
+
+Members are partitioned by a stable hash of their ID across shard server
+processes. Each shard holds its partition in its own copy of
+`storage.member_repository`, indexes included, and answers requests over a
+`multiprocessing.connection` socket: a Unix socket for local shards, or a
+TCP address for shards on other machines. `ShardRouter` sends point
+lookups and updates to the owning shard and scatters cohort queries to
+every shard at once, gathering and merging the replies, so memory and
+query throughput grow with the number of shards.
+
+A router installed with `member_repository.set_router` makes the
+repository's own lookups, updates and cohort queries go to the shards, so
+the workflow, API and batch sweep run unchanged in sharded mode. Search,
+the document table and snapshots are per-process and raise
+`member_repository.ShardedRepositoryError` while a router is installed.
+
+Usage:
+    # Local shards for the current process
+    router = start_local_shards(4)
+
+    # A standalone shard server
+    MEDICAID_SHARD_AUTHKEY=... python -m storage.sharded_repository --shard 0 --shards 4 --address 10.0.0.5:7100
+"""
+
+import argparse
+import heapq
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from datetime import date
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from models.member import Member, to_epoch_day
+from storage import member_repository
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger()
+
+Address = Union[str, Tuple[str, int]]
+
+# Members sent per message when seeding a shard
+SEED_BATCH_SIZE = 5000
+
+# Repository functions a shard serves, by request name
+_SHARD_OPERATIONS = {
+    "get_member": member_repository.get_member,
+    "update_member": member_repository.update_member,
+    "update_member_documents": member_repository.update_member_documents,
+    "get_members_by_status": member_repository.get_members_by_status,
+    "get_members_due_between": member_repository.get_members_due_between,
+    "get_members_renewal_due_soon": member_repository.get_members_renewal_due_soon,
+    "get_all_member_ids": member_repository.get_all_member_ids,
+    "get_all_members": member_repository.get_all_members,
+    "count_members_missing_document": member_repository.count_members_missing_document
+}
+
+
+def shard_of(member_id: str, shards: int) -> int:
+    """Shard index of a member ID; stable across processes and machines."""
+    return zlib.crc32(member_id.encode("utf-8")) % shards
+
+
+def _owned(shard: int, shards: int, members: List[Member]) -> Dict[str, Member]:
+    """The members of a list that belong to `shard`."""
+    return {member.id: member for member in members if shard_of(member.id, shards) == shard}
+
+
+def _handle_connection(conn: Connection, shard: int, shards: int, lock: threading.Lock,
+                       stop: threading.Event) -> None:
+    """Serve requests from one router connection until it closes."""
+    # Members received by "seed" batches, indexed once on "publish"
+    pending: Dict[str, Member] = {}
+    with conn:
+        while True:
+            try:
+                operation, args = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                with lock:
+                    if operation == "seed":
+                        pending.update(_owned(shard, shards, *args))
+                        result = None
+                    elif operation == "publish":
+                        member_repository.set_members(pending)
+                        pending = {}
+                        result = None
+                    elif operation == "load":
+                        member_repository.load_members()
+                        member_repository.set_members(_owned(shard, shards, member_repository.get_all_members()))
+                        result = None
+                    elif operation == "count":
+                        result = len(member_repository.get_all_member_ids())
+                    elif operation == "shutdown":
+                        stop.set()
+                        result = None
+                    else:
+                        result = _SHARD_OPERATIONS[operation](*args)
+                conn.send(("ok", result))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+            if stop.is_set():
+                return
+
+
+def serve_shard(address: Address, shard: int, shards: int, authkey: bytes) -> None:
+    """
+    Run a shard server until a router sends "shutdown".
+
+    Each router connection is served on its own thread; requests are
+    executed one at a time, so the shard's repository and indexes are never
+    read mid-update.
+
+    Args:
+        address: Unix socket path or (host, port) to listen on
+        shard: This shard's index
+        shards: Total number of shards
+        authkey: Shared secret routers must present
+    """
+    member_repository.set_members({})
+    lock = threading.Lock()
+    stop = threading.Event()
+    listener = Listener(address, authkey=authkey)
+    logger.info(f"Shard {shard}/{shards} listening on {address}")
+
+    def accept() -> None:
+        while not stop.is_set():
+            try:
+                conn = listener.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=_handle_connection, args=(conn, shard, shards, lock, stop), daemon=True
+            ).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    stop.wait()
+    listener.close()
+    logger.info(f"Shard {shard}/{shards} stopped")
+
+
+class ShardError(RuntimeError):
+    """A shard failed to execute a request."""
+
+
+class ShardRouter:
+    """Routes repository calls to hash-partitioned shard servers."""
+
+    def __init__(self, addresses: List[Address], authkey: bytes):
+        """
+        Args:
+            addresses: Shard server addresses, in shard order
+            authkey: Shared secret of the shard servers
+        """
+        self.shards = len(addresses)
+        self._connections = [Client(address, authkey=authkey) for address in addresses]
+        self._locks = [threading.Lock() for _ in addresses]
+        self._processes: List[Any] = []
+        self._socket_dir: Optional[str] = None
+
+    def _call(self, shard: int, operation: str, *args: Any) -> Any:
+        with self._locks[shard]:
+            self._connections[shard].send((operation, args))
+            status, result = self._connections[shard].recv()
+        if status != "ok":
+            raise ShardError(f"Shard {shard} failed {operation}: {result}")
+        return result
+
+    def _scatter(self, operation: str, *args: Any) -> List[Any]:
+        """Send a request to every shard, then collect the replies in shard order."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for conn in self._connections:
+                conn.send((operation, args))
+            replies = [conn.recv() for conn in self._connections]
+        finally:
+            for lock in self._locks:
+                lock.release()
+        for shard, (status, result) in enumerate(replies):
+            if status != "ok":
+                raise ShardError(f"Shard {shard} failed {operation}: {result}")
+        return [result for _, result in replies]
+
+    def seed(self, members: Dict[str, Member]) -> None:
+        """Replace the shards' contents with the given members, sent to their shards in batches."""
+        batches: List[List[Member]] = [[] for _ in range(self.shards)]
+        for member in members.values():
+            batch = batches[shard_of(member.id, self.shards)]
+            batch.append(member)
+            if len(batch) >= SEED_BATCH_SIZE:
+                self._call(shard_of(member.id, self.shards), "seed", batch)
+                batch.clear()
+        for shard, batch in enumerate(batches):
+            if batch:
+                self._call(shard, "seed", batch)
+        self._scatter("publish")
+
+    def load(self) -> None:
+        """Have every shard load the configured population and keep its own partition."""
+        self._scatter("load")
+
+    def get_member(self, member_id: str) -> Optional[Member]:
+        """Get a member by ID from its shard."""
+        return self._call(shard_of(member_id, self.shards), "get_member", member_id)
+
+    def update_member(self, member_id: str, member: Member) -> None:
+        """Update a member on its shard."""
+        self._call(shard_of(member_id, self.shards), "update_member", member_id, member)
+
+    def update_member_documents(self, member_id: str, documents: Dict[str, Dict[str, Any]]) -> Optional[Member]:
+        """Put documents on file for a member on its shard, which applies them in one step."""
+        return self._call(shard_of(member_id, self.shards), "update_member_documents", member_id, documents)
+
+    def get_members_by_status(self, status: str) -> List[Member]:
+        """Get members by eligibility status from every shard."""
+        return [member for members in self._scatter("get_members_by_status", status) for member in members]
+
+    def get_members_due_between(self, start: date, end: date) -> List[Member]:
+        """Get members whose renewal date falls between two dates from every shard, ordered by renewal date."""
+        return list(heapq.merge(
+            *self._scatter("get_members_due_between", start, end),
+            key=lambda member: to_epoch_day(member.eligibility.renewal_date)
+        ))
+
+    def get_members_renewal_due_soon(self, days_threshold: int = 60) -> List[Member]:
+        """Get members due for renewal soon from every shard, ordered by renewal date."""
+        return list(heapq.merge(
+            *self._scatter("get_members_renewal_due_soon", days_threshold),
+            key=lambda member: to_epoch_day(member.eligibility.renewal_date)
+        ))
+
+    def get_all_member_ids(self) -> List[str]:
+        """Get every member ID, shard by shard."""
+        return [member_id for ids in self._scatter("get_all_member_ids") for member_id in ids]
+
+    def get_all_members(self) -> List[Member]:
+        """Get every member, shard by shard."""
+        return [member for members in self._scatter("get_all_members") for member in members]
+
+    def count_members_missing_document(self, document_type: str) -> int:
+        """Count members missing a required document across shards."""
+        return sum(self._scatter("count_members_missing_document", document_type))
+
+    def shard_sizes(self) -> List[int]:
+        """Number of members held by each shard."""
+        return self._scatter("count")
+
+    def close(self) -> None:
+        """Close connections; shards started by `start_local_shards` are shut down."""
+        if self._processes:
+            try:
+                self._scatter("shutdown")
+            except (EOFError, OSError, ShardError):
+                pass
+        for conn in self._connections:
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=10)
+        if self._socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+
+def start_local_shards(shards: int, members: Optional[Dict[str, Member]] = None) -> ShardRouter:
+    """
+    Start shard server processes on Unix sockets and connect a router.
+
+    Args:
+        shards: Number of shard processes
+        members: Members to distribute; None has each shard call
+            `load_members()` (e.g. from MEDICAID_MEMBER_SNAPSHOT) and keep
+            its own partition
+
+    Returns:
+        ShardRouter: Connected router; call `close()` to stop the shards
+    """
+    context = get_context("spawn")
+    authkey = os.urandom(16)
+    socket_dir = tempfile.mkdtemp(prefix="medicaid-shards-")
+    addresses = [os.path.join(socket_dir, f"shard{shard}.sock") for shard in range(shards)]
+    processes = [
+        context.Process(target=serve_shard, args=(address, shard, shards, authkey), daemon=True)
+        for shard, address in enumerate(addresses)
+    ]
+    for process in processes:
+        process.start()
+
+    # Wait for each shard to listen before connecting
+    for address, process in zip(addresses, processes):
+        while not os.path.exists(address):
+            if not process.is_alive():
+                raise ShardError(f"Shard server for {address} exited during startup")
+            threading.Event().wait(0.05)
+
+    router = ShardRouter(addresses, authkey)
+    router._processes = processes
+    router._socket_dir = socket_dir
+    if members is None:
+        router.load()
+    else:
+        router.seed(members)
+    logger.info(f"Started {shards} local shards holding {sum(router.shard_sizes())} members")
+    return router
+
+
+def _parse_address(value: str) -> Address:
+    host, _, port = value.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a member repository shard server")
+    parser.add_argument("--shard", type=int, required=True, help="This shard's index")
+    parser.add_argument("--shards", type=int, required=True, help="Total number of shards")
+    parser.add_argument("--address", type=str, required=True, help="Unix socket path or host:port")
+
+    args = parser.parse_args()
+
+    authkey = os.environ.get("MEDICAID_SHARD_AUTHKEY")
+    if not authkey:
+        parser.error("MEDICAID_SHARD_AUTHKEY must be set")
+    serve_shard(_parse_address(args.address), args.shard, args.shards, authkey.encode("utf-8"))
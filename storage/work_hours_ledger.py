@@ -0,0 +1,264 @@
+"""
+Append-only work-hours ledger.
+
+Every hours submission (employer feed, self-report, caseworker entry) is
+appended as an immutable entry. Per-member monthly totals are maintained
+incrementally as entries arrive, so compliance checks read one precomputed
+row. Corrections are appended as new entries that supersede an
+earlier one and only adjust the monthly buckets they touch.
+
+Once a ledger is installed with `set_work_hours_ledger`, `process_member`
+takes a member's reported hours for the current month from it, for members
+with ledger entries that month.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+
+from models.member import Member
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    member_id TEXT NOT NULL,
+    work_date TEXT NOT NULL,
+    hours REAL NOT NULL,
+    source TEXT NOT NULL,
+    corrects INTEGER REFERENCES entries (id),
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_member ON entries (member_id, work_date);
+CREATE INDEX IF NOT EXISTS idx_entries_corrects ON entries (corrects);
+CREATE TABLE IF NOT EXISTS monthly_totals (
+    member_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    hours REAL NOT NULL,
+    PRIMARY KEY (member_id, month)
+);
+"""
+
+
+class WorkHoursEntry(BaseModel):
+    """A single ledger entry."""
+    id: int
+    member_id: str
+    work_date: str
+    hours: float
+    source: str
+    corrects: Optional[int] = None
+    recorded_at: float
+
+
+def month_of(work_date: str) -> str:
+    """Return the YYYY-MM bucket for an ISO date string."""
+    return date.fromisoformat(work_date[:10]).strftime("%Y-%m")
+
+
+class WorkHoursLedger:
+    """
+    Append-only ledger of (member, date, hours, source) entries with
+    incrementally maintained monthly totals.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Args:
+            path: SQLite database file, or ":memory:" for a transient ledger
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _bump(self, deltas: Dict[Tuple[str, str], float]) -> None:
+        """Apply hour deltas to the monthly buckets on disk, inside the caller's transaction."""
+        self._conn.executemany(
+            "INSERT INTO monthly_totals (member_id, month, hours) VALUES (?, ?, ?) "
+            "ON CONFLICT (member_id, month) DO UPDATE SET hours = hours + excluded.hours",
+            ((member_id, month, delta) for (member_id, month), delta in deltas.items())
+        )
+
+    def record(self, member_id: str, work_date: str, hours: float, source: str = "self_report") -> int:
+        """
+        Append an hours submission.
+
+        Args:
+            member_id: The member who worked
+            work_date: ISO date the hours were worked
+            hours: Hours worked
+            source: Where the entry came from, e.g. "employer_feed"
+
+        Returns:
+            int: The new entry ID
+        """
+        return self.record_many([(member_id, work_date, hours, source)])[0]
+
+    def record_many(self, entries: Iterable[Tuple[str, str, float, str]]) -> List[int]:
+        """
+        Append a batch of (member_id, work_date, hours, source) entries in
+        one transaction, updating each affected monthly bucket once.
+
+        Returns:
+            List[int]: The new entry IDs, in input order
+        """
+        entries = list(entries)
+        deltas: Dict[Tuple[str, str], float] = {}
+        for member_id, work_date, hours, _ in entries:
+            if hours < 0:
+                raise ValueError("Hours must not be negative; use correct() to reduce an entry")
+            key = (member_id, month_of(work_date))
+            deltas[key] = deltas.get(key, 0.0) + hours
+
+        if not entries:
+            return []
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO entries (member_id, work_date, hours, source, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                    ((member_id, work_date[:10], hours, source, now)
+                     for member_id, work_date, hours, source in entries)
+                )
+                # The write lock is held until commit, so the batch got consecutive IDs
+                last_id = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                self._bump(deltas)
+        return list(range(last_id - len(entries) + 1, last_id + 1))
+
+    def _effective(self, entry_id: int) -> Optional[Tuple[str, str, float]]:
+        """Current (member_id, work_date, hours) of an entry after any corrections."""
+        return self._conn.execute(
+            "SELECT member_id, work_date, hours FROM entries WHERE id = ? OR corrects = ? "
+            "ORDER BY id DESC LIMIT 1",
+            (entry_id, entry_id)
+        ).fetchone()
+
+    def correct(self, entry_id: int, hours: Optional[float] = None, work_date: Optional[str] = None,
+                source: str = "correction") -> int:
+        """
+        Append a retroactive correction superseding an earlier entry.
+
+        Only the monthly buckets of the old and new dates are adjusted.
+
+        Args:
+            entry_id: ID of the entry being corrected (an original entry or
+                one of its corrections)
+            hours: Corrected hours (unchanged if None)
+            work_date: Corrected work date (unchanged if None)
+            source: Source recorded on the correction
+
+        Returns:
+            int: The ID of the correction entry
+        """
+        with self._lock:
+            with self._conn:
+                root = self._conn.execute("SELECT COALESCE(corrects, id) FROM entries WHERE id = ?",
+                                          (entry_id,)).fetchone()
+                if root is None:
+                    raise ValueError(f"Ledger entry {entry_id} not found")
+                entry_id = root[0]
+                member_id, old_date, old_hours = self._effective(entry_id)
+                new_date = (work_date or old_date)[:10]
+                new_hours = old_hours if hours is None else hours
+                if new_hours < 0:
+                    raise ValueError("Hours must not be negative")
+
+                cursor = self._conn.execute(
+                    "INSERT INTO entries (member_id, work_date, hours, source, corrects, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (member_id, new_date, new_hours, source, entry_id, time.time())
+                )
+                deltas: Dict[Tuple[str, str], float] = {}
+                old_key = (member_id, month_of(old_date))
+                new_key = (member_id, month_of(new_date))
+                deltas[old_key] = -old_hours
+                deltas[new_key] = deltas.get(new_key, 0.0) + new_hours
+                self._bump(deltas)
+        return cursor.lastrowid
+
+    def _total(self, member_id: str, month: Optional[str]) -> Optional[float]:
+        """
+        A member's committed monthly total, or None if the member has no
+        entries that month. Read from the database on every call, so totals
+        written by other processes sharing the ledger are seen at once.
+        """
+        month = month or date.today().strftime("%Y-%m")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hours FROM monthly_totals WHERE member_id = ? AND month = ?", (member_id, month)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def monthly_hours(self, member_id: str, month: Optional[str] = None) -> float:
+        """
+        Get a member's total hours for a month with one primary-key lookup.
+
+        Args:
+            member_id: The member
+            month: YYYY-MM bucket; defaults to the current month
+
+        Returns:
+            float: Total hours recorded for the month
+        """
+        return self._total(member_id, month) or 0.0
+
+    def has_hours(self, member_id: str, month: Optional[str] = None) -> bool:
+        """Whether the ledger has any entries for a member in a month (defaults to the current month)."""
+        return self._total(member_id, month) is not None
+
+    def entries(self, member_id: str, month: Optional[str] = None) -> List[WorkHoursEntry]:
+        """List a member's ledger entries, including corrections, for audit."""
+        query = "SELECT id, member_id, work_date, hours, source, corrects, recorded_at FROM entries WHERE member_id = ?"
+        params: list = [member_id]
+        if month:
+            query += " AND work_date LIKE ?"
+            params.append(f"{month}-%")
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        return [
+            WorkHoursEntry(id=row[0], member_id=row[1], work_date=row[2], hours=row[3], source=row[4],
+                           corrects=row[5], recorded_at=row[6])
+            for row in rows
+        ]
+
+    def apply_to_member(self, member: Member, month: Optional[str] = None) -> Member:
+        """
+        Return a copy of the member with `current_month_hours` and
+        `hours_reported` taken from the ledger total for the month, rounded
+        to whole hours. A member with no entries that month is returned as is.
+        """
+        total = self._total(member.id, month)
+        if total is None:
+            return member
+        hours = round(total)
+        work_requirement = member.work_requirement.model_copy(update={
+            "current_month_hours": hours,
+            "hours_reported": hours,
+            "last_updated": date.today().isoformat()
+        })
+        return member.model_copy(update={"work_requirement": work_requirement})
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+# Process-wide ledger consulted by the compliance checks, if one is installed
+_ledger: Optional[WorkHoursLedger] = None
+
+
+def get_work_hours_ledger() -> Optional[WorkHoursLedger]:
+    """Get the process-wide work-hours ledger, or None if none is installed."""
+    return _ledger
+
+
+def set_work_hours_ledger(ledger: Optional[WorkHoursLedger]) -> None:
+    """Install (or with None, remove) the ledger `process_member` reads reported hours from."""
+    global _ledger
+    _ledger = ledger
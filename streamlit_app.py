@@ -23,13 +23,14 @@ from plotly.subplots import make_subplots
 # Import project modules
 from main import process_member, simulate_workflow
 from models.state import AgentState
-from storage.member_repository import get_member, get_all_members, get_all_member_ids, update_member, load_members
+from rules.medicaid_rules import evaluate_member
+from storage.member_repository import (
+    build_search_index, get_member, get_all_members, get_all_member_ids, update_member, load_members, search_members
+)
 from utils.logger import setup_logger
 
-# Load members data
-if 'members_loaded' not in st.session_state:
-    load_members()
-    st.session_state.members_loaded = True
+# Members listed per page in the member search selector
+MEMBER_PAGE_SIZE = 20
 
 # Initialize session state
 if 'demo_mode' not in st.session_state:
@@ -47,6 +48,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource(show_spinner="Loading members...")
+def load_repository() -> bool:
+    """Load members and build the search index once per server process, before any page renders."""
+    load_members()
+    build_search_index()
+    return True
+
+# Load members data
+if 'members_loaded' not in st.session_state:
+    st.session_state.members_loaded = load_repository()
+
 # Custom CSS for executive-level styling
 st.markdown("""
 <style>
@@ -452,8 +464,7 @@ def run_executive_demo_with_progress(member_id):
             
             elif "Work" in agent_name:
                 if member.work_requirement.required:
-                    hours_reported = member.work_requirement.hours_reported
-                    state["work_requirements_met"] = hours_reported >= 80
+                    state["work_requirements_met"] = evaluate_member(member, state)["work_requirements_met"]
                     
                     state["interactions"].append({
                         "timestamp": datetime.now().isoformat(),
@@ -496,11 +507,7 @@ def run_executive_demo_with_progress(member_id):
             
             elif "Compliance" in agent_name:
                 # Final compliance check
-                compliance_issues = []
-                if member.work_requirement.required and not state.get("work_requirements_met"):
-                    compliance_issues.append("Work requirements not met")
-                if state.get("documents_required") and len(state.get("documents_submitted", [])) < len(state["documents_required"]):
-                    compliance_issues.append("Missing required documents")
+                compliance_issues = evaluate_member(member, state).issues
                 
                 state["compliance_status"] = "compliant" if not compliance_issues else "non_compliant"
                 state["compliance_issues"] = compliance_issues
@@ -664,6 +671,31 @@ def create_portfolio_dashboard():
             fig.update_layout(height=400)
             st.plotly_chart(fig, use_container_width=True)
 
+def member_option_label(member):
+    """Selector label for a member: scenario emoji, name, ID and scenario"""
+    scenario_emoji = {
+        "renewal_needed": "🔄",
+        "work_compliance": "💼", 
+        "documents_missing": "📄",
+        "multilingual": "🌐",
+        "compliant": "✅"
+    }
+    
+    # Determine scenario based on member data
+    if member.eligibility.status == "renewal_needed":
+        scenario = "renewal_needed"
+    elif member.work_requirement.required and member.work_requirement.hours_reported < 80:
+        scenario = "work_compliance"
+    elif member.eligibility.required_documents:
+        scenario = "documents_missing"
+    elif member.contact.language != "English":
+        scenario = "multilingual"
+    else:
+        scenario = "compliant"
+    
+    emoji = scenario_emoji.get(scenario, "👤")
+    return f"{emoji} {member.first_name} {member.last_name} ({member.id}) - {scenario.replace('_', ' ').title()}"
+
 def main():
     """Main application function"""
     
@@ -681,33 +713,30 @@ def main():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        # Get member data
-        members = get_all_members()
+        # Search members through the typeahead index, one page at a time
+        search_query = st.text_input(
+            "🔎 Search members by name, ID, phone or email:",
+            key="member_search",
+            placeholder="e.g. maria rod, M0000042, 555-0142"
+        )
+        if st.session_state.get("member_search_last") != search_query:
+            st.session_state.member_search_last = search_query
+            st.session_state.member_search_page = 0
+        page = st.session_state.get("member_search_page", 0)
+        results = search_members(search_query, limit=MEMBER_PAGE_SIZE, offset=page * MEMBER_PAGE_SIZE)
+        
+        if results.total == 0:
+            # Page through every member instead; the page number now belongs to this list
+            st.warning("No members match your search; showing all members.")
+            results = search_members("", limit=MEMBER_PAGE_SIZE, offset=page * MEMBER_PAGE_SIZE)
+        if not results.member_ids and page > 0 and results.total:
+            # The list shrank under the current page; go to its last page
+            page = st.session_state.member_search_page = (results.total - 1) // MEMBER_PAGE_SIZE
+            results = search_members(results.query, limit=MEMBER_PAGE_SIZE, offset=page * MEMBER_PAGE_SIZE)
+        
         member_options = {}
-        for member in members:
-            scenario_emoji = {
-                "renewal_needed": "🔄",
-                "work_compliance": "💼", 
-                "documents_missing": "📄",
-                "multilingual": "🌐",
-                "compliant": "✅"
-            }
-            
-            # Determine scenario based on member data
-            if member.eligibility.status == "renewal_needed":
-                scenario = "renewal_needed"
-            elif member.work_requirement.required and member.work_requirement.hours_reported < 80:
-                scenario = "work_compliance"
-            elif member.eligibility.required_documents:
-                scenario = "documents_missing"
-            elif member.contact.language != "English":
-                scenario = "multilingual"
-            else:
-                scenario = "compliant"
-            
-            emoji = scenario_emoji.get(scenario, "👤")
-            display_name = f"{emoji} {member.first_name} {member.last_name} - {scenario.replace('_', ' ').title()}"
-            member_options[display_name] = member.id
+        for result_id in results.member_ids:
+            member_options[member_option_label(get_member(result_id))] = result_id
         
         selected_member_display = st.selectbox(
             "🎯 Select Member Case to Process:",
@@ -715,6 +744,19 @@ def main():
             help="Choose a member case to demonstrate the agentic AI workflow"
         )
         
+        page_count = (results.total + MEMBER_PAGE_SIZE - 1) // MEMBER_PAGE_SIZE
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("◀ Previous", disabled=page == 0, use_container_width=True):
+                st.session_state.member_search_page = page - 1
+                st.rerun()
+        with info_col:
+            st.caption(f"Page {page + 1} of {page_count} · {results.total:,} matching members")
+        with next_col:
+            if st.button("Next ▶", disabled=page + 1 >= page_count, use_container_width=True):
+                st.session_state.member_search_page = page + 1
+                st.rerun()
+        
         member_id = member_options[selected_member_display]
         member = get_member(member_id)
         
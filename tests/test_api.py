@@ -0,0 +1,107 @@
+"""API worker pool backpressure and batch bookkeeping."""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.app as api
+from storage.document_store import DocumentStore
+from storage.member_repository import get_all_member_ids, get_member, load_members, update_member
+
+
+@pytest.fixture
+def client():
+    load_members()
+    with TestClient(api.app) as client:
+        yield client
+
+
+def _blocked_pool(monkeypatch, max_workers: int = 1, max_pending: int = 1):
+    """Install a pool whose slots are all held by a job that waits on the returned event."""
+    pool = api.BoundedWorkerPool(max_workers, max_pending)
+    monkeypatch.setattr(api, "_pool", pool)
+    release = threading.Event()
+    for _ in range(pool.max_pending):
+        assert pool.submit(release.wait) is not None
+    return pool, release
+
+
+def test_pool_rejects_when_saturated(monkeypatch):
+    pool, release = _blocked_pool(monkeypatch, max_workers=1, max_pending=2)
+    assert pool.pending == 2
+    assert pool.submit(time.sleep, 0) is None
+    release.set()
+    assert pool.submit(time.sleep, 0, block=True).result(timeout=5) is None
+    pool.shutdown()
+    assert pool.pending == 0
+
+
+def test_saturated_pool_returns_429(client, monkeypatch):
+    pool, release = _blocked_pool(monkeypatch)
+    response = client.post(f"/members/{get_all_member_ids()[0]}/process")
+    release.set()
+    pool.shutdown()
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(api.RETRY_AFTER_SECONDS)
+
+
+def test_unknown_member_is_404(client):
+    assert client.post("/members/no-such-member/process").status_code == 404
+    assert client.post("/batches", json={"member_ids": ["no-such-member"]}).status_code == 404
+    assert client.get("/batches/no-such-batch").status_code == 404
+
+
+def test_batch_streams_one_result_per_member(client):
+    member_ids = get_all_member_ids()
+    accepted = client.post("/batches", json={"member_ids": member_ids + member_ids[:1]})
+    assert accepted.status_code == 202
+    batch_id = accepted.json()["batch_id"]
+
+    lines = client.get(f"/batches/{batch_id}/results").text.splitlines()
+    assert len(lines) == len(member_ids)
+    summary = client.get(f"/batches/{batch_id}").json()
+    assert summary["status"] == "completed"
+    assert summary["completed"] == summary["submitted"] == len(member_ids)
+
+
+def test_members_never_submitted_are_failed(monkeypatch):
+    class FailingPool:
+        def submit(self, fn, *args, block=False):
+            if args[0] == "b":
+                raise RuntimeError("pool shut down")
+            future = Future()
+            future.set_result({})
+            return future
+
+    monkeypatch.setattr(api, "get_pool", lambda: FailingPool())
+    batch = api.Batch(["a", "b", "c"])
+    assert api._active_batches.acquire(blocking=False)
+    api._feed_batch(batch)
+
+    summary = batch.summary()
+    assert batch.submitted.is_set()
+    assert (summary["submitted"], summary["completed"], summary["failed"]) == (1, 1, 2)
+    assert summary["status"] == "completed"
+    assert api._result_record("c", batch.futures["c"])["error"] == "pool shut down"
+
+
+def test_upload_puts_valid_document_on_file(client, monkeypatch, tmp_path):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(api, "_document_store", DocumentStore(str(tmp_path / "documents"), executor=executor))
+    original = get_member("1")
+    try:
+        response = client.put("/members/1/documents/address_proof?filename=lease.pdf",
+                              content=b"%PDF-1.4\n1 0 obj << /Type /Page >> endobj\n%%EOF")
+        assert response.status_code == 200
+        assert response.json()["pages"] == 1
+        assert get_member("1").documents["address_proof"]["sha256"] == response.json()["sha256"]
+
+        assert client.put("/members/1/documents/identity_proof", content=b"not a document").status_code == 422
+        assert "identity_proof" not in (get_member("1").documents or {})
+        assert client.put("/members/missing/documents/address_proof", content=b"%PDF").status_code == 404
+    finally:
+        update_member("1", original)
+        executor.shutdown()
@@ -0,0 +1,162 @@
+"""Audit store queries, segment pruning and the segment hash chain."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from storage.audit_store import GENESIS_DIGEST, AuditStore, entry_status, to_epoch_seconds
+
+DAYS = ("2026-01-05", "2026-01-06", "2026-01-07")
+AGENTS = ("eligibility_checker", "document_assistant", "reminder")
+
+
+def _entries(day: str, count: int = 30, members: str = "ABCDEFG"):
+    return [
+        {"timestamp": f"{day}T{10 + index % 8:02d}:{index % 60:02d}:00", "agent": AGENTS[index % 3],
+         "action": f"{AGENTS[index % 3]}_action", "member_id": f"{members[index % len(members)]}{index % 2}",
+         "result": "complete" if index % 4 else "error"}
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def entries():
+    return [entry for day in DAYS for entry in _entries(day)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AuditStore(str(tmp_path / "audit"))
+    for day in DAYS:
+        store.append_many(_entries(day))
+        store.flush()
+    yield store
+    store.close()
+
+
+def _scan(entries, member_id=None, agent=None, status=None, start=None, end=None):
+    start_ts, end_ts = to_epoch_seconds(start), to_epoch_seconds(end)
+    return [
+        entry for entry in entries
+        if (member_id is None or entry["member_id"] == member_id)
+        and (agent is None or entry["agent"] == agent)
+        and (status is None or entry_status(entry) == status)
+        and (start_ts is None or to_epoch_seconds(entry["timestamp"]) >= start_ts)
+        and (end_ts is None or to_epoch_seconds(entry["timestamp"]) < end_ts)
+    ]
+
+
+def _key(entries):
+    return sorted(json.dumps(entry, sort_keys=True) for entry in entries)
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"member_id": "C1"},
+    {"agent": "reminder", "status": "error"},
+    {"member_id": "A0", "start": "2026-01-06T00:00:00", "end": "2026-01-07T00:00:00"},
+    {"member_id": "missing"},
+    {"status": "complete", "start": "2026-01-07T12:00:00"}
+])
+def test_query_matches_scan(store, entries, filters):
+    assert _key(store.query(**filters)) == _key(_scan(entries, **filters))
+
+
+def test_member_results_are_in_time_order(store):
+    timestamps = [entry["timestamp"] for entry in store.query(member_id="B1")]
+    assert timestamps == sorted(timestamps)
+
+
+def test_buffered_entries_are_visible_before_flush(store):
+    store.append({"timestamp": "2026-01-08T09:00:00", "agent": "reminder", "action": "send",
+                  "member_id": "Z9", "result": "complete"})
+    assert [entry["member_id"] for entry in store.query(member_id="Z9")] == ["Z9"]
+
+
+def test_segments_are_pruned_by_time_member_and_values(tmp_path):
+    store = AuditStore(str(tmp_path / "audit"))
+    store.append_many(_entries("2026-01-05", members="ABC"))
+    store.flush()
+    store.append_many(_entries("2026-01-05", members="XYZ"))
+    store.flush()
+
+    assert len(store.segments()) == 2
+    assert len(store.segments(member_id="A0")) == 1
+    assert len(store.segments(member_id="M0")) == 0
+    assert len(store.segments(agent="unknown_agent")) == 0
+    assert len(store.segments(start_ts=to_epoch_seconds("2026-01-06T00:00:00"))) == 0
+    assert store.partitions()["2026-01-05"]["entries"] == 60
+    store.close()
+
+
+def test_reopened_store_reads_flushed_segments(store, entries):
+    reopened = AuditStore(store.root)
+    assert _key(reopened.query(agent="eligibility_checker")) == _key(_scan(entries, agent="eligibility_checker"))
+    reopened.close()
+
+
+def _segment_paths(store: AuditStore):
+    return sorted(
+        os.path.join(store.root, info["path"])
+        for partition in store._manifest["partitions"].values() for info in partition["segments"]
+    )
+
+
+def _rewrite(path: str, **changes) -> None:
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+    arrays.update(changes)
+    for name in [name for name, value in changes.items() if value is None]:
+        del arrays[name]
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def test_intact_chain_verifies(store):
+    result = store.verify(processes=1)
+    assert result.valid, result.errors
+    assert result.segments_checked == len(DAYS)
+    assert result.entries_checked == 30 * len(DAYS)
+    assert result.head_digest == store.head_digest() != GENESIS_DIGEST
+    assert store.verify(processes=2, expected_head=store.head_digest()).valid
+
+
+def test_edited_entry_is_detected(store):
+    path = _segment_paths(store)[1]
+    with np.load(path) as data:
+        payload = data["payload"].copy()
+    payload[payload.tobytes().index(b"complete")] = ord("C")
+    _rewrite(path, payload=payload)
+
+    result = AuditStore(store.root).verify(processes=1)
+    assert not result.valid
+    assert any("contents do not match" in error for error in result.errors)
+
+
+def test_removed_segment_is_detected(store):
+    os.remove(_segment_paths(store)[0])
+    result = AuditStore(store.root).verify(processes=1)
+    assert not result.valid
+
+
+def test_rewritten_trail_fails_expected_head(store):
+    head = store.head_digest()
+    store.append_many(_entries("2026-01-08"))
+    store.flush()
+    assert store.verify(processes=1).valid
+    assert not store.verify(processes=1, expected_head=head).valid
+
+
+def test_manifest_without_head_digest_is_corrupt(store):
+    store.close()
+    manifest_path = os.path.join(store.root, "manifest.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    del manifest["head_digest"]
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError):
+        AuditStore(store.root)
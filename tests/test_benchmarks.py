@@ -0,0 +1,37 @@
+"""Synthetic populations and the benchmark runner's baseline comparison."""
+
+from benchmarks.run_benchmarks import BenchmarkResult, compare_results, load_results, run_benchmarks, write_results
+from storage.member_repository import generate_synthetic_members
+
+
+def _result(name: str, best_seconds: float) -> BenchmarkResult:
+    return BenchmarkResult(name=name, size=100, ops=10, repeats=1, best_seconds=best_seconds,
+                           median_seconds=best_seconds, per_op_us=best_seconds / 10 * 1e6)
+
+
+def test_synthetic_population_is_deterministic():
+    first = generate_synthetic_members(50, seed=3)
+    assert len(first) == 50
+    assert first == generate_synthetic_members(50, seed=3)
+    assert first != generate_synthetic_members(50, seed=4)
+
+
+def test_regressions_beyond_threshold_are_flagged(tmp_path):
+    baseline = [_result("repository.get_member", 1.0), _result("member.construct", 1.0)]
+    path = str(tmp_path / "baseline.json")
+    write_results(baseline, path)
+    assert load_results(path) == baseline
+
+    current = [_result("repository.get_member", 1.05), _result("member.construct", 1.5), _result("new", 9.0)]
+    regressions = compare_results(current, load_results(path), threshold=0.10)
+    assert len(regressions) == 1 and regressions[0].startswith("member.construct at 100 members")
+
+
+def test_runner_covers_requested_benchmarks():
+    results = run_benchmarks([20], repeats=1, max_ops=5, only=["repository.", "member.model_dump"])
+    names = {result.name for result in results}
+    assert names == {
+        "repository.get_member", "repository.get_members_by_status",
+        "repository.get_members_renewal_due_soon", "member.model_dump", "member.model_dump_json"
+    }
+    assert all(result.size == 20 and result.per_op_us >= 0 for result in results)
@@ -0,0 +1,101 @@
+"""Checkpoint stores and mid-workflow resume."""
+
+import pytest
+
+from main import SIMULATED_STEPS, run_workflow_steps
+from models.state import AgentState
+from storage.checkpoint import (Checkpointer, FileCheckpointStore, MemoryCheckpointStore,
+                                SQLiteCheckpointStore, decode_state, encode_state)
+from storage.member_repository import create_synthetic_members
+
+
+def _state(member) -> AgentState:
+    return AgentState(
+        member=member,
+        eligibility_verified=False,
+        work_requirements_needed=False,
+        documents_required=[],
+        documents_submitted=[],
+        work_hours_reported=0,
+        interactions=[],
+        audit_log=[]
+    )
+
+
+@pytest.fixture
+def member():
+    return create_synthetic_members()["1"]
+
+
+@pytest.fixture(params=["memory", "sqlite", "file"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCheckpointStore()
+    elif request.param == "sqlite":
+        store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+        yield store
+        store.close()
+    else:
+        yield FileCheckpointStore(str(tmp_path / "checkpoints"))
+
+
+def test_state_round_trips(member):
+    state = _state(member)
+    assert decode_state(encode_state(state))["member"] == member
+
+
+def test_store_put_get_delete(store):
+    assert store.get("run/1") is None
+    store.put("run/1", "eligibility_checker", b"one")
+    store.put("run/1", "document_assistant", b"two")
+    assert store.get("run/1") == ("document_assistant", b"two")
+    store.delete("run/1")
+    assert store.get("run/1") is None
+
+
+def test_failed_run_resumes_after_last_completed_step(member):
+    calls = []
+    failing = {"reminder": True}
+
+    def wrap(name, step):
+        def run(state):
+            calls.append(name)
+            if failing.pop(name, False):
+                raise RuntimeError("transient")
+            return step(state)
+        return name, run
+
+    steps = [wrap(name, step) for name, step in SIMULATED_STEPS]
+    checkpointer = Checkpointer(MemoryCheckpointStore())
+
+    with pytest.raises(RuntimeError):
+        run_workflow_steps(_state(member), steps, checkpointer)
+    assert checkpointer.restore(member.id)[0] == "work_requirement"
+
+    calls.clear()
+    result = run_workflow_steps(_state(member), steps, checkpointer)
+    assert calls == ["reminder", "multilingual_chat", "audit_compliance"]
+    assert result["eligibility_verified"]
+    assert checkpointer.restore(member.id) is None
+
+
+def test_checkpoint_is_discarded_when_member_changed(member):
+    checkpointer = Checkpointer(MemoryCheckpointStore())
+    checkpointer.save(member.id, "audit_compliance", _state(member))
+
+    calls = []
+    steps = [(name, lambda state, name=name: calls.append(name) or state) for name, _ in SIMULATED_STEPS]
+    changed = member.model_copy(update={"household_size": member.household_size + 1})
+    run_workflow_steps(_state(changed), steps, checkpointer)
+
+    assert calls == [name for name, _ in SIMULATED_STEPS]
+
+
+def test_runs_do_not_see_each_others_checkpoints(member):
+    store = MemoryCheckpointStore()
+    first = Checkpointer(store, run_id="first")
+    second = Checkpointer(store, run_id="second")
+
+    first.save(member.id, "eligibility_checker", _state(member))
+    assert second.restore(member.id) is None
+    assert first.restore(member.id)[0] == "eligibility_checker"
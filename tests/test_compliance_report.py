@@ -0,0 +1,102 @@
+"""Compliance report aggregation is independent of how inputs are partitioned."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import reporting.compliance_report as compliance_report
+from reporting.compliance_report import (ReportAggregate, aggregate_partition, aggregate_records,
+                                         generate_report, partition_inputs)
+
+START = datetime(2026, 1, 1)
+
+
+def _entry(member_id: str, agent: str, action: str, seconds: float, **extra):
+    timestamp = (START + timedelta(seconds=seconds)).isoformat()
+    return {"member_id": member_id, "agent": agent, "action": action, "timestamp": timestamp, **extra}
+
+
+def _runs():
+    """Interleaved runs, including one that spans most of the file."""
+    entries = [_entry("long", "eligibility_checker", "eligibility_verification", 0)]
+    for index in range(200):
+        member_id = f"m{index}"
+        base = index * 10
+        entries.append(_entry(member_id, "eligibility_checker", "eligibility_verification", base))
+        entries.append(_entry(member_id, "reminder", "notification_sent", base + 1,
+                              channel="email", language="English"))
+        entries.append(_entry(member_id, "audit_compliance", "compliance_verification", base + index % 7,
+                              status="compliant" if index % 3 else "non_compliant", issues=["documents_missing"]))
+    entries.append(_entry("long", "audit_compliance", "compliance_verification", 5000, status="compliant"))
+    return entries
+
+
+@pytest.fixture
+def audit_file(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in _runs()))
+    return str(path)
+
+
+def _strip(report):
+    report.pop("generated_at")
+    return report
+
+
+def test_runs_cut_at_partition_edges_are_stitched(audit_file):
+    expected = _strip(aggregate_records(_runs()).to_report())
+    assert expected["turnaround_seconds"]["runs"] == 201
+    assert expected["turnaround_seconds"]["max"] == 5000
+
+    for partitions in (2, 7, 50):
+        ranges = partition_inputs([audit_file], partitions)
+        assert len(ranges) == partitions
+        total = ReportAggregate()
+        for partition in ranges:
+            total.merge(aggregate_partition(*partition))
+        assert _strip(total.to_report()) == expected, partitions
+
+
+def test_parallel_report_matches_serial(audit_file):
+    serial = _strip(generate_report([audit_file], processes=1))
+    assert _strip(generate_report([audit_file], processes=3)) == serial
+    assert serial["compliance"]["evaluations"] == 201
+    assert serial["reminders"]["total"] == 200
+
+
+def test_empty_input_gives_empty_report(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_text("")
+    report = generate_report([str(path)], processes=2)
+    assert report["audit_entries"] == 0
+    assert report["turnaround_seconds"]["runs"] == 0
+
+
+def test_abandoned_runs_stay_bounded_across_partitions(tmp_path, monkeypatch):
+    monkeypatch.setattr(compliance_report, "MAX_TRACKED_RUNS", 20)
+    entries = []
+    for index in range(300):
+        # Every run but each third is started and never finished
+        entries.append(_entry(f"m{index}", "eligibility_checker", "eligibility_verification", index * 10))
+        if index % 3 == 0:
+            entries.append(_entry(f"m{index}", "audit_compliance", "compliance_verification", index * 10 + 4,
+                                  status="compliant"))
+    path = tmp_path / "audit.jsonl"
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+    serial = aggregate_records(entries)
+    assert len(serial._open_runs) <= 20
+    expected = _strip(serial.to_report())
+    assert expected["turnaround_seconds"]["runs"] == 100
+    assert expected["turnaround_seconds"]["unfinished"] == 200
+    assert expected["turnaround_seconds"]["max"] == 4
+
+    for partitions in (1, 2, 7):
+        total = ReportAggregate()
+        for partition in partition_inputs([str(path)], partitions):
+            aggregate = aggregate_partition(*partition)
+            assert len(aggregate._open_runs) <= 20 and len(aggregate._orphans) <= 20
+            total.merge(aggregate)
+        assert len(total._open_runs) <= 20 and len(total._orphans) <= 20
+        assert _strip(total.to_report()) == expected, partitions
@@ -0,0 +1,91 @@
+"""Content-addressed document store: deduplication, validation and garbage collection."""
+
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from storage.document_store import DocumentStore, DocumentTooLargeError
+from storage.member_repository import create_synthetic_members
+
+PDF = b"%PDF-1.4\n1 0 obj << /Type /Page >> endobj\n%%EOF"
+
+
+@pytest.fixture
+def store(tmp_path):
+    executor = ThreadPoolExecutor(max_workers=2)
+    store = DocumentStore(str(tmp_path / "documents"), max_bytes=1024, executor=executor)
+    yield store
+    store.close()
+    executor.shutdown()
+
+
+def test_identical_uploads_are_stored_once(store):
+    first = store.put("a", "address_proof", io.BytesIO(PDF), filename="lease.pdf")
+    second = store.put("b", "address_proof", io.BytesIO(PDF))
+    assert not first.deduplicated and second.deduplicated
+    assert first.digest == second.digest
+    assert store.reference_count(first.digest) == 2
+    with store.open(first.digest) as data:
+        assert bytes(data) == PDF
+    assert store.get("a", "address_proof").filename == "lease.pdf"
+
+
+def test_oversized_upload_is_rejected(store):
+    with pytest.raises(DocumentTooLargeError):
+        store.put("a", "address_proof", io.BytesIO(b"x" * 2048))
+    assert os.listdir(store._tmp_dir) == []
+
+
+def test_chunks_are_written_once_into_the_object(store):
+    with store.open_object() as writer:
+        for start in range(0, len(PDF), 7):
+            writer.write(PDF[start:start + 7])
+        digest, size, deduplicated = writer.commit()
+    assert (digest, size, deduplicated) == (hashlib.sha256(PDF).hexdigest(), len(PDF), False)
+    with store.open(digest) as data:
+        assert bytes(data) == PDF
+    assert os.listdir(store._tmp_dir) == []
+
+    with pytest.raises(DocumentTooLargeError):
+        with store.open_object() as writer:
+            for _ in range(3):
+                writer.write(b"x" * 512)
+    assert os.listdir(store._tmp_dir) == []
+
+
+def test_validation(store):
+    digest, _, _ = store.put_object(io.BytesIO(PDF))
+    result = store.validate(digest).result()
+    assert result.valid and result.content_type == "application/pdf" and result.pages == 1
+    assert store.validate(digest).result() == result
+
+    bad, _, _ = store.put_object(io.BytesIO(b"not a document"))
+    assert store.validate(bad).result().errors == ["Unsupported document type"]
+
+
+def test_stored_document_goes_on_file_for_the_member(store):
+    member = create_synthetic_members()["2"]
+    stored = store.put(member.id, "medical_records", io.BytesIO(PDF))
+    updated = stored.apply_to_member(member)
+    assert updated.documents["medical_records"]["sha256"] == stored.digest
+    assert "medical_records" not in updated.get_missing_documents()
+    assert member.documents.get("medical_records") != updated.documents["medical_records"]
+
+
+def test_garbage_collection_keeps_referenced_and_recent_objects(store):
+    kept = store.put("a", "address_proof", io.BytesIO(PDF))
+    orphan, _, _ = store.put_object(io.BytesIO(b"%PDF-orphan"))
+
+    assert store.collect_garbage() == 0
+    assert store.collect_garbage(grace_seconds=0) == 1
+    assert not os.path.exists(store.object_path(orphan))
+    assert os.path.exists(store.object_path(kept.digest))
+
+    assert store.remove("a", "address_proof")
+    assert store.collect_garbage(grace_seconds=0) == 1
+    assert not os.path.exists(store.object_path(kept.digest))
+    with pytest.raises(FileNotFoundError):
+        store.add_reference("a", "address_proof", kept.digest)
@@ -0,0 +1,65 @@
+"""Document-type bitmasks and the population mask table."""
+
+import pytest
+
+import models.documents as documents
+import models.member as member_module
+import storage.document_index as document_index
+from models.documents import MAX_DOCUMENT_TYPES, DocumentRegistry, split_documents
+from storage.document_index import DocumentMaskTable
+from storage.member_repository import create_synthetic_members
+
+
+def test_registry_overflows_to_zero_at_64_types():
+    registry = DocumentRegistry()
+    bits = [registry.register(f"type_{index}") for index in range(MAX_DOCUMENT_TYPES)]
+    assert bits == [1 << index for index in range(MAX_DOCUMENT_TYPES)]
+
+    assert registry.register("one_too_many") == 0
+    assert "one_too_many" not in registry
+    assert len(registry) == MAX_DOCUMENT_TYPES
+    assert registry.register("type_63") == 1 << 63
+    assert registry.names(registry.mask(["type_0", "type_63", "one_too_many"])) == ["type_0", "type_63"]
+    assert not registry.encodes(["type_0", "one_too_many"])
+
+
+def test_lookups_do_not_register():
+    registry = DocumentRegistry(["a"])
+    assert registry.bit("b") == 0
+    assert registry.mask(["a", "b"]) == 1
+    assert "b" not in registry
+
+
+@pytest.mark.parametrize("required, on_file, expected", [
+    (["income_verification", "address_proof"], {"address_proof": {}}, (["address_proof"], ["income_verification"])),
+    (["identity_proof"], [], ([], ["identity_proof"])),
+    (["never_seen", "income_verification"], ["never_seen"], (["never_seen"], ["income_verification"])),
+    ([], ["address_proof"], ([], []))
+])
+def test_split_documents_keeps_required_order(required, on_file, expected):
+    assert split_documents(required, on_file) == expected
+
+
+def test_mask_table_matches_member_predicates():
+    members = list(create_synthetic_members().values())
+    table = DocumentMaskTable(members)
+
+    for document_type in ("income_verification", "address_proof", "identity_proof"):
+        expected = [member.id for member in members if document_type in member.get_missing_documents()]
+        assert table.members_missing(document_type) == expected
+        assert table.count_missing(document_type) == len(expected)
+    assert table.incomplete_count() == sum(1 for member in members if member.get_missing_documents())
+
+
+def test_mask_table_counts_types_without_a_bit(monkeypatch):
+    registry = DocumentRegistry([f"type_{index}" for index in range(MAX_DOCUMENT_TYPES)])
+    for module in (documents, member_module, document_index):
+        monkeypatch.setattr(module, "DOCUMENT_REGISTRY", registry)
+    member = create_synthetic_members()["1"]
+    eligibility = member.eligibility.model_copy(update={"required_documents": ["type_0", "overflow_type"]})
+    member = member.model_copy(update={"eligibility": eligibility, "documents": {}})
+
+    table = DocumentMaskTable([member])
+    assert table.members_missing("overflow_type") == [member.id]
+    assert table.missing_counts()["overflow_type"] == 1
+    assert list(table.missing_per_member()) == [2]
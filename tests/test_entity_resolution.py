@@ -0,0 +1,65 @@
+"""Duplicate member detection: phonetic blocking, similarity scoring and partitioning."""
+
+import pytest
+
+from batch.entity_resolution import (DuplicateCandidate, cluster_duplicates, jaro_winkler, normalize_email,
+                                     normalize_phone, resolve_partition, score_pair, soundex)
+
+
+def _record(member_id, first="MARIA", last="RODRIGUEZ", dob="1985-03-14", phone="", email="", address="A"):
+    return (member_id, first, last, dob, phone, email, address)
+
+
+@pytest.mark.parametrize("name, code", [
+    ("Robert", "R163"), ("Rupert", "R163"), ("Ashcraft", "A261"), ("Tymczak", "T522"),
+    ("Pfister", "P236"), ("Honeyman", "H555"), ("Lee", "L000"), ("O'Brien", "O165"), ("", "")
+])
+def test_soundex(name, code):
+    assert soundex(name) == code
+
+
+@pytest.mark.parametrize("a, b, similarity", [
+    ("MARTHA", "MARHTA", 0.9611), ("DWAYNE", "DUANE", 0.84), ("DIXON", "DICKSONX", 0.8133),
+    ("SAME", "SAME", 1.0), ("ABC", "XYZ", 0.0), ("", "", 0.0)
+])
+def test_jaro_winkler(a, b, similarity):
+    assert jaro_winkler(a, b) == pytest.approx(similarity, abs=1e-4)
+
+
+def test_contact_normalization():
+    assert normalize_phone("+1 (555) 123-4567") == "5551234567"
+    assert normalize_phone("123") == ""
+    assert normalize_email(" Maria+Renewals@Email.COM ") == "maria@email.com"
+    assert normalize_email("not-an-email") == ""
+
+
+def test_score_pair_skips_names_below_threshold():
+    score, fields = score_pair(_record("1"), _record("2", first="MARIA", last="RODRIGES"))
+    assert score > 0.9 and fields["date_of_birth"] == 1.0
+    bound, fields = score_pair(_record("1"), _record("2", dob="1990-01-01", address="B"), threshold=0.85)
+    assert bound < 0.85 and fields == {}
+
+
+def test_oversized_blocks_are_split_by_first_initial():
+    # 6 records share one name block; split by first initial, only the group of 3 fits
+    records = [_record(str(i), first="ANA") for i in range(3)] + [_record(str(i), first="BOB") for i in range(3, 6)]
+    records.append(_record("6", first="BOBBY"))
+    pairs = {(c.member_id, c.duplicate_id) for c in resolve_partition(0, 1, records, max_block_size=3)}
+    assert pairs == {("0", "1"), ("0", "2"), ("1", "2")}
+    assert len(resolve_partition(0, 1, records, max_block_size=10)) > len(pairs)
+
+
+def test_partitions_together_find_every_pair():
+    records = [_record(str(i), last=last, phone=f"555000{i % 3:04d}")
+               for i, last in enumerate(["SMITH", "SMYTHE", "JONES", "JOHNS", "SMITH", "JONES"])]
+    single = {(c.member_id, c.duplicate_id) for c in resolve_partition(0, 1, records, threshold=0.8)}
+    split = set()
+    for partition in range(4):
+        split.update((c.member_id, c.duplicate_id) for c in resolve_partition(partition, 4, records, threshold=0.8))
+    assert split == single and single
+
+
+def test_cluster_duplicates_links_transitive_pairs():
+    pairs = [DuplicateCandidate(member_id=a, duplicate_id=b, score=0.9, fields={})
+             for a, b in [("1", "2"), ("2", "3"), ("4", "5")]]
+    assert cluster_duplicates(pairs) == [["1", "2", "3"], ["4", "5"]]
@@ -0,0 +1,78 @@
+"""Household grouping, shared document checks and notice consolidation."""
+
+import pytest
+
+import storage.member_repository as repository
+from batch.households import consolidate_notices, group_households, normalize_address, process_household
+from models.member import Address
+from storage.member_repository import create_synthetic_members, set_members
+
+
+def _address(street1: str, city: str = "Springfield", zip_code: str = "62701", street2=None) -> Address:
+    return Address(street1=street1, street2=street2, city=city, state="IL", zip_code=zip_code)
+
+
+@pytest.fixture
+def household_members():
+    """Members 1-3 share an address; 4 lives elsewhere and 5 shares it on another program."""
+    previous = dict(repository._members)
+    members = create_synthetic_members()
+    home = _address("12 Oak Street", street2="Apartment 4")
+    members = {
+        "1": members["1"].model_copy(update={"address": home}),
+        "2": members["2"].model_copy(update={"address": _address("12 oak st.", street2="apt 4", zip_code="62701-1234")}),
+        "3": members["3"].model_copy(update={"address": home}),
+        "4": members["4"].model_copy(update={"address": _address("99 Elm Road")}),
+        "5": members["5"].model_copy(update={
+            "address": home, "eligibility": members["5"].eligibility.model_copy(update={"program": "CHIP"})
+        })
+    }
+    set_members(members)
+    yield members
+    set_members(previous)
+
+
+def test_normalize_address_ignores_spelling_variants():
+    assert normalize_address(_address("12 Oak Street", street2="Apartment 4")) == \
+        normalize_address(_address("12 OAK ST.", street2="#4", zip_code="62701-0001"))
+    assert normalize_address(_address("12 Oak Street")) != normalize_address(_address("14 Oak Street"))
+    assert normalize_address(_address("12 Oak Street")) != normalize_address(_address("12 Oak Street", city="Chicago"))
+
+
+def test_group_households_by_address_and_program(household_members):
+    households = group_households(household_members.values())
+    assert [household.member_ids for household in households] == [["1", "2", "3"], ["4"], ["5"]]
+    assert len({household.household_id for household in households}) == 3
+    assert group_households(household_members.values())[0].household_id == households[0].household_id
+
+
+def test_shared_documents_count_for_every_housemate(household_members):
+    documents = {"address_proof": {"status": "submitted", "date": "2026-01-01"}}
+    set_members({**household_members, "2": household_members["2"].model_copy(update={"documents": documents})})
+    household = group_households(repository.get_all_members())[0]
+
+    result = process_household(household)
+
+    assert result.shared_documents == ["address_proof"]
+    assert all("address_proof" not in reminder for notice in result.notices for reminder in notice.reminders)
+    # The shared document was applied to copies, not written back to the repository
+    assert "address_proof" not in (repository.get_member("1").documents or {})
+
+
+def test_consolidate_notices_merges_per_channel_and_language(household_members):
+    household = group_households(household_members.values())[0]
+    results = [
+        {"member": household_members["1"], "reminders": ["renew"]},
+        {"member": household_members["2"], "reminders": ["renew", "upload"]},
+        {"member": household_members["3"], "reminders": []},
+        {"member": household_members["2"].model_copy(update={"id": "2b", "first_name": "Ana"}), "reminders": ["x"]}
+    ]
+    notices = consolidate_notices(household, results)
+
+    by_language = {notice.language: notice for notice in notices}
+    assert set(by_language) == {"Spanish", "English"}
+    english = by_language["English"]
+    assert english.recipient_id == "2"
+    assert english.member_ids == ["2", "2b"]
+    assert english.reminders[-1] == "Ana: x"
+    assert by_language["Spanish"].member_ids == ["1"]
@@ -0,0 +1,86 @@
+"""Lease, acknowledge, retry and dead-letter semantics of the job queue."""
+
+import time
+
+import pytest
+
+from storage.job_queue import DEAD, DONE, LEASED, LOST, PENDING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"), visibility_timeout=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def _expire(queue: JobQueue, job) -> None:
+    """Expire a lease without waiting out the visibility timeout."""
+    queue._conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ?", (time.time() - 1, job.id))
+
+
+def test_enqueue_skips_members_already_queued(queue):
+    assert queue.enqueue(["a", "b"]) == 2
+    assert queue.enqueue(["b", "c"]) == 1
+    assert queue.stats()[PENDING] == 3
+
+
+def test_leased_item_is_invisible_to_other_workers(queue):
+    queue.enqueue(["a", "b"])
+    first = queue.lease("w1")
+    second = queue.lease("w2")
+    assert [job.member_id for job in first] == ["a"]
+    assert [job.member_id for job in second] == ["b"]
+    assert queue.lease("w3") == []
+    assert queue.stats()[LEASED] == 2
+
+
+def test_ack_completes_and_stores_result(queue):
+    queue.enqueue(["a"])
+    job = queue.lease("w1")[0]
+    assert queue.ack(job, {"compliance_status": "compliant"})
+    assert queue.stats()[DONE] == 1
+    assert list(queue.results()) == [{"member_id": "a", "result": {"compliance_status": "compliant"}}]
+
+
+def test_expired_lease_is_handed_out_again(queue):
+    queue.enqueue(["a"])
+    first = queue.lease("w1")[0]
+    _expire(queue, first)
+    second = queue.lease("w2")[0]
+    assert second.member_id == "a"
+    assert second.attempts == 2
+
+
+def test_lost_lease_cannot_ack_fail_or_extend(queue):
+    queue.enqueue(["a"])
+    first = queue.lease("w1")[0]
+    _expire(queue, first)
+    second = queue.lease("w2")[0]
+
+    assert not queue.extend_lease(first)
+    assert not queue.ack(first)
+    assert queue.fail(first, "too late") == LOST
+    assert queue.stats()[LEASED] == 1
+    assert queue.ack(second)
+
+
+def test_failures_retry_then_dead_letter(queue):
+    queue.enqueue(["a"])
+    assert queue.fail(queue.lease("w1")[0], "first") == PENDING
+    assert queue.fail(queue.lease("w1")[0], "second") == DEAD
+    assert queue.lease("w1") == []
+    assert queue.dead_letters() == [{"member_id": "a", "attempts": 2, "error": "second"}]
+
+    assert queue.requeue_dead() == 1
+    assert queue.lease("w1")[0].attempts == 1
+
+
+def test_lease_expiring_on_last_attempt_is_dead_lettered(queue):
+    queue.enqueue(["a"])
+    queue.fail(queue.lease("w1")[0], "first")
+    last = queue.lease("w1")[0]
+    _expire(queue, last)
+    assert queue.lease("w2") == []
+    assert queue.stats()[DEAD] == 1
+    assert queue.dead_letters()[0]["error"] == "first"
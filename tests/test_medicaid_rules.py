@@ -0,0 +1,58 @@
+"""Scalar and vectorized evaluation of the Medicaid rules agree."""
+
+import numpy as np
+import pytest
+
+from rules.medicaid_rules import MEDICAID_RULES, evaluate_member, evaluate_population
+from storage.member_repository import create_synthetic_members
+
+
+@pytest.fixture(scope="module")
+def members():
+    demo = list(create_synthetic_members().values())
+    statuses = ["active", "renewal_needed", "inactive"]
+    exemptions = ["none", "not_required", "disability"]
+    members = []
+    for index in range(60):
+        member = demo[index % len(demo)]
+        work = member.work_requirement.model_copy(update={
+            "required": index % 2 == 0,
+            "current_month_hours": (index * 7) % 100,
+            "hours_reported": (index * 11) % 100,
+            "exemption_status": exemptions[index % 3]
+        })
+        eligibility = member.eligibility.model_copy(update={"status": statuses[index % 3]})
+        documents = dict(list((member.documents or {}).items())[:index % 3])
+        members.append(member.model_copy(update={
+            "id": f"m{index}", "work_requirement": work, "eligibility": eligibility, "documents": documents
+        }))
+    # A required type no member has submitted, so the unencoded path is covered too
+    eligibility = members[0].eligibility.model_copy(
+        update={"required_documents": members[0].eligibility.required_documents + ["pay_stub"]}
+    )
+    members[0] = members[0].model_copy(update={"eligibility": eligibility})
+    return members
+
+
+def test_batch_matches_scalar_rule_by_rule(members):
+    columns = evaluate_population(members)
+    for row, member in enumerate(members):
+        result = evaluate_member(member)
+        for rule in MEDICAID_RULES.rules:
+            assert bool(np.asarray(columns[rule.name][row] == result[rule.name])), (member.id, rule.name)
+
+
+def test_batch_issue_counts_match_scalar_issues(members):
+    counts = MEDICAID_RULES.issue_counts(evaluate_population(members))
+    expected = {rule.issue: 0 for rule in MEDICAID_RULES.rules if rule.issue}
+    for member in members:
+        for issue in evaluate_member(member).issues:
+            expected[issue] += 1
+    assert counts == expected
+
+
+def test_inputs_are_the_member_facts():
+    assert set(MEDICAID_RULES.inputs()) == {
+        "exemption_status", "work_required", "hours_reported", "hours_needed",
+        "missing_document_count", "eligibility_status", "eligibility_verified"
+    }
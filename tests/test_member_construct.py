@@ -0,0 +1,73 @@
+"""The trusted Member construction path against pydantic validation."""
+
+import pytest
+
+from models.member import (
+    Member, construct_member, construct_members, dump_members_json, load_members_json, validate_members_json
+)
+from storage.member_repository import generate_synthetic_members
+
+NESTED_FIELDS = ("address", "contact", "eligibility", "work_requirement")
+
+
+@pytest.fixture(scope="module")
+def members():
+    return list(generate_synthetic_members(200, seed=7).values())
+
+
+def _assert_same(constructed: Member, validated: Member) -> None:
+    assert constructed == validated
+    assert constructed.model_dump() == validated.model_dump()
+    assert constructed.model_dump_json() == validated.model_dump_json()
+    assert constructed.model_fields_set == validated.model_fields_set
+    assert constructed.__pydantic_extra__ == validated.__pydantic_extra__
+    assert constructed.__pydantic_private__ == validated.__pydantic_private__
+    for field in NESTED_FIELDS:
+        nested, expected = getattr(constructed, field), getattr(validated, field)
+        assert type(nested) is type(expected)
+        assert nested.model_fields_set == expected.model_fields_set
+
+
+def test_construct_member_matches_validation(members):
+    for member in members:
+        record = member.model_dump()
+        _assert_same(construct_member(record), Member.model_validate(record))
+
+
+def test_construct_members_matches_validation(members):
+    records = [member.model_dump() for member in members]
+    for constructed, record in zip(construct_members(records), records):
+        _assert_same(constructed, Member.model_validate(record))
+
+
+def test_bulk_json_round_trip(members):
+    data = dump_members_json(members)
+    for loaded, validated in zip(load_members_json(data), validate_members_json(data)):
+        _assert_same(loaded, validated)
+
+
+def test_constructed_member_copies_and_updates(members):
+    constructed = construct_member(members[0].model_dump())
+    copied = constructed.model_copy(update={"first_name": "Changed"}, deep=True)
+    assert copied.first_name == "Changed"
+    assert constructed.first_name == members[0].first_name
+    assert copied.address == constructed.address
+    assert copied.address is not constructed.address
+
+
+def test_omitted_fields_take_defaults_and_are_not_set(members):
+    record = members[0].model_dump()
+    for field in ("documents", "notes", "household_size"):
+        record.pop(field)
+    constructed, validated = construct_member(record), Member.model_validate(record)
+    # Field order may differ, so compare values rather than JSON
+    assert constructed == validated and constructed.model_dump() == validated.model_dump()
+    assert constructed.model_fields_set == validated.model_fields_set
+    assert "notes" not in constructed.model_fields_set and constructed.household_size == 1
+
+
+def test_constructed_members_do_not_share_fields_set(members):
+    record = members[0].model_dump()
+    first, second = construct_members([record, record])
+    assert first.model_fields_set is not second.model_fields_set
+    assert first.address is not second.address
@@ -0,0 +1,94 @@
+"""Renewal-date index in the member repository."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+import storage.member_repository as repository
+from models.member import to_epoch_day
+
+
+@pytest.fixture
+def members():
+    saved = repository._members
+    repository._members = {}
+    yield repository.load_members()
+    repository._members = saved
+    repository._rebuild_renewal_index()
+
+
+def _with_renewal(member, day: date):
+    eligibility = member.eligibility.model_copy(update={"renewal_date": day.isoformat()})
+    return member.model_copy(update={"eligibility": eligibility})
+
+
+def test_due_soon_matches_member_predicate(members):
+    for threshold in (0, 30, 60, 365):
+        expected = {member.id for member in members.values() if member.is_renewal_due_soon(threshold)}
+        assert {member.id for member in repository.get_members_renewal_due_soon(threshold)} == expected
+
+
+def test_range_query_is_inclusive_and_ordered(members):
+    start = date.today() + timedelta(days=10)
+    for offset, member_id in enumerate(["3", "1", "2"]):
+        repository.update_member(member_id, _with_renewal(members[member_id], start + timedelta(days=offset)))
+
+    due = repository.get_member_ids_due_between(start, start + timedelta(days=2))
+    assert due[:3] == ["3", "1", "2"]
+    assert repository.get_member_ids_due_between(start, start) == ["3"]
+
+
+def test_update_moves_member_within_index(members):
+    day = date.today() + timedelta(days=500)
+    repository.update_member("4", _with_renewal(members["4"], day))
+    assert repository.get_member_ids_due_between(day, day) == ["4"]
+
+    later = day + timedelta(days=1)
+    repository.update_member("4", _with_renewal(members["4"], later))
+    assert repository.get_member_ids_due_between(day, day) == []
+    assert repository.get_member_ids_due_between(later, later) == ["4"]
+
+
+def test_unparseable_renewal_date_is_not_indexed(members):
+    eligibility = members["5"].eligibility.model_copy(update={"renewal_date": "not a date"})
+    repository.update_member("5", members["5"].model_copy(update={"eligibility": eligibility}))
+    everyone = repository.get_member_ids_due_between(date(1970, 1, 1), date(9999, 12, 31))
+    assert "5" not in everyone
+    assert not repository.get_member("5").is_renewal_due_soon(10_000)
+
+
+def test_to_epoch_day_accepts_datetimes():
+    assert to_epoch_day("1970-01-02") == 1
+    assert to_epoch_day("1970-01-02T23:59:59Z") == 1
+    assert to_epoch_day("garbage") is None
+
+
+def test_updates_keep_day_buckets_consistent_with_a_rebuild(members):
+    population = repository.generate_synthetic_members(500, seed=29)
+    repository.set_members(population)
+    start = date.today()
+    for index, member_id in enumerate(list(population)[::3]):
+        repository.update_member(member_id, _with_renewal(population[member_id], start + timedelta(days=index % 7)))
+
+    # Emptied days leave the day list, which stays sorted and distinct
+    assert repository._renewal_days == sorted(repository._renewal_buckets)
+    assert all(repository._renewal_buckets.values())
+    window = (start, start + timedelta(days=400))
+    due = repository.get_member_ids_due_between(*window)
+    repository._rebuild_renewal_index()
+    assert sorted(repository.get_member_ids_due_between(*window)) == sorted(due)
+    days = [to_epoch_day(repository.get_member(member_id).eligibility.renewal_date) for member_id in due]
+    assert days == sorted(days)
+
+
+def test_concurrent_document_updates_are_not_lost(members):
+    document_types = [f"document_{index}" for index in range(32)]
+
+    def submit(document_type):
+        return repository.update_member_documents("2", {document_type: {"status": "submitted"}})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(submit, document_types))
+    assert set(document_types) <= set(repository.get_member("2").documents)
+    assert repository.update_member_documents("missing", {"address_proof": {"status": "submitted"}}) is None
@@ -0,0 +1,63 @@
+"""tracemalloc-based peak and retained memory accounting."""
+
+import pytest
+
+from main import process_member
+from storage.member_repository import load_members
+from utils.memory_profiler import MEMORY_PROFILER, MemoryProfiler, merge_reports
+
+
+@pytest.fixture
+def profiler():
+    profiler = MemoryProfiler()
+    profiler.start(frames=1)
+    yield profiler
+    profiler.stop()
+
+
+def test_tracking_is_a_no_op_while_disabled():
+    profiler = MemoryProfiler()
+    with profiler.track("idle"):
+        pass
+    assert profiler.report()["labels"] == {}
+
+
+def test_peak_and_retained_bytes_are_attributed_to_labels(profiler):
+    kept = []
+    with profiler.track("outer"):
+        with profiler.track("transient"):
+            scratch = bytearray(2_000_000)
+            del scratch
+        with profiler.track("leaky"):
+            kept.append(bytearray(500_000))
+
+    labels = profiler.report()["labels"]
+    assert labels["transient"]["peak_max_bytes"] >= 2_000_000
+    assert labels["transient"]["retained_max_bytes"] < 100_000
+    assert labels["leaky"]["retained_max_bytes"] >= 500_000
+    # A parent's peak includes the peaks of its children
+    assert labels["outer"]["peak_max_bytes"] >= 2_000_000
+    assert labels["outer"]["retained_max_bytes"] >= 500_000
+    assert any(site["size_diff"] >= 500_000 for site in profiler.top_growth(limit=5))
+
+
+def test_worker_reports_merge_per_label(profiler):
+    with profiler.track("step"):
+        pass
+    report = profiler.report()
+    merged = merge_reports([report, report])
+    assert merged["workers"] == 2
+    assert merged["labels"]["step"]["calls"] == 2
+    assert merged["labels"]["step"]["peak_max_bytes"] == report["labels"]["step"]["peak_max_bytes"]
+
+
+def test_workflow_runs_are_tracked_per_member_and_agent():
+    load_members()
+    MEMORY_PROFILER.start(frames=1)
+    try:
+        process_member("1")
+        labels = MEMORY_PROFILER.report(top=0)["labels"]
+    finally:
+        MEMORY_PROFILER.stop()
+    assert labels["process_member"]["calls"] == 1
+    assert "agent.eligibility_checker" in labels
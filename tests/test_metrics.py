@@ -0,0 +1,73 @@
+"""Latency histograms, counters and their exposition."""
+
+import json
+
+import pytest
+
+from main import run_step
+from models.state import AgentState
+from storage.member_repository import create_synthetic_members
+from utils.metrics import METRICS, Histogram, MetricsRegistry
+
+
+def test_percentiles_interpolate_within_buckets():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    assert histogram.percentile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.percentile(0.5) == pytest.approx(1.5)
+    assert histogram.percentile(1.0) == pytest.approx(4.0)
+    assert histogram.sum == pytest.approx(6.5)
+
+
+def test_prometheus_exposition_is_cumulative():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.describe("latency_seconds", "Latency")
+    registry.observe("latency_seconds", 0.05, agent="a")
+    registry.observe("latency_seconds", 0.5, agent="a")
+    registry.inc("steps_total", agent='quote"d', outcome="success")
+
+    lines = registry.render_prometheus().splitlines()
+    assert "# HELP latency_seconds Latency" in lines
+    assert 'latency_seconds_bucket{agent="a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{agent="a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{agent="a",le="+Inf"} 2' in lines
+    assert 'latency_seconds_count{agent="a"} 2' in lines
+    assert 'steps_total{agent="quote\\"d",outcome="success"} 1' in lines
+
+
+def test_dump_writes_json_snapshot(tmp_path):
+    registry = MetricsRegistry()
+    registry.inc("members_total", 3)
+    path = tmp_path / "metrics.json"
+    registry.dump(str(path))
+    assert json.loads(path.read_text())["members_total"] == [{"labels": {}, "value": 3}]
+
+
+def _state() -> AgentState:
+    return AgentState(member=create_synthetic_members()["1"], eligibility_verified=False,
+                      work_requirements_needed=False, documents_required=[], documents_submitted=[],
+                      work_hours_reported=0, interactions=[], audit_log=[])
+
+
+def _counter(name: str, **labels):
+    return sum(series["value"] for series in METRICS.snapshot().get(name, []) if series["labels"] == labels)
+
+
+def test_run_step_records_outcome_and_branch():
+    def step(state):
+        return {**state, "audit_log": state["audit_log"] + [{"agent": "test_agent", "status": "denied"}]}
+
+    def failing(state):
+        raise RuntimeError("boom")
+
+    before = _counter("medicaid_agent_branch_total", agent="test_agent", branch="denied")
+    run_step("test_agent", step, _state())
+    with pytest.raises(RuntimeError):
+        run_step("test_agent", failing, _state())
+    run_step("test_agent", lambda state: state, _state())
+
+    assert _counter("medicaid_agent_branch_total", agent="test_agent", branch="denied") == before + 1
+    assert _counter("medicaid_agent_branch_total", agent="test_agent", branch="skipped") >= 1
+    assert _counter("medicaid_agent_steps_total", agent="test_agent", outcome="error") >= 1
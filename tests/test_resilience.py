@@ -0,0 +1,80 @@
+"""Resilient LLM wrapper and the workflow's fallback to simulated steps."""
+
+import copy
+import time
+
+from main import CompiledWorkflow, get_workflow, new_state
+from storage.member_repository import generate_synthetic_members
+from utils.metrics import METRICS
+from utils.resilience import OPEN, ResiliencePolicy, ResilientLLM
+
+
+class FakeLLM:
+    """Answers every prompt after `delay` seconds and counts the calls."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return "analysis"
+
+
+def _fallbacks(reason: str) -> int:
+    series = METRICS.snapshot().get("medicaid_agent_fallbacks_total", [])
+    return sum(point["value"] for point in series if point["labels"]["reason"] == reason)
+
+
+def _members(count: int):
+    return list(generate_synthetic_members(count, seed=3).values())
+
+
+def test_view_can_be_copied():
+    view = ResilientLLM(FakeLLM()).for_agent("reminder")
+    copied = copy.copy(view)
+    assert copied.agent == "reminder"
+    assert copied.llm is view.llm
+
+
+def test_agents_invoke_their_chains():
+    llm = FakeLLM()
+    member = _members(1)[0]
+    result = CompiledWorkflow(llm).run(new_state(member))
+    assert llm.calls == len(result["agent_notes"]) == 6
+    assert set(result["agent_notes"].values()) == {"analysis"}
+
+
+def test_timeout_falls_back_to_simulated_steps():
+    llm = FakeLLM(delay=0.2)
+    workflow = CompiledWorkflow(llm, ResiliencePolicy(deadline_seconds=0.02, max_attempts=1))
+    member = _members(1)[0]
+    before = _fallbacks("llm_unavailable")
+
+    result = workflow.run(new_state(member))
+    simulated = get_workflow().run(new_state(member))
+
+    assert _fallbacks("llm_unavailable") - before == len(workflow.steps)
+    assert llm.calls == len(workflow.steps)
+    assert result.get("agent_notes") is None
+    assert result["compliance_status"] == simulated["compliance_status"]
+    assert [entry["action"] for entry in result["audit_log"]] == [entry["action"] for entry in simulated["audit_log"]]
+    assert not any(entry.get("result") == "error" for entry in result["audit_log"])
+
+
+def test_open_breaker_skips_the_llm():
+    llm = FakeLLM(delay=0.2)
+    policy = ResiliencePolicy(deadline_seconds=0.02, max_attempts=1, breaker_failures=1, breaker_reset_seconds=60)
+    workflow = CompiledWorkflow(llm, policy)
+    first, second = _members(2)
+    workflow.run(new_state(first))
+    assert all(step.llm.breaker.state == OPEN for _, step in workflow.steps)
+
+    calls = llm.calls
+    before = _fallbacks("circuit_open")
+    result = workflow.run(new_state(second))
+
+    assert llm.calls == calls
+    assert _fallbacks("circuit_open") - before == len(workflow.steps)
+    assert result["compliance_status"] == get_workflow().run(new_state(second))["compliance_status"]
@@ -0,0 +1,123 @@
+"""Typeahead member search: prefix and substring matching, ranking, updates and paging."""
+
+import random
+
+import numpy as np
+import pytest
+
+import storage.search_index as search_index
+from storage.member_repository import create_synthetic_members, generate_synthetic_members
+from storage.search_index import MemberSearchIndex, normalize_query
+
+
+def _member(member_id: str, first: str, last: str, email: str = "", phone: str = ""):
+    base = create_synthetic_members()["1"]
+    contact = base.contact.model_copy(update={"email": email or f"{first}.{last}@email.com".lower(), "phone": phone})
+    return base.model_copy(update={"id": member_id, "first_name": first, "last_name": last, "contact": contact})
+
+
+@pytest.fixture
+def index():
+    return MemberSearchIndex([
+        _member("M1", "Maria", "Rodriguez", phone="555-201-0142"),
+        _member("M2", "Mario", "Alvarez"),
+        _member("M3", "Ana", "Samaria"),
+        _member("M4", "Pedro", "Rodriguez", email="pedro@example.org"),
+        _member("M5", "Zoe", "Adams", phone="(555) 777-1234")
+    ])
+
+
+def test_query_tokens_are_normalized():
+    assert normalize_query("  Maria  ROD ") == ["maria", "rod"]
+    assert normalize_query("(555) 201-0142") == ["555", "2010142"]
+    assert normalize_query("555-201-0142") == ["5552010142"]
+
+
+def test_prefix_matches_rank_ahead_of_substring_matches(index):
+    page = index.search("mari")
+    # Prefix matches on a name, alphabetical by last name, then a match inside "samaria"
+    assert page.member_ids == ["M2", "M1", "M3"]
+    assert index.search("driguez").member_ids == ["M1", "M4"]
+    assert index.search("maria rod").member_ids == ["M1"]
+    assert index.search("0142").member_ids == ["M1"]
+    assert index.search("5557771234").member_ids == ["M5"]
+    assert index.search("m4").member_ids == ["M4"]
+    assert index.search("nobody").total == 0
+
+
+def test_pages_are_slices_of_the_ranking(index):
+    everyone = index.search("")
+    assert everyone.total == 5
+    assert everyone.member_ids == ["M5", "M2", "M1", "M4", "M3"]
+    page = index.search("", limit=2, offset=2)
+    assert page.member_ids == ["M1", "M4"] and page.offset == 2 and page.total == 5
+    assert index.search("rodriguez", limit=1, offset=1).member_ids == ["M4"]
+
+
+def test_updates_are_searchable_without_a_rebuild(index):
+    index.update(_member("M2", "Mario", "Baker"))
+    index.update(_member("M6", "Marisol", "Ortiz"))
+
+    assert len(index) == 6 and "M6" in index
+    assert index.search("alvarez").total == 0
+    assert index.search("mari").member_ids == ["M2", "M6", "M1", "M3"]
+    assert index.search("", limit=3, offset=1).member_ids == ["M2", "M6", "M1"]
+    rebuilt = MemberSearchIndex([
+        _member("M1", "Maria", "Rodriguez", phone="555-201-0142"), _member("M2", "Mario", "Baker"),
+        _member("M3", "Ana", "Samaria"), _member("M4", "Pedro", "Rodriguez", email="pedro@example.org"),
+        _member("M5", "Zoe", "Adams", phone="(555) 777-1234"), _member("M6", "Marisol", "Ortiz")
+    ])
+    for query in ("", "mari", "rod", "ortiz", "555"):
+        assert index.search(query).member_ids == rebuilt.search(query).member_ids
+
+
+def _rename(member, suffix: str):
+    return member.model_copy(update={"last_name": member.last_name + suffix})
+
+
+def _assert_rebuilt(index, rebuilt):
+    """Compaction renumbers the built arrays into exactly what a rebuild gives."""
+    assert index.member_ids == rebuilt.member_ids and index._terms == rebuilt._terms
+    for name in ("_term_rows", "_trigram_keys", "_posting_offsets", "_postings"):
+        assert np.array_equal(getattr(index, name), getattr(rebuilt, name)), name
+
+
+def test_empty_query_pages_merge_updates_without_ranking_everyone(monkeypatch):
+    members = list(generate_synthetic_members(300, seed=47).values())
+    index = MemberSearchIndex(members)
+    current = {member.id: member for member in members}
+    rng = random.Random(47)
+    for member in rng.sample(members, 25):
+        current[member.id] = _rename(member, rng.choice(["a", "zz", "Q"]))
+        index.update(current[member.id])
+    for number in range(5):
+        member = members[0].model_copy(update={"id": f"NEW{number}", "last_name": rng.choice(["Aaron", "Moss", "Zed"])})
+        current[member.id] = member
+        index.update(member)
+
+    rebuilt = MemberSearchIndex(current.values())
+    monkeypatch.setattr(index, "_built_matches", None)
+    for offset, limit in [(0, 20), (0, 400), (7, 13), (290, 20), (305, 5), (400, 10), (3, 0)]:
+        page = index.search("", limit=limit, offset=offset)
+        assert page.total == len(rebuilt) == 305
+        assert page.member_ids == rebuilt.search("", limit=limit, offset=offset).member_ids, (offset, limit)
+    index.compact()
+    _assert_rebuilt(index, rebuilt)
+
+
+def test_updates_are_compacted_past_the_threshold(monkeypatch):
+    monkeypatch.setattr(search_index, "_COMPACT_MIN", 10)
+    members = list(generate_synthetic_members(200, seed=5).values())
+    index = MemberSearchIndex(members)
+    current = {member.id: member for member in members}
+    for number, member in enumerate(members[:35]):
+        current[member.id] = _rename(member, "son")
+        index.update(current[member.id])
+        assert len(index._delta) <= 10 and index._stale_count <= 10, number
+    assert len(index.member_ids) == 200
+
+    rebuilt = MemberSearchIndex(current.values())
+    index.compact()
+    _assert_rebuilt(index, rebuilt)
+    for query in ("", "son", members[3].first_name, members[50].last_name[:4], members[7].id):
+        assert index.search(query, limit=500).member_ids == rebuilt.search(query, limit=500).member_ids, query
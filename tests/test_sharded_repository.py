@@ -0,0 +1,81 @@
+"""Hash-sharded repository: routing, scatter-gather queries and local-only operations."""
+
+from datetime import date, timedelta
+
+import pytest
+
+import storage.member_repository as repository
+from storage.member_repository import ShardedRepositoryError, generate_synthetic_members, set_router
+from storage.sharded_repository import shard_of, start_local_shards
+
+
+@pytest.fixture(scope="module")
+def population():
+    return generate_synthetic_members(300, seed=48)
+
+
+@pytest.fixture(scope="module")
+def router(population):
+    router = start_local_shards(3, population)
+    yield router
+    router.close()
+
+
+@pytest.fixture
+def sharded(router, population):
+    previous = dict(repository._members)
+    repository.set_members(population)
+    local = {
+        "due": repository.get_member_ids_due_between(date.today(), date.today() + timedelta(days=90)),
+        "active": sorted(member.id for member in repository.get_members_by_status("active")),
+        "missing": repository.count_members_missing_document("income_verification")
+    }
+    set_router(router)
+    yield local
+    set_router(None)
+    repository.set_members(previous)
+
+
+def test_shard_of_is_stable_and_spread():
+    assert shard_of("M000123", 4) == shard_of("M000123", 4)
+    assert {shard_of(f"M{i:06d}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_members_are_partitioned_by_id(router, population):
+    sizes = router.shard_sizes()
+    assert sum(sizes) == len(population) and all(sizes)
+    member_id = next(iter(population))
+    assert router.get_member(member_id) == population[member_id]
+    assert router.get_member("missing") is None
+
+
+def test_repository_calls_are_routed_to_the_shards(sharded, population):
+    assert sorted(repository.get_all_member_ids()) == sorted(population)
+    due = repository.get_member_ids_due_between(date.today(), date.today() + timedelta(days=90))
+    assert sorted(due) == sorted(sharded["due"])
+    assert sorted(member.id for member in repository.get_members_by_status("active")) == sharded["active"]
+    assert repository.count_members_missing_document("income_verification") == sharded["missing"]
+
+    member_id = next(iter(population))
+    member = repository.get_member(member_id)
+    updated = member.model_copy(update={"first_name": "Sharded"})
+    repository.update_member(member_id, updated)
+    assert repository.get_member(member_id).first_name == "Sharded"
+    repository.update_member(member_id, member)
+
+
+def test_renewal_queries_merge_in_date_order(sharded):
+    due = repository.get_members_renewal_due_soon(120)
+    days = [member.eligibility.renewal_date[:10] for member in due]
+    assert days == sorted(days)
+
+
+@pytest.mark.parametrize("call", [
+    lambda: repository.search_members("maria"),
+    lambda: repository.get_document_table(),
+    lambda: repository.build_search_index(),
+    lambda: repository.save_snapshot("unused.snap")
+])
+def test_local_only_operations_refuse_while_sharded(sharded, call):
+    with pytest.raises(ShardedRepositoryError):
+        call()
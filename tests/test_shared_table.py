@@ -0,0 +1,38 @@
+"""Shared-memory member table: workers write the same results the scalar rules give."""
+
+import numpy as np
+import pytest
+
+from rules.medicaid_rules import evaluate_member
+from storage.member_repository import generate_synthetic_members
+from storage.shared_table import SharedMemberTable, evaluate_shared
+
+
+@pytest.fixture(scope="module")
+def members():
+    members = list(generate_synthetic_members(500, seed=11).values())
+    # A required type no member has submitted
+    eligibility = members[0].eligibility.model_copy(
+        update={"required_documents": members[0].eligibility.required_documents + ["pay_stub"]}
+    )
+    members[0] = members[0].model_copy(update={"eligibility": eligibility})
+    return members
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_shared_table_matches_scalar_issues(members, processes):
+    with SharedMemberTable.create(members) as table:
+        stats = evaluate_shared(table, processes=processes, chunks=7)
+        results = [evaluate_member(member) for member in members]
+        for row, result in enumerate(results):
+            assert table.issues(row) == result.issues
+            assert table.results["work_hours_remaining"][row] == result["work_hours_remaining"]
+    assert stats["members"] == len(members)
+    assert stats["with_issues"] == sum(1 for result in results if result.issues)
+
+
+def test_missing_documents_count_all_64_bits(members):
+    with SharedMemberTable.create(members[:3]) as table:
+        table.columns["required_documents"][:] = np.array([2 ** 64 - 1, 1 << 63, 0b1011], dtype=np.uint64)
+        table.columns["submitted_documents"][:] = np.array([0, 0, 0b0001], dtype=np.uint64)
+        assert table.facts(0, 3)["missing_document_count"].tolist() == [64, 1, 2]
@@ -0,0 +1,75 @@
+"""Member repository snapshots: save, load, query and update after load."""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+import storage.member_repository as repository
+from storage.member_repository import (
+    count_members_missing_document, generate_synthetic_members, get_all_member_ids, get_member,
+    get_member_ids_due_between, get_members_renewal_due_soon, load_snapshot, save_snapshot, set_members,
+    update_member
+)
+
+
+@pytest.fixture
+def population():
+    previous = dict(repository._members)
+    members = generate_synthetic_members(2000, seed=21)
+    set_members(members)
+    yield members
+    set_members(previous)
+
+
+def _due_window():
+    today = date.today()
+    return today, today + timedelta(days=120)
+
+
+def test_round_trip_restores_members_and_indexes(tmp_path, population):
+    path = str(tmp_path / "members.snap")
+    start, end = _due_window()
+    due = get_member_ids_due_between(start, end)
+    due_soon = [member.id for member in get_members_renewal_due_soon(45)]
+    missing = count_members_missing_document("income_verification")
+    save_snapshot(path)
+
+    set_members(generate_synthetic_members(10, seed=1))
+    loaded = load_snapshot(path)
+
+    assert list(loaded) == list(population)
+    assert all(loaded[member_id] == member for member_id, member in population.items())
+    assert get_all_member_ids() == list(population)
+    assert isinstance(repository._mapped_renewal[0], np.ndarray)
+    assert get_member_ids_due_between(start, end) == due
+    assert [member.id for member in get_members_renewal_due_soon(45)] == due_soon
+    assert count_members_missing_document("income_verification") == missing
+
+
+def test_update_after_load_matches_a_rebuild(tmp_path, population):
+    path = str(tmp_path / "members.snap")
+    save_snapshot(path)
+    load_snapshot(path)
+
+    start, end = _due_window()
+    member_id = get_member_ids_due_between(start, end)[0]
+    member = get_member(member_id)
+    eligibility = member.eligibility.model_copy(update={"renewal_date": (end + timedelta(days=30)).isoformat()})
+    documents = dict(member.documents or {}, income_verification={"status": "submitted"})
+    update_member(member_id, member.model_copy(update={"eligibility": eligibility, "documents": documents}))
+
+    assert member_id not in get_member_ids_due_between(start, end)
+    due = get_member_ids_due_between(start, end)
+    missing = count_members_missing_document("income_verification")
+
+    set_members({member_id: get_member(member_id) for member_id in get_all_member_ids()})
+    assert sorted(get_member_ids_due_between(start, end)) == sorted(due)
+    assert count_members_missing_document("income_verification") == missing
+
+
+def test_rejects_files_that_are_not_snapshots(tmp_path, population):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
@@ -0,0 +1,67 @@
+"""Resumable batch sweep over the job queue."""
+
+from collections import Counter
+
+from batch.sweep import run_sweep
+from storage.audit_store import AuditStore
+from storage.job_queue import DEAD, DONE, JobQueue
+from storage.member_repository import get_all_member_ids, load_members
+
+
+def test_sweep_completes_and_resumes(tmp_path):
+    load_members()
+    path = str(tmp_path / "sweep.db")
+    member_ids = get_all_member_ids()
+
+    stats = run_sweep(path, member_ids=member_ids + ["no-such-member"], max_attempts=2)
+    assert stats[DONE] == len(member_ids)
+    assert stats[DEAD] == 1
+
+    queue = JobQueue(path)
+    results = {record["member_id"]: record["result"] for record in queue.results()}
+    assert set(results) == set(member_ids)
+    assert all(result["compliance_status"] for result in results.values())
+    assert queue.dead_letters()[0]["member_id"] == "no-such-member"
+    queue.close()
+
+    # A second run finds every member already queued and processes nothing new
+    assert run_sweep(path, member_ids=member_ids) == stats
+
+
+def test_sweep_writes_audit_logs_to_the_store(tmp_path):
+    load_members()
+    member_ids = get_all_member_ids()[:2]
+    run_sweep(str(tmp_path / "sweep.db"), member_ids=member_ids, audit_root=str(tmp_path / "audit"))
+
+    store = AuditStore(str(tmp_path / "audit"))
+    assert {entry["member_id"] for entry in store.query()} == set(member_ids)
+    assert store.verify(processes=1).valid
+    store.close()
+
+
+def test_lost_leases_leave_no_audit_rows(tmp_path, monkeypatch):
+    load_members()
+    member_ids = get_all_member_ids()[:2]
+    run_sweep(str(tmp_path / "clean.db"), member_ids=member_ids, audit_root=str(tmp_path / "clean"))
+
+    # The first ack of each member finds its lease gone, so the member is leased and processed again
+    ack = JobQueue.ack
+    lost = set()
+
+    def flaky_ack(self, job, result):
+        if job.member_id not in lost:
+            lost.add(job.member_id)
+            return False
+        return ack(self, job, result)
+
+    monkeypatch.setattr(JobQueue, "ack", flaky_ack)
+    stats = run_sweep(str(tmp_path / "sweep.db"), member_ids=member_ids, visibility_timeout=0.1,
+                      audit_root=str(tmp_path / "audit"))
+    assert stats[DONE] == len(member_ids) and lost == set(member_ids)
+
+    counts = []
+    for root in ("clean", "audit"):
+        store = AuditStore(str(tmp_path / root))
+        counts.append(Counter(entry["member_id"] for entry in store.query()))
+        store.close()
+    assert counts[0] == counts[1]
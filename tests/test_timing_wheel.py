@@ -0,0 +1,129 @@
+"""Timing wheel firing order and removal, and the reminder scheduler built on it."""
+
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from scheduler.clock import VirtualClock
+from scheduler.reminder_scheduler import SECONDS_PER_DAY, ReminderScheduler
+from scheduler.timing_wheel import TimingWheel
+from storage.member_repository import create_synthetic_members
+
+
+START = 1000
+
+
+def _drain(wheel: TimingWheel, step: int, seed: int = 0):
+    """Advance in random steps, checking every key fires within the step that reaches its deadline."""
+    rng = random.Random(seed)
+    fired = {}
+    tick = start = wheel.current_tick
+    while len(wheel):
+        previous, tick = tick, tick + rng.randint(1, step)
+        batch = wheel.advance(tick)
+        assert [deadline for deadline, _ in batch] == sorted(deadline for deadline, _ in batch)
+        for deadline, key in batch:
+            assert key not in fired
+            assert deadline <= tick
+            assert deadline > previous or deadline <= start
+            fired[key] = deadline
+    return fired
+
+
+def test_fires_every_key_at_its_deadline():
+    rng = random.Random(1)
+    wheel = TimingWheel(start_tick=START, slot_bits=4, levels=3)
+    expected = {key: START + rng.randint(-10, 20000) for key in range(3000)}
+    for key, deadline in expected.items():
+        wheel.insert(deadline, key)
+    assert len(wheel) == len(expected)
+    assert _drain(wheel, step=300) == expected
+
+
+def test_remove_and_reschedule():
+    rng = random.Random(2)
+    wheel = TimingWheel(start_tick=START, slot_bits=4, levels=3)
+    expected = {key: START + rng.randint(0, 20000) for key in range(3000)}
+    for key, deadline in expected.items():
+        wheel.insert(deadline, key)
+    for key in rng.sample(range(3000), 1000):
+        assert wheel.remove(key)
+        del expected[key]
+    for key in rng.sample(sorted(expected), 500):
+        expected[key] = START + rng.randint(0, 5000)
+        wheel.insert(expected[key], key)
+
+    assert not wheel.remove("missing")
+    assert len(wheel) == len(expected)
+    assert _drain(wheel, step=50, seed=3) == expected
+
+
+def test_skips_idle_ticks_when_empty():
+    wheel = TimingWheel(start_tick=0)
+    assert wheel.advance(10 ** 9) == []
+    assert wheel.current_tick == 10 ** 9
+
+
+@pytest.fixture
+def members():
+    """Copies of the demo members with renewal dates spread over the next year."""
+    demo = list(create_synthetic_members().values())
+    members = []
+    for index in range(50):
+        member = demo[index % len(demo)]
+        renewal = (date.today() + timedelta(days=5 + 7 * index)).isoformat()
+        eligibility = member.eligibility.model_copy(update={"renewal_date": renewal})
+        members.append(member.model_copy(update={"id": f"m{index}", "eligibility": eligibility}))
+    return members
+
+
+def test_cancel_removes_jobs_from_the_wheel(tmp_path, members):
+    clock = VirtualClock(time.time())
+    scheduler = ReminderScheduler(str(tmp_path / "reminders.db"), clock=clock)
+    scheduled = scheduler.schedule_members(members)
+    member = next(m for m in members if scheduler.pending_jobs(m.id))
+    cancelled = len(scheduler.pending_jobs(member.id))
+
+    scheduler.cancel_member(member.id)
+    assert len(scheduler._wheel) == len(scheduler) == scheduled - cancelled
+
+    scheduler.schedule_member(member)
+    assert len(scheduler._wheel) == len(scheduler) == scheduled
+    scheduler.close()
+
+
+def test_jobs_fire_once_and_survive_restart(tmp_path, members):
+    clock = VirtualClock(time.time())
+    path = str(tmp_path / "reminders.db")
+    scheduler = ReminderScheduler(path, clock=clock)
+    scheduled = scheduler.schedule_members(members)
+    scheduler.close()
+
+    fired = []
+    restarted = ReminderScheduler(path, clock=clock, handler=fired.append)
+    assert len(restarted) == scheduled
+    clock.advance(800 * SECONDS_PER_DAY)
+    assert len(restarted.run_pending()) == scheduled
+    assert len({job.key for job in fired}) == scheduled
+    assert restarted.run_pending() == []
+
+    # Reminders already sent are not planned again
+    assert restarted.schedule_members(members) == 0
+    restarted.close()
+
+
+def test_failed_handler_marks_job_failed(tmp_path, members):
+    clock = VirtualClock(time.time())
+
+    def handler(job):
+        raise RuntimeError("delivery failed")
+
+    scheduler = ReminderScheduler(str(tmp_path / "reminders.db"), clock=clock, handler=handler)
+    scheduled = scheduler.schedule_members(members)
+    clock.advance(800 * SECONDS_PER_DAY)
+    assert len(scheduler.run_pending()) == scheduled
+    statuses = dict(scheduler._conn.execute("SELECT status, COUNT(*) FROM reminder_jobs GROUP BY status"))
+    assert statuses == {"failed": scheduled}
+    scheduler.close()
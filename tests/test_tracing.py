@@ -0,0 +1,128 @@
+"""Trace spans for workflow runs, sampling and cross-process export."""
+
+import json
+import multiprocessing
+
+import pytest
+
+from main import process_member
+from storage.member_repository import load_members
+from utils.tracing import (TRACER, InMemoryCollector, JsonlExporter, Tracer, configure_tracing, extract,
+                           inject, trace_chain)
+
+
+@pytest.fixture
+def collector():
+    collector = InMemoryCollector()
+    configure_tracing(collector, sample_rate=1.0)
+    yield collector
+    configure_tracing(None)
+
+
+def test_member_run_is_one_trace_with_a_span_per_step(collector):
+    load_members()
+    process_member("1")
+
+    spans = collector.spans
+    roots = [span for span in spans if span["parent_id"] is None]
+    assert len(roots) == 1
+    assert {span["trace_id"] for span in spans} == {roots[0]["trace_id"]}
+    assert all(span["attributes"]["member_id"] == "1" for span in spans)
+    children = [span for span in spans if span["parent_id"] == roots[0]["span_id"]]
+    assert len(children) >= 6
+
+
+def test_errors_are_recorded_on_the_span(collector):
+    with pytest.raises(ValueError):
+        with TRACER.span("failing"):
+            raise ValueError("bad input")
+    assert collector.spans[-1]["status"] == "error"
+    assert collector.spans[-1]["attributes"]["error"] == "bad input"
+
+
+def test_unsampled_traces_record_nothing():
+    collector = InMemoryCollector()
+    tracer = Tracer(collector, sample_rate=0.0)
+    with tracer.span("root") as root:
+        root.set_attribute("ignored", True)
+        with tracer.span("child"):
+            pass
+    assert collector.spans == []
+
+
+def test_context_crosses_process_boundaries(collector):
+    with TRACER.span("parent", member_id="7") as parent:
+        carrier = json.loads(json.dumps(inject()))
+    with TRACER.attach(extract(carrier)):
+        with TRACER.span("remote"):
+            pass
+
+    remote = collector.spans[-1]
+    assert remote["parent_id"] == parent.context.span_id
+    assert remote["trace_id"] == parent.context.trace_id
+    assert remote["attributes"]["member_id"] == "7"
+
+
+class _Chain:
+    def invoke(self, prompt):
+        return f"echo {prompt}"
+
+
+def test_traced_chain_is_a_child_span(collector):
+    chain = trace_chain("eligibility_checker", _Chain())
+    with TRACER.span("step"):
+        assert chain.invoke("hi") == "echo hi"
+    llm, step = collector.spans
+    assert llm["name"] == "llm.eligibility_checker"
+    assert llm["parent_id"] == step["span_id"]
+    assert llm["attributes"]["output_chars"] == len("echo hi")
+
+
+class _Message:
+    content = "Eligibility confirmed."
+    usage_metadata = {"input_tokens": 120, "output_tokens": 6, "total_tokens": 126}
+
+
+class _Result:
+    llm_output = {"token_usage": {"prompt_tokens": 80, "completion_tokens": 4, "total_tokens": 84}}
+
+
+class _FailingChain:
+    def invoke(self, prompt):
+        raise TimeoutError("model timed out")
+
+
+def test_llm_spans_record_output_size_tokens_and_errors(collector):
+    trace_chain("reminder", type("Chain", (), {"invoke": lambda self, prompt: _Message()})()).invoke("hi")
+    trace_chain("reminder", type("Chain", (), {"invoke": lambda self, prompt: _Result()})()).invoke("hi")
+    with pytest.raises(TimeoutError):
+        trace_chain("reminder", _FailingChain()).invoke("hi")
+
+    message, result, failed = (span["attributes"] for span in collector.spans)
+    assert message["output_chars"] == len("Eligibility confirmed.")
+    assert (message["input_tokens"], message["output_tokens"], message["total_tokens"]) == (120, 6, 126)
+    assert (result["input_tokens"], result["output_tokens"], result["total_tokens"]) == (80, 4, 84)
+    assert failed["error_type"] == "TimeoutError" and "output_chars" not in failed
+    assert collector.spans[-1]["status"] == "error"
+
+
+def _append_spans(path: str, worker: int) -> None:
+    exporter = JsonlExporter(path, buffer_size=7)
+    for index in range(100):
+        exporter.export({"worker": worker, "index": index, "padding": "x" * 500})
+    exporter.flush()
+
+
+def test_processes_append_whole_lines(tmp_path):
+    path = str(tmp_path / "spans.jsonl")
+    processes = [multiprocessing.Process(target=_append_spans, args=(path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert sorted((record["worker"], record["index"]) for record in records) == [
+        (worker, index) for worker in range(4) for index in range(100)
+    ]
@@ -0,0 +1,71 @@
+"""Work-hours ledger totals, corrections and their use by the workflow."""
+
+from datetime import date
+
+import pytest
+
+from main import process_member
+from storage.member_repository import get_all_members, load_members
+from storage.work_hours_ledger import WorkHoursLedger, set_work_hours_ledger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = WorkHoursLedger(str(tmp_path / "hours.db"))
+    yield ledger
+    ledger.close()
+
+
+def test_batch_ids_and_monthly_totals(ledger):
+    ids = ledger.record_many([("a", "2026-03-02", 10.5, "employer_feed"), ("a", "2026-03-20", 4, "self_report"),
+                              ("a", "2026-04-01", 8, "self_report"), ("b", "2026-03-02", 1, "self_report")])
+    assert ids == [entry.id for entry in ledger.entries("a")] + [ledger.entries("b")[0].id]
+    assert ledger.monthly_hours("a", "2026-03") == 14.5
+    assert ledger.monthly_hours("a", "2026-04") == 8
+    assert ledger.record_many([]) == []
+
+
+def test_correction_moves_hours_between_months(ledger):
+    entry_id = ledger.record("a", "2026-03-31", 10)
+    correction_id = ledger.correct(entry_id, hours=6, work_date="2026-04-01")
+    ledger.correct(correction_id, hours=7)
+    assert ledger.monthly_hours("a", "2026-03") == 0
+    assert ledger.monthly_hours("a", "2026-04") == 7
+    assert [entry.corrects for entry in ledger.entries("a")] == [None, entry_id, entry_id]
+
+
+def test_totals_survive_reopen_and_rejected_entries(tmp_path, ledger):
+    ledger.record("a", "2026-03-02", 5)
+    with pytest.raises(ValueError):
+        ledger.record_many([("a", "2026-03-03", 2, "self_report"), ("a", "2026-03-04", -1, "self_report")])
+    with pytest.raises(ValueError):
+        ledger.correct(12345, hours=1)
+    reopened = WorkHoursLedger(str(tmp_path / "hours.db"))
+    assert reopened.monthly_hours("a", "2026-03") == ledger.monthly_hours("a", "2026-03") == 5
+    reopened.close()
+
+
+def test_totals_written_by_another_process_are_seen(tmp_path, ledger):
+    other = WorkHoursLedger(str(tmp_path / "hours.db"))
+    assert not ledger.has_hours("a", "2026-05")
+    entry_id = other.record("a", "2026-05-04", 6)
+    assert ledger.has_hours("a", "2026-05") and ledger.monthly_hours("a", "2026-05") == 6
+    other.correct(entry_id, hours=2)
+    assert ledger.monthly_hours("a", "2026-05") == 2
+    other.close()
+
+
+def test_process_member_reads_ledger_hours(ledger):
+    load_members()
+    member = next(m for m in get_all_members() if m.work_requirement.required)
+    today = date.today().isoformat()
+    ledger.record_many([(member.id, today, 40.4, "employer_feed"), (member.id, today, 40.4, "self_report")])
+    assert ledger.apply_to_member(member).work_requirement.hours_reported == 81
+    assert ledger.apply_to_member(member, "1999-01") is member
+
+    set_work_hours_ledger(ledger)
+    try:
+        result = process_member(member.id)
+    finally:
+        set_work_hours_ledger(None)
+    assert result["member"].work_requirement.hours_reported == 81
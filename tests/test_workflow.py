@@ -0,0 +1,66 @@
+"""Compiled workflow: agents built once per process, shared across threads, warmed up once."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import main
+from main import CompiledWorkflow, get_workflow, new_state, set_workflow
+from storage.member_repository import create_synthetic_members
+from utils.metrics import METRICS
+
+
+@pytest.fixture
+def restore_workflow():
+    previous = main._workflow
+    yield
+    set_workflow(previous)
+
+
+def test_agent_factories_run_once(monkeypatch):
+    calls = []
+
+    def factory(name):
+        def build(llm):
+            calls.append(name)
+            return lambda state: {**state, "interactions": state["interactions"] + [name]}
+        return build
+
+    monkeypatch.setattr(main, "AGENT_FACTORIES", [(name, factory(name)) for name, _ in main.AGENT_FACTORIES])
+    workflow = CompiledWorkflow(llm=object())
+    members = list(create_synthetic_members().values())
+    results = [workflow.run(new_state(member)) for member in members]
+
+    assert calls == [name for name, _ in main.AGENT_FACTORIES]
+    assert all(result["interactions"] == calls for result in results)
+
+
+def test_process_wide_workflow_is_built_once(restore_workflow):
+    set_workflow(None)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        workflows = list(pool.map(lambda _: get_workflow(), range(32)))
+    assert all(workflow is workflows[0] for workflow in workflows)
+
+
+def test_shared_workflow_gives_the_same_results_on_threads():
+    workflow = CompiledWorkflow()
+    members = list(create_synthetic_members().values()) * 4
+    serial = [workflow.run(new_state(member))["compliance_status"] for member in members]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = list(pool.map(lambda member: workflow.run(new_state(member))["compliance_status"], members))
+    assert threaded == serial
+
+
+def test_run_does_not_modify_the_initial_state():
+    state = new_state(create_synthetic_members()["1"])
+    CompiledWorkflow().run(state)
+    assert state["audit_log"] == [] and not state["eligibility_verified"]
+
+
+def test_warm_up_runs_once_outside_metrics():
+    workflow = CompiledWorkflow()
+    before = METRICS.snapshot().get("medicaid_agent_steps_total")
+    workflow.warm_up()
+    workflow.warm_up()
+    assert workflow.warmed_up
+    assert METRICS.snapshot().get("medicaid_agent_steps_total") == before
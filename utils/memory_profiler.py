@@ -0,0 +1,255 @@
+"""
+Opt-in memory accounting and leak detection based on tracemalloc.
+
+When enabled, every `process_member` call and every agent step records the
+peak bytes allocated while it ran and the bytes still retained when it
+finished. Growth since profiling started is attributed to allocation sites
+by comparing tracemalloc snapshots. Use the report to size worker memory
+limits and to spot state that keeps growing across members.
+
+Profiling is off by default; tracemalloc slows allocation-heavy code
+considerably. Enable it with `enable_memory_profiling()` or by setting
+MEDICAID_MEMORY_PROFILE=1. Per-member figures assume members are processed
+one at a time per process, as batch sweep workers do.
+"""
+
+import json
+import os
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class _Frame:
+    __slots__ = ("label", "start_current", "peak")
+
+    def __init__(self, label: str, start_current: int):
+        self.label = label
+        self.start_current = start_current
+        self.peak = start_current
+
+
+class _TrackScope:
+    """Measures one tracked block."""
+
+    __slots__ = ("profiler", "frame")
+
+    def __init__(self, profiler: "MemoryProfiler", label: str):
+        self.profiler = profiler
+        self.frame = _Frame(label, 0)
+
+    def __enter__(self) -> None:
+        stack = self.profiler._stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Bank the parent's peak so far before restarting peak tracking
+            stack[-1].peak = max(stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        self.frame.start_current = current
+        self.frame.peak = current
+        stack.append(self.frame)
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        current, peak = tracemalloc.get_traced_memory()
+        stack = self.profiler._stack()
+        stack.pop()
+        frame = self.frame
+        frame.peak = max(frame.peak, peak)
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, frame.peak)
+        self.profiler._record(frame.label, frame.peak - frame.start_current, current - frame.start_current)
+        return False
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class MemoryProfiler:
+    """Per-label peak and retained memory statistics with leak attribution."""
+
+    def __init__(self):
+        self.enabled = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_at: Optional[str] = None
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self, frames: int = 10) -> None:
+        """
+        Start tracemalloc and take the baseline snapshot for leak attribution.
+
+        Args:
+            frames: Stack frames stored per allocation; more frames give
+                better attribution at higher cost
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        with self._lock:
+            self._stats.clear()
+        self._baseline = tracemalloc.take_snapshot()
+        self._started_at = datetime.now().isoformat()
+        self.enabled = True
+
+    def stop(self) -> None:
+        """Stop profiling and tracemalloc."""
+        self.enabled = False
+        tracemalloc.stop()
+
+    def track(self, label: str):
+        """
+        Context manager measuring the peak and retained bytes of a block
+        under `label`. A no-op while profiling is disabled.
+        """
+        if not self.enabled:
+            return _NOOP_SCOPE
+        return _TrackScope(self, label)
+
+    def _record(self, label: str, peak: int, retained: int) -> None:
+        with self._lock:
+            stats = self._stats.get(label)
+            if stats is None:
+                stats = self._stats[label] = {
+                    "calls": 0, "peak_total": 0, "peak_max": 0, "retained_total": 0, "retained_max": 0
+                }
+            stats["calls"] += 1
+            stats["peak_total"] += peak
+            stats["peak_max"] = max(stats["peak_max"], peak)
+            stats["retained_total"] += retained
+            stats["retained_max"] = max(stats["retained_max"], retained)
+
+    def top_growth(self, limit: int = 10, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """
+        Allocation sites that grew the most since profiling started.
+
+        Args:
+            limit: Number of sites to return
+            group_by: "lineno", "filename" or "traceback"
+
+        Returns:
+            List[Dict[str, Any]]: Site, bytes and allocation-count growth
+        """
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return []
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")
+        ]
+        snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+        baseline = self._baseline.filter_traces(ignore)
+        growth = [diff for diff in snapshot.compare_to(baseline, group_by) if diff.size_diff > 0][:limit]
+        return [
+            {
+                "site": str(diff.traceback[0]) if group_by != "traceback" else diff.traceback.format(),
+                "size_diff": diff.size_diff,
+                "size": diff.size,
+                "count_diff": diff.count_diff
+            }
+            for diff in growth
+        ]
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Build a memory report for the run so far.
+
+        Returns:
+            Dict[str, Any]: Traced totals, per-label statistics (calls, mean
+                and max peak, mean and total retained bytes) and top growth sites
+        """
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        with self._lock:
+            labels = {
+                label: {
+                    "calls": stats["calls"],
+                    "peak_mean_bytes": stats["peak_total"] / stats["calls"],
+                    "peak_max_bytes": stats["peak_max"],
+                    "retained_mean_bytes": stats["retained_total"] / stats["calls"],
+                    "retained_max_bytes": stats["retained_max"],
+                    "retained_total_bytes": stats["retained_total"]
+                }
+                for label, stats in sorted(self._stats.items())
+            }
+        return {
+            "started_at": self._started_at,
+            "generated_at": datetime.now().isoformat(),
+            "pid": os.getpid(),
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "labels": labels,
+            "top_growth": self.top_growth(top)
+        }
+
+    def write_report(self, path: str, top: int = 10) -> None:
+        """Write the memory report as JSON."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(top), f, indent=2)
+
+
+def merge_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine the reports of several worker processes into one batch report.
+
+    Per-label statistics are merged across workers; totals, peaks and
+    growth sites are kept per worker.
+    """
+    labels: Dict[str, Dict[str, float]] = {}
+    for report in reports:
+        for label, stats in report["labels"].items():
+            merged = labels.setdefault(label, {
+                "calls": 0, "peak_total": 0.0, "peak_max_bytes": 0, "retained_total_bytes": 0, "retained_max_bytes": 0
+            })
+            merged["calls"] += stats["calls"]
+            merged["peak_total"] += stats["peak_mean_bytes"] * stats["calls"]
+            merged["peak_max_bytes"] = max(merged["peak_max_bytes"], stats["peak_max_bytes"])
+            merged["retained_total_bytes"] += stats["retained_total_bytes"]
+            merged["retained_max_bytes"] = max(merged["retained_max_bytes"], stats["retained_max_bytes"])
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "workers": len(reports),
+        "labels": {
+            label: {
+                "calls": merged["calls"],
+                "peak_mean_bytes": merged["peak_total"] / merged["calls"] if merged["calls"] else 0,
+                "peak_max_bytes": merged["peak_max_bytes"],
+                "retained_mean_bytes": merged["retained_total_bytes"] / merged["calls"] if merged["calls"] else 0,
+                "retained_max_bytes": merged["retained_max_bytes"],
+                "retained_total_bytes": merged["retained_total_bytes"]
+            }
+            for label, merged in sorted(labels.items())
+        },
+        "worker_reports": reports
+    }
+
+
+# Process-wide profiler used by the workflow
+MEMORY_PROFILER = MemoryProfiler()
+
+
+def enable_memory_profiling(frames: int = 10) -> MemoryProfiler:
+    """Turn on memory profiling for this process."""
+    MEMORY_PROFILER.start(frames)
+    return MEMORY_PROFILER
+
+
+if os.environ.get("MEDICAID_MEMORY_PROFILE") == "1":
+    enable_memory_profiling(int(os.environ.get("MEDICAID_MEMORY_PROFILE_FRAMES", "10")))
@@ -0,0 +1,333 @@
+"""
+Deadlines, hedged requests, retries and circuit breaking for agent LLM calls.
+
+`ResilientLLM` wraps the language model handed to an agent's `create_*_agent`
+factory. Every call gets an overall deadline. When a call runs past the
+agent's recent p95 latency, a duplicate (hedged) request is sent and the
+first good answer wins. Failed or timed-out calls are retried with jittered
+exponential backoff while the deadline allows. Calls that still fail count
+against a per-agent circuit breaker.
+
+`ResilientStep` wraps the agent step itself. While the agent's breaker is
+open, or when the agent's LLM gave up during the step, the step's
+deterministic simulated rule runs instead, so one slow or failing model
+degrades a step rather than stalling the worker.
+
+Defaults come from the environment: MEDICAID_LLM_DEADLINE,
+MEDICAID_LLM_MAX_ATTEMPTS, MEDICAID_LLM_BREAKER_FAILURES and
+MEDICAID_LLM_BREAKER_RESET.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from models.state import AgentState
+from utils.logger import setup_logger
+from utils.metrics import METRICS
+from utils.tracing import wrap
+
+# Set up logger
+logger = setup_logger()
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ResiliencePolicy(BaseModel):
+    """Deadline, hedging, retry and breaker settings shared by an LLM's agents."""
+    deadline_seconds: float = float(os.environ.get("MEDICAID_LLM_DEADLINE", "30"))
+    max_attempts: int = int(os.environ.get("MEDICAID_LLM_MAX_ATTEMPTS", "3"))
+    backoff_base_seconds: float = 0.25
+    backoff_max_seconds: float = 4.0
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    latency_window: int = 200
+    breaker_failures: int = int(os.environ.get("MEDICAID_LLM_BREAKER_FAILURES", "5"))
+    breaker_reset_seconds: float = float(os.environ.get("MEDICAID_LLM_BREAKER_RESET", "30"))
+    max_concurrent_calls: int = 32
+
+
+class LLMUnavailableError(RuntimeError):
+    """An LLM call failed every attempt within its deadline, or its circuit is open."""
+
+
+class LatencyWindow:
+    """Latencies of an agent's most recent successful calls."""
+
+    def __init__(self, size: int):
+        self._latencies: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency at quantile `q` of the window, or None when it is empty."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+
+class CircuitBreaker:
+    """
+    Per-agent circuit breaker.
+
+    Opens after `failures` consecutive failed calls. After `reset_seconds`
+    one trial call is let through (half-open); its success closes the
+    breaker and its failure opens it again.
+    """
+
+    def __init__(self, name: str, failures: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; in the half-open state only one trial call is allowed at a time."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failures:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit for {self.name} opened after {self._consecutive_failures} failures")
+                    METRICS.inc("medicaid_llm_circuit_opened_total", agent=self.name)
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+
+class ResilientLLM:
+    """
+    An LLM wrapped with a deadline, hedging, retries and a circuit breaker.
+
+    Build one per process with `ResilientLLM(llm)` and give each agent its
+    own view with `for_agent(name)`; views share the call pool but keep
+    their own latency window and breaker. A view is callable, so
+    `prompt | view` composes into a chain like the model itself.
+    """
+
+    def __init__(self, llm: Any, policy: Optional[ResiliencePolicy] = None, agent: Optional[str] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Args:
+            llm: The language model; anything with `invoke`
+            policy: Deadline, hedging, retry and breaker settings
+            agent: Agent name for metrics and the breaker
+            executor: Pool running the calls, shared between agent views
+        """
+        self.llm = llm
+        self.policy = policy or ResiliencePolicy()
+        self.agent = agent or "llm"
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=self.policy.max_concurrent_calls, thread_name_prefix="medicaid-llm"
+        )
+        self.latencies = LatencyWindow(self.policy.latency_window)
+        self.breaker = CircuitBreaker(self.agent, self.policy.breaker_failures, self.policy.breaker_reset_seconds)
+        self._local = threading.local()
+
+    def for_agent(self, agent: str) -> "ResilientLLM":
+        """A view of the same model with its own latency window and breaker."""
+        return ResilientLLM(self.llm, self.policy, agent, self._executor)
+
+    @property
+    def failures_in_thread(self) -> int:
+        """Calls from the current thread that gave up; lets a step tell whether its LLM failed."""
+        return getattr(self._local, "failures", 0)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a hedged request is sent, or None until enough latencies are known."""
+        if len(self.latencies) < self.policy.hedge_min_samples:
+            return None
+        return self.latencies.quantile(self.policy.hedge_quantile)
+
+    def invoke(self, input: Any, config: Optional[Any] = None, **kwargs: Any) -> Any:
+        """
+        Call the model within the policy's deadline.
+
+        Raises:
+            LLMUnavailableError: The circuit is open, or every attempt failed
+                or timed out before the deadline
+        """
+        if not self.breaker.allow():
+            METRICS.inc("medicaid_llm_calls_total", agent=self.agent, outcome="circuit_open")
+            self._local.failures = self.failures_in_thread + 1
+            raise LLMUnavailableError(f"Circuit for {self.agent} is open")
+
+        deadline = time.monotonic() + self.policy.deadline_seconds
+        error: Optional[BaseException] = None
+        for attempt in range(self.policy.max_attempts):
+            try:
+                result = self._hedged_call(input, config, kwargs, deadline)
+            except Exception as e:
+                error = e
+                METRICS.inc("medicaid_llm_calls_total", agent=self.agent,
+                            outcome="timeout" if isinstance(e, TimeoutError) else "error")
+            else:
+                self.breaker.record_success()
+                METRICS.inc("medicaid_llm_calls_total", agent=self.agent, outcome="success")
+                return result
+
+            remaining = deadline - time.monotonic()
+            if attempt + 1 >= self.policy.max_attempts or remaining <= 0:
+                break
+            backoff = min(self.policy.backoff_max_seconds, self.policy.backoff_base_seconds * 2 ** attempt)
+            time.sleep(min(remaining, random.uniform(0, backoff)))
+
+        self.breaker.record_failure()
+        self._local.failures = self.failures_in_thread + 1
+        raise LLMUnavailableError(f"LLM call for {self.agent} failed after {attempt + 1} attempts: {error}") from error
+
+    def _submit(self, input: Any, config: Optional[Any], kwargs: Dict[str, Any]) -> Future:
+        def call() -> Any:
+            start = time.perf_counter()
+            result = self.llm.invoke(input, config, **kwargs)
+            elapsed = time.perf_counter() - start
+            self.latencies.observe(elapsed)
+            METRICS.observe("medicaid_llm_call_seconds", elapsed, agent=self.agent)
+            return result
+        return self._executor.submit(wrap(call))
+
+    def _hedged_call(self, input: Any, config: Optional[Any], kwargs: Dict[str, Any], deadline: float) -> Any:
+        """
+        One attempt: the request, plus a hedged duplicate if it outlives the hedge delay.
+
+        A call still running at the deadline is abandoned, not interrupted;
+        its thread returns to the pool when the model answers.
+        """
+        first = self._submit(input, config, kwargs)
+        pending: List[Future] = [first]
+        hedge_delay = self.hedge_delay()
+        hedged = False
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = remaining if hedged or hedge_delay is None else min(remaining, hedge_delay)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if hedged and future is not first:
+                        METRICS.inc("medicaid_llm_hedges_total", agent=self.agent, outcome="won")
+                    return future.result()
+                error = future.exception()
+            if not done and not hedged and hedge_delay is not None:
+                hedged = True
+                METRICS.inc("medicaid_llm_hedges_total", agent=self.agent, outcome="sent")
+                pending.append(self._submit(input, config, kwargs))
+        if error is not None and not pending:
+            raise error
+        for future in pending:
+            future.cancel()
+        raise TimeoutError(f"LLM call for {self.agent} exceeded its {self.policy.deadline_seconds}s deadline")
+
+    def __call__(self, input: Any) -> Any:
+        return self.invoke(input)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names the wrapper lacks. Never delegate `llm` itself
+        # or special names, so copy and pickle, which look these up before
+        # __init__ has run, see a plain object instead of recursing
+        if name == "llm" or (name.startswith("__") and name.endswith("__")):
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+
+class ResilientStep:
+    """An agent step that falls back to its simulated rule while the agent's LLM is unavailable."""
+
+    def __init__(self, name: str, step: Callable[[AgentState], AgentState],
+                 fallback: Callable[[AgentState], AgentState], llm: ResilientLLM):
+        self.name = name
+        self.step = step
+        self.fallback = fallback
+        self.llm = llm
+
+    def __call__(self, state: AgentState) -> AgentState:
+        if self.llm.breaker.state == OPEN:
+            METRICS.inc("medicaid_agent_fallbacks_total", agent=self.name, reason="circuit_open")
+            return self.fallback(state)
+
+        # Agent steps record LLM errors in the state rather than raising, so
+        # keep the incoming state to hand to the fallback
+        original = {key: list(value) if isinstance(value, list) else value for key, value in state.items()}
+        failures = self.llm.failures_in_thread
+        state = self.step(state)
+        if self.llm.failures_in_thread > failures:
+            METRICS.inc("medicaid_agent_fallbacks_total", agent=self.name, reason="llm_unavailable")
+            return self.fallback(AgentState(**original))
+        return state
+
+
+def resilient_steps(llm: Any, factories: List, fallbacks: List,
+                    policy: Optional[ResiliencePolicy] = None) -> List:
+    """
+    Build agent steps around a resilient LLM.
+
+    Args:
+        llm: The language model
+        factories: (agent name, `create_*_agent` factory) pairs in workflow order
+        fallbacks: (agent name, simulated step) pairs in the same order
+        policy: Deadline, hedging, retry and breaker settings
+
+    Returns:
+        List: (agent name, ResilientStep) pairs
+    """
+    resilient = llm if isinstance(llm, ResilientLLM) else ResilientLLM(llm, policy)
+    fallback_steps = dict(fallbacks)
+    steps = []
+    for name, factory in factories:
+        agent_llm = resilient.for_agent(name)
+        steps.append((name, ResilientStep(name, factory(agent_llm), fallback_steps[name], agent_llm)))
+    return steps
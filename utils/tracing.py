@@ -0,0 +1,390 @@
+"""
+Lightweight tracing for workflow runs.
+
+`process_member` opens a root span per member, each agent step a child span,
+and LLM chain invocations a grandchild span, all carrying the member ID and
+result attributes. LLM spans also record output size and token usage, and
+failed spans the error class. The active span lives in a context variable, so it
+follows async tasks automatically; `wrap` carries it into worker threads,
+and `inject`/`extract` carry it across process boundaries.
+
+Sampling is decided once per trace at the root span. Descendants of an
+unsampled root, and every span while tracing is off, return a shared no-op
+scope and record nothing. An unsampled span costs well under a
+microsecond, so at low sample rates overhead stays under 1% of any run that
+makes LLM calls. Finished spans go to a JSONL file or
+an in-process collector.
+
+Tracing is off by default. Enable it with `configure_tracing(...)`, or from
+the environment with MEDICAID_TRACE_FILE and MEDICAID_TRACE_SAMPLE_RATE.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+# Span attributes inherited by every descendant span
+PROPAGATED_ATTRIBUTES = ("member_id",)
+
+
+class SpanContext:
+    """Identity of a span, enough to parent new spans to it, plus inherited attributes."""
+
+    __slots__ = ("trace_id", "span_id", "sampled", "baggage")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool, baggage: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+        self.baggage = baggage or {}
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("context", "parent_id", "name", "attributes", "status", "start_time", "_start", "duration")
+
+    def __init__(self, context: SpanContext, parent_id: Optional[str], name: str, attributes: Dict[str, Any]):
+        self.context = context
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration * 1000 if self.duration is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name
+        }
+
+
+class _UnsampledSpan:
+    """Stand-in yielded for spans of unsampled traces; records nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+class SpanExporter:
+    """Destination for finished spans."""
+
+    def export(self, span: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+
+class InMemoryCollector(SpanExporter):
+    """Keeps finished spans in process, for tests and notebooks."""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonlExporter(SpanExporter):
+    """
+    Appends finished spans to a JSONL file, buffered in memory and written
+    in batches. Each batch is a single write to a file opened with O_APPEND,
+    so several processes may append to the same file without interleaving
+    lines.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 256):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        atexit.register(self.flush)
+
+    def export(self, span: Dict[str, Any]) -> None:
+        line = json.dumps(span, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: drop the parent's unwritten spans
+                self._buffer = []
+                self._pid = os.getpid()
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size:
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write()
+
+    def _write(self) -> None:
+        if not self._buffer or self._pid != os.getpid():
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            written = os.write(fd, data)
+            while written < len(data):
+                # Short writes only happen on full disks or signals; finish the batch
+                written += os.write(fd, data[written:])
+        finally:
+            os.close(fd)
+        self._buffer.clear()
+
+
+class _SpanScope:
+    """Context manager that activates a sampled span and exports it on exit."""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span.context)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        _current.reset(self.token)
+        span = self.span
+        span.duration = time.perf_counter() - span._start
+        if exc is not None:
+            span.status = "error"
+            span.attributes["error"] = str(exc)
+            span.attributes["error_type"] = exc_type.__name__
+        if self.tracer.exporter is not None:
+            self.tracer.exporter.export(span.to_dict())
+        return False
+
+
+class _UnsampledRootScope:
+    """Marks a trace as unsampled so its descendants skip recording."""
+
+    __slots__ = ("context", "token")
+
+    def __init__(self, context: SpanContext):
+        self.context = context
+
+    def __enter__(self) -> "_UnsampledSpan":
+        self.token = _current.set(self.context)
+        return _NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        _current.reset(self.token)
+        return False
+
+
+class _NoopScope:
+    """Scope for spans that record nothing and change no context."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_UnsampledSpan":
+        return _NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+
+_current: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar("medicaid_trace_span", default=None)
+
+
+class Tracer:
+    """Creates spans, applies root sampling and hands finished spans to the exporter."""
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+
+    def span(self, name: str, **attributes: Any) -> "_SpanScope":
+        """
+        Open a span as a child of the active span, or as a new sampled or
+        unsampled root when there is none. Use as a context manager.
+
+        Yields:
+            The span; call `set_attribute` to record results
+        """
+        parent = _current.get()
+        if parent is None:
+            if not self.sample_rate:
+                return _NOOP_SCOPE
+            sampled = random.random() < self.sample_rate
+            context = SpanContext(os.urandom(16).hex(), os.urandom(8).hex(), sampled)
+            if not sampled:
+                return _UnsampledRootScope(context)
+        elif parent.sampled:
+            context = SpanContext(parent.trace_id, os.urandom(8).hex(), True, parent.baggage)
+        else:
+            return _NOOP_SCOPE
+
+        propagated = {key: attributes[key] for key in PROPAGATED_ATTRIBUTES if key in attributes}
+        if propagated:
+            context.baggage = {**context.baggage, **propagated}
+        span = Span(context, parent.span_id if parent is not None else None, name, {**context.baggage, **attributes})
+        return _SpanScope(self, span)
+
+    def flush(self) -> None:
+        """Write out spans buffered by the exporter, e.g. before a worker process exits."""
+        if self.exporter is not None:
+            self.exporter.flush()
+
+    @contextmanager
+    def attach(self, context: Optional[SpanContext]) -> Iterator[None]:
+        """Make a span context from another thread or process the active parent."""
+        token = _current.set(context)
+        try:
+            yield
+        finally:
+            _current.reset(token)
+
+
+_NOOP_SPAN = _UnsampledSpan()
+_NOOP_SCOPE = _NoopScope()
+
+TRACER = Tracer()
+
+
+def configure_tracing(exporter: Optional[SpanExporter], sample_rate: float = 1.0) -> Tracer:
+    """
+    Configure the process-wide tracer.
+
+    Args:
+        exporter: Where finished spans go; None disables tracing
+        sample_rate: Fraction of root spans (traces) to record
+
+    Returns:
+        Tracer: The configured tracer
+    """
+    if TRACER.exporter is not None:
+        TRACER.exporter.flush()
+    TRACER.exporter = exporter
+    TRACER.sample_rate = sample_rate if exporter is not None else 0.0
+    return TRACER
+
+
+def configure_tracing_from_env() -> Tracer:
+    """Configure tracing from MEDICAID_TRACE_FILE and MEDICAID_TRACE_SAMPLE_RATE."""
+    path = os.environ.get("MEDICAID_TRACE_FILE")
+    if path:
+        return configure_tracing(JsonlExporter(path), float(os.environ.get("MEDICAID_TRACE_SAMPLE_RATE", "0.01")))
+    return TRACER
+
+
+def current_span_context() -> Optional[SpanContext]:
+    """The active span context, if any."""
+    return _current.get()
+
+
+def inject() -> Optional[Dict[str, Any]]:
+    """Serialize the active span context for another process."""
+    context = _current.get()
+    if context is None:
+        return None
+    return {
+        "trace_id": context.trace_id,
+        "span_id": context.span_id,
+        "sampled": context.sampled,
+        "baggage": context.baggage
+    }
+
+
+def extract(carrier: Optional[Dict[str, Any]]) -> Optional[SpanContext]:
+    """Rebuild a span context serialized by `inject`."""
+    if not carrier:
+        return None
+    return SpanContext(carrier["trace_id"], carrier["span_id"], bool(carrier["sampled"]), carrier.get("baggage"))
+
+
+def wrap(fn: Callable) -> Callable:
+    """Bind a callable to the current context, for running it on another thread."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+class TracedChain:
+    """Wraps an LLM chain so each invocation is traced as a child span."""
+
+    def __init__(self, name: str, chain: Any):
+        self.name = name
+        self.chain = chain
+
+    def invoke(self, *args: Any, **kwargs: Any) -> Any:
+        with TRACER.span(f"llm.{self.name}", agent=self.name) as span:
+            output = self.chain.invoke(*args, **kwargs)
+            _record_llm_output(span, output)
+            return output
+
+    async def ainvoke(self, *args: Any, **kwargs: Any) -> Any:
+        with TRACER.span(f"llm.{self.name}", agent=self.name) as span:
+            output = await self.chain.ainvoke(*args, **kwargs)
+            _record_llm_output(span, output)
+            return output
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.chain, name)
+
+
+# Token usage keys, as reported by chat models (usage_metadata) and by
+# completion models (llm_output["token_usage"])
+_TOKEN_KEYS = {
+    "input_tokens": ("input_tokens", "prompt_tokens"),
+    "output_tokens": ("output_tokens", "completion_tokens"),
+    "total_tokens": ("total_tokens",)
+}
+
+
+def _record_llm_output(span: Any, output: Any) -> None:
+    """Record the size and token usage of an LLM chain's output on its span."""
+    if not isinstance(span, Span):
+        return
+    content = getattr(output, "content", output)
+    span.set_attribute("output_chars", len(content if isinstance(content, str) else str(content)))
+    usage = (
+        getattr(output, "usage_metadata", None)
+        or (getattr(output, "llm_output", None) or {}).get("token_usage")
+        or (getattr(output, "response_metadata", None) or {}).get("token_usage")
+    )
+    if not isinstance(usage, dict):
+        return
+    for attribute, keys in _TOKEN_KEYS.items():
+        value = next((usage[key] for key in keys if usage.get(key) is not None), None)
+        if value is not None:
+            span.set_attribute(attribute, value)
+
+
+def trace_chain(name: str, chain: Any) -> TracedChain:
+    """Trace every invocation of an agent's LLM chain."""
+    return TracedChain(name, chain)
+
+
+configure_tracing_from_env()